@@ -0,0 +1,218 @@
+"""
+Async versions of the hot read-only endpoints, served when ASYNC_API is on.
+
+They reuse the DRF views for querysets, filtering, pagination and
+serializers, so responses match the sync endpoints, but run the database
+queries with the async ORM and the cache lookups with an asyncio Redis
+client. Under an ASGI server a worker keeps serving other requests while
+one waits on Postgres, Redis or a slow client.
+
+Only JSON is rendered; the browsable API stays on the sync views.
+"""
+from functools import wraps
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from posts import category_counts, popularity
+from themes.models import ExtendedTheme
+from utils.image_utils import generate_blur_placeholder
+from utils.redis_client import get_async_redis
+from .prerender import is_prerender
+from . import cards, response_cache
+from .serializers import ActiveThemeSerializer
+from .views import PostViewSet, CategoryViewSet, FeaturedPostsAPIView
+
+BLUR_CACHE_KEY = 'blur-placeholder:{digest}'
+BLUR_CACHE_TIMEOUT = 60 * 60 * 24
+# Serializer placeholder field -> image field it is generated from
+BLUR_FIELD_IMAGES = {
+    'blur_data_url': 'featured_image',
+    'side_image_1_blur': 'side_image_1',
+    'side_image_2_blur': 'side_image_2',
+}
+
+
+def async_api_view(func):
+    """
+    Wrap an async view taking a DRF ``Request`` and returning data.
+
+    Handles method checks, DRF exceptions and JSON rendering.
+    """
+    @wraps(func)
+    async def view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        drf_request = Request(request)
+        try:
+            data = await func(drf_request, *args, **kwargs)
+            status = 200
+        except Exception as exc:
+            response = exception_handler(exc, {'request': drf_request})
+            if response is None:
+                raise
+            data, status = response.data, response.status_code
+        return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+    return view
+
+
+def sync_view(view_class, request, action=None, **kwargs):
+    """Instantiate a DRF view for its queryset, filtering and serializer helpers."""
+    return view_class(request=request, args=(), kwargs=kwargs, format_kwarg=None, action=action)
+
+
+async def blur_placeholders(urls):
+    """
+    Return ``{url: placeholder}`` for image URLs.
+
+    Placeholders are cached by URL (uploads get a new name when replaced);
+    misses are generated in a worker thread since they open the image.
+    """
+    keys = {url: BLUR_CACHE_KEY.format(digest=hashlib.sha1(url.encode()).hexdigest()) for url in set(urls)}
+    if not keys:
+        return {}
+    client = get_async_redis()
+    if client is None:
+        cached = await cache.aget_many(keys.values())
+    else:
+        values = await client.mget(list(keys.values()))
+        cached = {key: value.decode() for key, value in zip(keys.values(), values) if value is not None}
+
+    placeholders = {url: cached[key] for url, key in keys.items() if key in cached}
+    missing = [url for url in keys if url not in placeholders]
+    if missing:
+        generate = sync_to_async(lambda: {url: generate_blur_placeholder(url) for url in missing}, thread_sensitive=False)
+        fresh = await generate()
+        placeholders.update(fresh)
+        if client is None:
+            await cache.aset_many({keys[url]: value for url, value in fresh.items()}, BLUR_CACHE_TIMEOUT)
+        else:
+            pipe = client.pipeline()
+            for url, value in fresh.items():
+                pipe.set(keys[url], value, ex=BLUR_CACHE_TIMEOUT)
+            await pipe.execute()
+    return placeholders
+
+
+async def serializer_context(view, posts, blur_fields=('blur_data_url',)):
+    """Serializer context with the placeholders for ``blur_fields`` precomputed."""
+    context = view.get_serializer_context()
+    fields = context.get('sparse_fields')
+    image_fields = [
+        BLUR_FIELD_IMAGES[name] for name in blur_fields if fields is None or name in fields
+    ]
+    urls = [getattr(post, field).url for post in posts for field in image_fields if getattr(post, field)]
+    context['blur_placeholders'] = await blur_placeholders(urls)
+    return context
+
+
+async def paginate(view, queryset):
+    """
+    Async equivalent of ``view.paginate_queryset``.
+
+    Returns the page's objects and the pagination instance, ready for
+    ``get_paginated_response``.
+    """
+    pagination = view.paginator
+    request = view.request
+    paginator = pagination.django_paginator_class(queryset, pagination.get_page_size(request))
+    paginator.count = await queryset.acount()
+    page_number = pagination.get_page_number(request, paginator)
+    try:
+        page = paginator.page(page_number)
+    except Exception as exc:
+        raise NotFound(pagination.invalid_page_message.format(page_number=page_number, message=str(exc)))
+    page.object_list = [obj async for obj in page.object_list]
+    pagination.page = page
+    pagination.request = request
+    return page.object_list, pagination
+
+
+async def list_posts(view):
+    if cards.servable(view.request):
+        payloads, pagination = await paginate(view, cards.payloads(view.request, view.featured_cards))
+        return pagination.get_paginated_response(cards.trim(payloads, view.get_sparse_fields())).data
+    queryset = view.filter_queryset(view.get_queryset())
+    posts, pagination = await paginate(view, queryset)
+    context = await serializer_context(view, posts)
+    data = view.get_serializer_class()(posts, many=True, context=context).data
+    return pagination.get_paginated_response(data).data
+
+
+async def cached_list_posts(view):
+    key, data = await response_cache.aget(view.request)
+    if data is None:
+        data = await list_posts(view)
+        await response_cache.astore(key, data)
+    return data
+
+
+@async_api_view
+async def post_list(request):
+    return await cached_list_posts(sync_view(PostViewSet, request, 'list'))
+
+
+@async_api_view
+async def featured_posts(request):
+    return await cached_list_posts(sync_view(FeaturedPostsAPIView, request))
+
+
+@async_api_view
+async def post_detail(request, slug):
+    key, data = await response_cache.aget(request)
+    if data is None:
+        view = sync_view(PostViewSet, request, 'retrieve', slug=slug)
+        try:
+            post = await view.get_queryset().aget(slug=slug)
+        except ObjectDoesNotExist:
+            raise Http404
+        context = await serializer_context(view, [post], BLUR_FIELD_IMAGES)
+        data = view.get_serializer_class()(post, context=context).data
+        await response_cache.astore(key, data)
+        category_slugs = [category.slug for category in post.categories.all()]
+    else:
+        # Cached payloads are never sparse
+        category_slugs = [category['slug'] for category in data['categories']]
+    if not is_prerender(request):
+        await popularity.arecord_view(data['id'], category_slugs)
+    return data
+
+
+@async_api_view
+async def category_list(request):
+    view = sync_view(CategoryViewSet, request, 'list')
+    view.post_counts = await category_counts.apost_counts()
+    categories, pagination = await paginate(view, view.filter_queryset(view.get_queryset()))
+    data = view.get_serializer(categories, many=True).data
+    return pagination.get_paginated_response(data).data
+
+
+@async_api_view
+async def category_detail(request, slug):
+    view = sync_view(CategoryViewSet, request, 'retrieve', slug=slug)
+    view.post_counts = await category_counts.apost_counts()
+    try:
+        category = await view.get_queryset().aget(slug=slug)
+    except ObjectDoesNotExist:
+        raise Http404
+    return view.get_serializer(category).data
+
+
+@async_api_view
+async def active_theme(request):
+    ext = await (
+        ExtendedTheme.objects.filter(theme__active=True)
+        .select_related('theme')
+        .order_by('theme_id', 'pk')
+        .afirst()
+    )
+    if not ext:
+        return None
+    return ActiveThemeSerializer(ext).data
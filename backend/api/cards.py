@@ -0,0 +1,104 @@
+"""
+Post cards: the stored list payload of every published post (``PostCard``).
+
+Each row holds exactly what ``PostListSerializer`` emits, categories, tags,
+image URLs and blur placeholder included, so the post list, featured posts
+and homepage are served by one range read on ``published_at`` instead of
+five tables and placeholder work per request.
+
+Cards are refreshed from the ``posts_written`` signal inside the writing
+transaction, so they commit or roll back with the posts. Category and tag
+edits can touch any number of posts; their cards are refreshed in batches by
+the ``refresh_label_cards`` task after the edit commits. ``rebuild``
+recreates them all (``rebuild_post_cards`` command and a nightly task) for
+writes that bypass the signals.
+
+Only requests with ``SERVED_PARAMS`` are served from cards; search, ordering
+and the other filters go through the regular querysets. Parameters the API
+doesn't read (``response_cache.IGNORED_PARAMS``) don't count.
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from posts.models import Post, PostCard
+from .response_cache import IGNORED_PARAMS
+from .serializers import PostListSerializer
+
+SERVED_PARAMS = {'page', 'category', 'categories__slug', 'fields', 'omit'}
+REBUILD_BATCH_SIZE = 500
+
+
+def refresh(post_ids):
+    """Rewrite the cards of ``post_ids``; posts that aren't published lose theirs."""
+    post_ids = set(post_ids)
+    if not post_ids:
+        return 0
+    posts = list(
+        Post.objects.filter(pk__in=post_ids, status='published').prefetch_related('categories', 'tags')
+    )
+    # Unchanged images keep their placeholder instead of being opened again
+    old = PostCard.objects.filter(pk__in=[post.pk for post in posts]).order_by().values_list('payload', flat=True)
+    placeholders = {card['featured_image']: card['blur_data_url'] for card in old if card['featured_image']}
+    payloads = PostListSerializer(posts, many=True, context={'blur_placeholders': placeholders}).data
+    PostCard.objects.bulk_create(
+        [
+            PostCard(post=post, published_at=post.published_at, is_featured=post.is_featured, payload=payload)
+            for post, payload in zip(posts, payloads)
+        ],
+        update_conflicts=True,
+        unique_fields=['post'],
+        update_fields=['published_at', 'is_featured', 'payload'],
+    )
+    gone = post_ids - {post.pk for post in posts}
+    if gone:
+        PostCard.objects.filter(pk__in=gone).delete()
+    return len(posts)
+
+
+def refresh_in_batches(post_ids):
+    """``refresh`` with one transaction per REBUILD_BATCH_SIZE posts."""
+    post_ids = sorted(set(post_ids))
+    for start in range(0, len(post_ids), REBUILD_BATCH_SIZE):
+        with transaction.atomic():
+            refresh(post_ids[start:start + REBUILD_BATCH_SIZE])
+    return len(post_ids)
+
+
+def rebuild():
+    """Refresh every card in batches and drop the cards of unpublished posts."""
+    count = refresh_in_batches(Post.objects.filter(status='published').values_list('pk', flat=True))
+    PostCard.objects.exclude(post__status='published').delete()
+    return count
+
+
+def servable(request):
+    return set(request.query_params) - IGNORED_PARAMS <= SERVED_PARAMS
+
+
+def payloads(request, featured=False):
+    """Card payloads for a post list request, newest first."""
+    queryset = PostCard.objects.all()
+    if featured:
+        queryset = queryset.filter(is_featured=True)
+    params = request.query_params
+    category_slug = params.get('category') or params.get('categories__slug')
+    if category_slug:
+        membership = Post.categories.through.objects.filter(post_id=OuterRef('pk'), category__slug=category_slug)
+        queryset = queryset.filter(Exists(membership))
+    return queryset.values_list('payload', flat=True)
+
+
+def trim(cards, fields):
+    """Apply sparse fieldsets to stored (always complete) payloads."""
+    if fields is None:
+        return list(cards)
+    return [{name: card[name] for name in fields} for card in cards]
+
+
+class PostCardListMixin:
+    """List view mixin serving plain list requests from the stored cards."""
+    featured_cards = False
+
+    def list_cards(self):
+        page = self.paginate_queryset(payloads(self.request, self.featured_cards))
+        return self.get_paginated_response(trim(page, self.get_sparse_fields())).data
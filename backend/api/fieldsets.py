@@ -0,0 +1,88 @@
+"""
+Sparse fieldsets for the post endpoints.
+
+``?fields=slug,title`` keeps only the listed fields and ``?omit=content``
+drops fields. Besides trimming the response, the view loads only the
+columns the remaining fields need (``only()``), drops prefetches for
+omitted relations and skips blur placeholders nobody asked for.
+"""
+from rest_framework.exceptions import ValidationError
+
+# Serializer field -> model fields (or prefetched relations) it reads
+POST_FIELD_SOURCES = {
+    'featured_image': ['featured_image'],
+    'blur_data_url': ['featured_image'],
+    'side_image_1': ['side_image_1'],
+    'side_image_1_blur': ['side_image_1'],
+    'side_image_2': ['side_image_2'],
+    'side_image_2_blur': ['side_image_2'],
+    'reading_time': ['content'],
+}
+POST_PREFETCHES = ('categories', 'tags')
+
+
+def parse_field_list(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def sparse_fields(request, serializer_class):
+    """
+    Return the serializer fields requested with ``fields``/``omit``, or None
+    when the full representation is wanted.
+    """
+    params = request.query_params
+    if 'fields' not in params and 'omit' not in params:
+        return None
+    available = list(serializer_class.Meta.fields)
+    requested = parse_field_list(params.get('fields', '')) or available
+    omitted = parse_field_list(params.get('omit', ''))
+    unknown = sorted(set(requested + omitted) - set(available))
+    if unknown:
+        raise ValidationError({
+            'detail': f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}."
+        })
+    return [name for name in available if name in requested and name not in omitted]
+
+
+def narrow_post_queryset(queryset, fields, keep_prefetches=()):
+    """Load only the columns and relations needed to serialize ``fields``."""
+    if fields is None:
+        return queryset
+    columns, prefetches = {'id'}, set(keep_prefetches)
+    for name in fields:
+        if name in POST_PREFETCHES:
+            prefetches.add(name)
+        else:
+            columns.update(POST_FIELD_SOURCES.get(name, [name]))
+    return queryset.prefetch_related(None).prefetch_related(
+        *[name for name in POST_PREFETCHES if name in prefetches]
+    ).only(*columns)
+
+
+class SparseFieldsSerializerMixin:
+    """Drop the fields not listed in the ``sparse_fields`` context entry."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('sparse_fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """View mixin adding ``?fields=``/``?omit=`` to post endpoints."""
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = sparse_fields(self.request, self.get_serializer_class())
+        return self._sparse_fields
+
+    def narrow_queryset(self, queryset, keep_prefetches=()):
+        """``keep_prefetches`` lists relations the view itself reads."""
+        return narrow_post_queryset(queryset, self.get_sparse_fields(), keep_prefetches)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sparse_fields'] = self.get_sparse_fields()
+        return context
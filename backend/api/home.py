@@ -0,0 +1,82 @@
+"""
+Composite homepage payload: theme, featured posts, categories and the
+first page of posts, read in one transaction and cached as one entry
+(HOME_CACHE_TIMEOUT, off without Redis).
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.urls import reverse
+
+from categories.models import Category
+from posts import category_counts
+from posts.models import Post, PostCard
+from themes.models import ExtendedTheme
+from .serializers import CategoryWithCountSerializer, ActiveThemeSerializer
+
+HOME_CACHE_KEY = 'api-home'
+
+
+@contextmanager
+def read_snapshot(using):
+    """Run the enclosed reads against a single database snapshot."""
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            # READ COMMITTED would let each query see a different state
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+        yield
+
+
+def build_home(request):
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    # Pin one database so every query reads the same snapshot
+    using = router.db_for_read(Post)
+    with read_snapshot(using):
+        ext = (
+            ExtendedTheme.objects.using(using)
+            .filter(theme__active=True)
+            .select_related('theme')
+            .order_by('theme_id')
+            .first()
+        )
+        categories = list(Category.objects.using(using).all())
+        # Stored list payloads (api.cards), newest first
+        cards = PostCard.objects.using(using).values_list('payload', flat=True)
+        count = cards.count()
+        posts = list(cards[:page_size])
+        featured = list(cards.filter(is_featured=True)[:page_size])
+
+    next_page = None
+    if count > page_size:
+        next_page = f"{settings.API_PUBLIC_URL}{reverse('post-list')}?page=2"
+    return {
+        'theme': ActiveThemeSerializer(ext).data if ext else None,
+        'featured_posts': featured,
+        'categories': CategoryWithCountSerializer(
+            categories, many=True, context={'category_post_counts': category_counts.post_counts()}
+        ).data,
+        'posts': {
+            'count': count,
+            'next': next_page,
+            'previous': None,
+            'results': posts,
+        },
+    }
+
+
+def get_home(request):
+    if not settings.HOME_CACHE_TIMEOUT:
+        return build_home(request)
+    data = cache.get(HOME_CACHE_KEY)
+    if data is None:
+        data = build_home(request)
+        cache.set(HOME_CACHE_KEY, data, settings.HOME_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_home():
+    cache.delete(HOME_CACHE_KEY)
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from api import snapshot
+
+
+class Command(BaseCommand):
+    help = 'Export the read-only API as precompressed static JSON files'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Exporting API snapshot...')
+        count = snapshot.export_all()
+        self.stdout.write(self.style.SUCCESS(f'API snapshot exported ({count} posts).'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api import cards
+from posts.models import PostCard
+
+
+class Command(BaseCommand):
+    help = 'Recreate the stored post cards served by the list and featured endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-empty', action='store_true',
+            help='Only rebuild when no cards exist yet (first deploy of the card table)',
+        )
+
+    def handle(self, *args, **options):
+        if options['if_empty'] and PostCard.objects.exists():
+            self.stdout.write('Post cards already exist, skipping.')
+            return
+        self.stdout.write('Rebuilding post cards...')
+        count = cards.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Post cards rebuilt ({count} posts).'))
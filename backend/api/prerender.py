@@ -0,0 +1,47 @@
+"""
+Render API responses outside of a client request.
+
+Used to export static snapshots and to warm caches: the real API views are
+called with a synthetic GET request, so the output is byte-for-byte what a
+client would receive.
+"""
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import resolve
+
+# Set on synthetic requests; it is not an HTTP_* key so clients can't send it
+PRERENDER_META_KEY = 'blog.prerender'
+
+
+def is_prerender(request):
+    """Return True for requests made by ``render_endpoint``."""
+    return bool(request.META.get(PRERENDER_META_KEY))
+
+
+def render_endpoint(path, params=None):
+    """
+    Call the view for ``path`` with a GET request and return the rendered response.
+
+    Absolute URLs in the response (e.g. pagination links) use API_PUBLIC_URL,
+    whose host must be listed in ALLOWED_HOSTS.
+    """
+    public_url = urlsplit(settings.API_PUBLIC_URL)
+    request = RequestFactory().get(
+        path,
+        params or {},
+        HTTP_HOST=public_url.netloc,
+        secure=public_url.scheme == 'https',
+        **{PRERENDER_META_KEY: True},
+    )
+    match = resolve(path)
+    view = match.func
+    if iscoroutinefunction(view):
+        # ASYNC_API routes
+        view = async_to_sync(view)
+    response = view(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
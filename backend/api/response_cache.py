@@ -0,0 +1,100 @@
+"""
+Cached payloads for the hot post endpoints (API_CACHE_TIMEOUT).
+
+The post list, featured posts and post detail views store their serialized
+data under a key made of the path, the query string and a global version.
+Content changes never delete entries: ``api.warming`` renders the affected
+responses under the next version and then switches to it, so every other
+entry (older pages, other categories) goes stale at once while the hot
+ones are already filled. Versions are allocated from a counter and never
+reused, so switching to a fresh one empties the cache for readers.
+
+Only plain requests are cached: other query parameters (search, ordering,
+sparse fieldsets) and synthetic ``render_endpoint`` requests bypass it.
+IGNORED_PARAMS, which the API doesn't read (the frontend sends ``limit``
+with every list request), are left out of both the decision and the key.
+Absolute links in a cached payload use the host of the request that filled
+the entry, API_PUBLIC_URL for warmed ones.
+"""
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .prerender import is_prerender
+
+VERSION_KEY = 'api-response-version'
+# Highest version handed out by next_version()
+LAST_VERSION_KEY = 'api-response-last-version'
+RESPONSE_KEY = 'api-response:{version}:{path}?{query}'
+CACHEABLE_PARAMS = {'page', 'category', 'categories__slug'}
+IGNORED_PARAMS = {'limit'}
+
+
+def enabled():
+    return bool(settings.API_CACHE_TIMEOUT)
+
+
+def response_key(path, params, version):
+    params = {
+        name: value for name, value in params.items()
+        if name not in IGNORED_PARAMS and not (name == 'page' and str(value) == '1')
+    }
+    return RESPONSE_KEY.format(version=version, path=path, query=urlencode(sorted(params.items())))
+
+
+def cacheable(request):
+    if not enabled() or request.method != 'GET' or is_prerender(request):
+        return False
+    return set(request.GET) - IGNORED_PARAMS <= CACHEABLE_PARAMS
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+async def acurrent_version():
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, 1, None)
+        version = await cache.aget(VERSION_KEY, 1)
+    return version
+
+
+def next_version():
+    """Allocate a version no entry has been written under yet."""
+    cache.add(LAST_VERSION_KEY, current_version(), None)
+    return cache.incr(LAST_VERSION_KEY)
+
+
+def set_version(version):
+    cache.set(VERSION_KEY, version, None)
+
+
+def get(request):
+    """Return ``(key, cached data)`` for a request; the key is None when it isn't cacheable."""
+    if not cacheable(request):
+        return None, None
+    key = response_key(request.path, request.GET.dict(), current_version())
+    return key, cache.get(key)
+
+
+async def aget(request):
+    if not cacheable(request):
+        return None, None
+    key = response_key(request.path, request.GET.dict(), await acurrent_version())
+    return key, await cache.aget(key)
+
+
+def store(key, data):
+    if key is not None:
+        cache.set(key, data, settings.API_CACHE_TIMEOUT)
+
+
+async def astore(key, data):
+    if key is not None:
+        await cache.aset(key, data, settings.API_CACHE_TIMEOUT)
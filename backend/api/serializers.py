@@ -1,108 +1,37 @@
+from django.conf import settings
 from rest_framework import serializers
-from posts.models import Post
+from posts.models import Post, TagPostCount
 from categories.models import Category
 from newsletter.models import Subscriber
+from newsletter.queue import normalize_email
 from taggit.serializers import TagListSerializerField
 from utils.image_utils import generate_blur_placeholder
 from themes.models import ExtendedTheme
-import re
+from .fieldsets import SparseFieldsSerializerMixin
 
 
-def is_external_url(url):
+def image_url(image):
     """
-    Detect if a URL is an external URL (like Picsum or Unsplash)
+    URL of an image field, or None.
+
+    External URLs are mirrored into storage by posts.image_mirror, so no
+    rewriting happens here.
     """
-    if not url:
-        return False
-    
-    # Check if it's a standard URL that's not from this application
-    if url.startswith(('http://', 'https://')) and not url.startswith('http://django:8000') and not url.startswith('http://localhost:8000'):
-        return True
-    
-    # If it's a media URL containing an encoded external URL like /media/https%3A/picsum.photos/...
-    external_url_pattern = r'/media/(https?(%3A|:).+)'
-    match = re.search(external_url_pattern, url)
-    if match:
-        return True
-    
-    # Check for malformed external urls
-    if 'picsum.photos' in url or 'unsplash.com' in url or 'pexels.com' in url:
-        return True
-    
-    return False
+    return image.url if image else None
 
 
-def get_direct_url(url):
+def blur_placeholder(serializer, image):
     """
-    Extract and decode direct URL from potentially encoded or encapsulated URLs
+    Return the blur placeholder for an image field.
+
+    Views can precompute placeholders into the ``blur_placeholders`` context
+    entry (keyed by image URL) to skip opening the images here.
     """
-    if not url:
-        return url
-    
-    # If already a direct external URL
-    if is_external_url(url) and not '/media/' in url:
-        # Fix malformed protocol separator
-        if url.startswith('http') and ':/' in url and not '://' in url:
-            url = re.sub(r'(https?):\/([^\/])', r'\1://\2', url)
-        
-        # Fix specific cases for known image services
-        if 'https:/picsum' in url:
-            url = url.replace('https:/picsum', 'https://picsum')
-        if 'http:/picsum' in url:
-            url = url.replace('http:/picsum', 'http://picsum')
-            
-        if 'https:/unsplash' in url:
-            url = url.replace('https:/unsplash', 'https://unsplash')
-        if 'http:/unsplash' in url:
-            url = url.replace('http:/unsplash', 'http://unsplash')
-            
-        if 'https:/pexels' in url:
-            url = url.replace('https:/pexels', 'https://pexels')
-        if 'http:/pexels' in url:
-            url = url.replace('http:/pexels', 'http://pexels')
-            
-        return url
-    
-    # Try to extract external URL from media path
-    external_url_pattern = r'/media/(https?(%3A|:).+)'
-    match = re.search(external_url_pattern, url)
-    if match:
-        # Extract and properly decode the external URL
-        encoded_url = match.group(1)
-        # First replace %3A with : for protocol
-        decoded_url = encoded_url.replace('%3A', ':').replace('%2F', '/')
-        
-        # Handle more complex encoding if needed
-        if '%' in decoded_url:
-            try:
-                from urllib.parse import unquote
-                decoded_url = unquote(decoded_url)
-            except:
-                pass
-        
-        # Fix malformed protocol separator with regex (general case)
-        if decoded_url.startswith('http') and ':/' in decoded_url and not '://' in decoded_url:
-            decoded_url = re.sub(r'(https?):\/([^\/])', r'\1://\2', decoded_url)
-        
-        # Fix specific cases for known image services
-        if 'https:/picsum' in decoded_url:
-            decoded_url = decoded_url.replace('https:/picsum', 'https://picsum')
-        if 'http:/picsum' in decoded_url:
-            decoded_url = decoded_url.replace('http:/picsum', 'http://picsum')
-            
-        if 'https:/unsplash' in decoded_url:
-            decoded_url = decoded_url.replace('https:/unsplash', 'https://unsplash')
-        if 'http:/unsplash' in decoded_url:
-            decoded_url = decoded_url.replace('http:/unsplash', 'http://unsplash')
-            
-        if 'https:/pexels' in decoded_url:
-            decoded_url = decoded_url.replace('https:/pexels', 'https://pexels')
-        if 'http:/pexels' in decoded_url:
-            decoded_url = decoded_url.replace('http:/pexels', 'http://pexels')
-            
-        return decoded_url
-    
-    return url
+    url = image.url
+    placeholders = serializer.context.get('blur_placeholders') or {}
+    if url in placeholders:
+        return placeholders[url]
+    return generate_blur_placeholder(url)
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -111,7 +40,27 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description']
 
 
-class PostListSerializer(serializers.ModelSerializer):
+class CategoryWithCountSerializer(CategorySerializer):
+    """Category with its published post count, from the ``category_post_counts`` context entry."""
+    post_count = serializers.SerializerMethodField()
+    
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ['post_count']
+    
+    def get_post_count(self, obj):
+        return self.context['category_post_counts'].get(obj.pk, 0)
+
+
+class TagCountSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source='tag.name')
+    slug = serializers.CharField(source='tag.slug')
+    
+    class Meta:
+        model = TagPostCount
+        fields = ['name', 'slug', 'count']
+
+
+class PostListSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
     tags = TagListSerializerField()
     reading_time = serializers.IntegerField(read_only=True)
@@ -127,23 +76,16 @@ class PostListSerializer(serializers.ModelSerializer):
         ]
     
     def get_featured_image(self, obj):
-        """Return direct URL for external images, or standard URL for internal images"""
-        if not obj.featured_image:
-            return None
-            
-        url = obj.featured_image.url
-        if is_external_url(url):
-            return get_direct_url(url)
-        return url
+        return image_url(obj.featured_image)
     
     def get_blur_data_url(self, obj):
         """Generate a blur data URL for the featured image"""
         if not obj.featured_image:
             return None
-        return generate_blur_placeholder(obj.featured_image.url)
+        return blur_placeholder(self, obj.featured_image)
 
 
-class PostDetailSerializer(serializers.ModelSerializer):
+class PostDetailSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
     tags = TagListSerializerField()
     reading_time = serializers.IntegerField(read_only=True)
@@ -153,6 +95,7 @@ class PostDetailSerializer(serializers.ModelSerializer):
     featured_image = serializers.SerializerMethodField()
     side_image_1 = serializers.SerializerMethodField()
     side_image_2 = serializers.SerializerMethodField()
+    content_images = serializers.SerializerMethodField()
     
     class Meta:
         model = Post
@@ -160,56 +103,42 @@ class PostDetailSerializer(serializers.ModelSerializer):
             'id', 'title', 'slug', 'content', 'excerpt', 'featured_image',
             'side_image_1', 'side_image_2', 'side_image_1_blur', 'side_image_2_blur',
             'created_at', 'updated_at', 'published_at', 'categories', 
-            'tags', 'reading_time', 'is_featured', 'blur_data_url'
+            'tags', 'reading_time', 'is_featured', 'blur_data_url', 'content_images'
         ]
     
     def get_featured_image(self, obj):
-        """Return direct URL for external images, or standard URL for internal images"""
-        if not obj.featured_image:
-            return None
-            
-        url = obj.featured_image.url
-        if is_external_url(url):
-            return get_direct_url(url)
-        return url
+        return image_url(obj.featured_image)
     
     def get_side_image_1(self, obj):
-        """Return direct URL for external images, or standard URL for internal images"""
-        if not obj.side_image_1:
-            return None
-            
-        url = obj.side_image_1.url
-        if is_external_url(url):
-            return get_direct_url(url)
-        return url
+        return image_url(obj.side_image_1)
     
     def get_side_image_2(self, obj):
-        """Return direct URL for external images, or standard URL for internal images"""
-        if not obj.side_image_2:
-            return None
-            
-        url = obj.side_image_2.url
-        if is_external_url(url):
-            return get_direct_url(url)
-        return url
+        return image_url(obj.side_image_2)
     
     def get_blur_data_url(self, obj):
         """Generate a blur data URL for the featured image"""
         if not obj.featured_image:
             return None
-        return generate_blur_placeholder(obj.featured_image.url)
+        return blur_placeholder(self, obj.featured_image)
+    
+    def get_content_images(self, obj):
+        """Responsive variants of the content images, with their ``sizes`` attribute"""
+        return {
+            src: {**image, 'sizes': settings.CONTENT_IMAGE_SIZES}
+            for src, image in obj.content_images.items()
+        }
     
     def get_side_image_1_blur(self, obj):
         """Generate a blur data URL for side image 1"""
         if not obj.side_image_1:
             return None
-        return generate_blur_placeholder(obj.side_image_1.url)
+        return blur_placeholder(self, obj.side_image_1)
     
     def get_side_image_2_blur(self, obj):
         """Generate a blur data URL for side image 2"""
         if not obj.side_image_2:
             return None
-        return generate_blur_placeholder(obj.side_image_2.url)
+        return blur_placeholder(self, obj.side_image_2)
 
 
 class SubscriberSerializer(serializers.ModelSerializer):
@@ -220,6 +149,25 @@ class SubscriberSerializer(serializers.ModelSerializer):
             'id': {'read_only': True},
         }
 
+    def to_internal_value(self, data):
+        # Normalize before the unique validator runs so duplicates are caught case-insensitively
+        if hasattr(data, 'get') and isinstance(data.get('email'), str):
+            data = data.copy()
+            data['email'] = normalize_email(data['email'])
+        return super().to_internal_value(data)
+
+
+class SubscriberIngestSerializer(serializers.Serializer):
+    """
+    Validates a queued sign-up without touching the database.
+    Uniqueness is enforced when the queue is drained.
+    """
+    email = serializers.EmailField(max_length=254)
+    name = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+
+    def validate_email(self, value):
+        return normalize_email(value)
+
 
 # Serializer for the active theme with hero section data
 class ActiveThemeSerializer(serializers.ModelSerializer):
@@ -233,11 +181,4 @@ class ActiveThemeSerializer(serializers.ModelSerializer):
         fields = ['id', 'theme_name', 'hero_image', 'hero_image_alt', 'hero_box_color', 'show_navbar']
         
     def get_hero_image(self, obj):
-        """Return direct URL for external images, or standard URL for internal images"""
-        if not obj.hero_image:
-            return None
-            
-        url = obj.hero_image.url
-        if is_external_url(url):
-            return get_direct_url(url)
-        return url 
\ No newline at end of file
+        return image_url(obj.hero_image)
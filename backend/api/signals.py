@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from taggit.models import Tag
+
+from categories.models import Category
+from posts.models import Post
+from posts.signals import posts_changed, posts_written
+from admin_interface.models import Theme
+from themes.models import ExtendedTheme
+from .home import invalidate_home
+from . import cards, warming
+from .tasks import (
+    export_snapshot_for_posts, export_snapshot_categories, export_snapshot_theme, refresh_label_cards,
+)
+
+# Changes to these fields don't show up in any API response
+IGNORED_FIELDS = {'view_count'}
+
+
+@receiver(posts_changed, sender=Post)
+def invalidate_home_for_posts(sender, post_ids, fields=None, **kwargs):
+    if fields is None or set(fields) - IGNORED_FIELDS:
+        invalidate_home()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Theme)
+@receiver(post_delete, sender=Theme)
+@receiver(post_save, sender=ExtendedTheme)
+@receiver(post_delete, sender=ExtendedTheme)
+def invalidate_home_for_instance(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_home)
+
+
+@receiver(posts_written, sender=Post)
+def refresh_post_cards(sender, post_ids, fields=None, **kwargs):
+    if fields is None or set(fields) - IGNORED_FIELDS:
+        cards.refresh(post_ids)
+
+
+def tagged_post_ids(sender, instance):
+    lookup = 'categories' if sender is Category else 'tags'
+    return list(Post.objects.filter(**{lookup: instance}).values_list('pk', flat=True))
+
+
+def schedule_card_refresh(post_ids):
+    # A label can be on thousands of posts: refresh them outside the request
+    if post_ids:
+        transaction.on_commit(lambda: refresh_label_cards.delay(post_ids))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+def refresh_cards_for_label(sender, instance, created, **kwargs):
+    # Cards embed category and tag names
+    if not created:
+        schedule_card_refresh(tagged_post_ids(sender, instance))
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Tag)
+def collect_cards_for_label(sender, instance, **kwargs):
+    # The memberships are gone by post_delete
+    instance._card_post_ids = tagged_post_ids(sender, instance)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+def refresh_cards_for_deleted_label(sender, instance, **kwargs):
+    schedule_card_refresh(getattr(instance, '_card_post_ids', []))
+
+
+@receiver(posts_changed, sender=Post)
+def warm_for_posts(sender, post_ids, fields=None, **kwargs):
+    if fields is None or set(fields) - IGNORED_FIELDS:
+        warming.schedule(post_ids=post_ids)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def warm_for_category(sender, instance, **kwargs):
+    slug = instance.slug
+    transaction.on_commit(lambda: warming.schedule(category_slugs=[slug]))
+
+
+@receiver(posts_changed, sender=Post)
+def export_post_snapshot(sender, post_ids, fields=None, **kwargs):
+    if not settings.API_SNAPSHOT_ENABLED:
+        return
+    if fields is not None and not set(fields) - IGNORED_FIELDS:
+        return
+    export_snapshot_for_posts.delay(list(post_ids), list(fields) if fields is not None else None)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def export_category_snapshot(sender, instance, **kwargs):
+    if not settings.API_SNAPSHOT_ENABLED:
+        return
+    slug = instance.slug
+    transaction.on_commit(lambda: export_snapshot_categories.delay([slug]))
+
+
+@receiver(post_save, sender=ExtendedTheme)
+@receiver(post_delete, sender=ExtendedTheme)
+def export_theme_snapshot(sender, instance, **kwargs):
+    if settings.API_SNAPSHOT_ENABLED:
+        transaction.on_commit(export_snapshot_theme.delay)
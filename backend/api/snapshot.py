@@ -0,0 +1,227 @@
+"""
+Static snapshot of the read-only API for CDN hosting.
+
+Responses are rendered through the real API views (see ``api.prerender``)
+and written as JSON files with gzip copies under API_SNAPSHOT_ROOT:
+
+    api/v1/posts/pages/<n>.json                   /api/v1/posts/?page=<n>
+    api/v1/posts/<slug>.json                      /api/v1/posts/<slug>/
+    api/v1/featured-posts.json                    /api/v1/featured-posts/
+    api/v1/featured-posts/categories/<slug>.json  /api/v1/featured-posts/?category=<slug>
+    api/v1/categories.json                        /api/v1/categories/
+    api/v1/categories/<slug>.json                 /api/v1/categories/<slug>/
+    api/v1/categories/<slug>/pages/<n>.json       /api/v1/posts/?category=<slug>&page=<n>
+    api/v1/theme.json                             /api/v1/theme/
+    api/v1/home.json                              /api/v1/home/
+
+``manifest.json`` records, for every exported post, its slug, list page,
+publish time and categories, so an incremental export after a change knows
+which files to rewrite or remove, and whether the post moved.
+"""
+import json
+import os
+import shutil
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from categories.models import Category
+from posts.models import Post
+from utils.files import write_precompressed, remove_precompressed
+from .prerender import render_endpoint
+
+MANIFEST = 'manifest.json'
+# Changes to these fields can move posts between list pages
+ORDERING_FIELDS = {'status', 'published_at'}
+
+
+def _path(relative_path):
+    return os.path.join(settings.API_SNAPSHOT_ROOT, relative_path)
+
+
+def _page_size():
+    return settings.REST_FRAMEWORK['PAGE_SIZE']
+
+
+def _export(relative_path, path, params=None):
+    """Render ``path`` and write it to ``relative_path``. Returns the decoded JSON, or None on 404."""
+    response = render_endpoint(path, params)
+    if response.status_code == 404:
+        remove_precompressed(_path(relative_path))
+        return None
+    if response.status_code != 200:
+        raise RuntimeError(f'{path} returned {response.status_code}')
+    write_precompressed(_path(relative_path), [response.content])
+    # The theme endpoint renders an empty body when no theme is active
+    return json.loads(response.content or b'null')
+
+
+def _read_manifest():
+    try:
+        with open(_path(MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'posts': {}}
+
+
+def _write_manifest(manifest):
+    write_precompressed(_path(MANIFEST), [json.dumps(manifest).encode()], compress=False)
+
+
+def _export_list(directory, params, manifest=None, first_page=1, last_page=None):
+    """
+    Export the pages of a post list from ``first_page`` on (up to ``last_page``).
+
+    Pages past the end of the list are removed when exporting to the end.
+    When ``manifest`` is given, the page of every listed post is recorded.
+    """
+    page = first_page
+    while last_page is None or page <= last_page:
+        data = _export(f'{directory}/pages/{page}.json', '/api/v1/posts/', {**params, 'page': page})
+        if data is None:
+            break
+        if manifest is not None:
+            for post in data['results']:
+                manifest['posts'][str(post['id'])] = {
+                    'slug': post['slug'],
+                    'page': page,
+                    'published_at': post['published_at'],
+                    'categories': [category['slug'] for category in post['categories']],
+                }
+        if not data['next']:
+            page += 1
+            break
+        page += 1
+
+    if last_page is None:
+        # Drop pages left over from a longer list
+        pages_dir = _path(f'{directory}/pages')
+        if os.path.isdir(pages_dir):
+            for name in os.listdir(pages_dir):
+                number = name.split('.', 1)[0]
+                if number.isdigit() and int(number) >= page:
+                    os.remove(os.path.join(pages_dir, name))
+
+
+def _export_post(slug):
+    return _export(f'api/v1/posts/{slug}.json', f'/api/v1/posts/{slug}/')
+
+
+def _export_featured(category_slugs):
+    _export('api/v1/featured-posts.json', '/api/v1/featured-posts/')
+    for slug in category_slugs:
+        _export(f'api/v1/featured-posts/categories/{slug}.json', '/api/v1/featured-posts/', {'category': slug})
+
+
+def export_categories(slugs=None):
+    """Export the category list and the given (default: all) categories with their post lists."""
+    _export('api/v1/categories.json', '/api/v1/categories/')
+    if slugs is None:
+        slugs = list(Category.objects.values_list('slug', flat=True))
+    for slug in slugs:
+        if _export(f'api/v1/categories/{slug}.json', f'/api/v1/categories/{slug}/') is None:
+            shutil.rmtree(_path(f'api/v1/categories/{slug}'), ignore_errors=True)
+            remove_precompressed(_path(f'api/v1/featured-posts/categories/{slug}.json'))
+            continue
+        _export_list(f'api/v1/categories/{slug}', {'category': slug})
+        _export(f'api/v1/featured-posts/categories/{slug}.json', '/api/v1/featured-posts/', {'category': slug})
+    export_home()
+
+
+def export_theme():
+    _export('api/v1/theme.json', '/api/v1/theme/')
+    export_home()
+
+
+def export_home():
+    _export('api/v1/home.json', '/api/v1/home/')
+
+
+def export_all():
+    """Export every list page, post, category and the theme."""
+    manifest = {'posts': {}}
+    _export_list('api/v1/posts', {}, manifest)
+    for slug in Post.objects.filter(status='published').values_list('slug', flat=True).iterator():
+        _export_post(slug)
+    export_categories()
+    _export_featured([])
+    export_theme()
+
+    # Remove details of posts that are no longer published
+    for post_id, entry in _read_manifest()['posts'].items():
+        if post_id not in manifest['posts']:
+            remove_precompressed(_path(f"api/v1/posts/{entry['slug']}.json"))
+    _write_manifest(manifest)
+    return len(manifest['posts'])
+
+
+def _moved(entry, post):
+    """Whether ``post`` may have changed position since ``entry`` was exported."""
+    published_at = entry.get('published_at')
+    return published_at is None or parse_datetime(published_at) != post.published_at
+
+
+def export_for_posts(post_ids, fields=None):
+    """
+    Re-export only what changes to ``post_ids`` affect: their detail files,
+    the list pages that contain them and the featured lists. When a post was
+    added, removed or got a new publish time (compared with the manifest),
+    every later page of the post list and its category lists is rewritten
+    too; joining or leaving a category rewrites that category's list.
+    """
+    manifest = _read_manifest()
+    # Without a change to these fields nothing can have moved
+    may_reorder = fields is None or bool(ORDERING_FIELDS.intersection(fields))
+    published = {
+        post.pk: post
+        for post in Post.objects.filter(pk__in=post_ids, status='published').prefetch_related('categories')
+    }
+
+    pages, reordered = [], False
+    # slug -> pages of the category's list to rewrite, None for all of them
+    category_pages = {}
+    for post_id in post_ids:
+        entry = manifest['posts'].get(str(post_id))
+        old_categories = set(entry['categories']) if entry else set()
+        if entry:
+            pages.append(entry['page'])
+        post = published.get(post_id)
+        if post is None:
+            if entry:
+                remove_precompressed(_path(f"api/v1/posts/{entry['slug']}.json"))
+                manifest['posts'].pop(str(post_id))
+                reordered = True
+            category_pages.update(dict.fromkeys(old_categories))
+            continue
+        if entry and entry['slug'] != post.slug:
+            remove_precompressed(_path(f"api/v1/posts/{entry['slug']}.json"))
+        _export_post(post.slug)
+        categories = {category.slug for category in post.categories.all()}
+        if entry is None or (may_reorder and _moved(entry, post)):
+            reordered = True
+            category_pages.update(dict.fromkeys(categories | old_categories))
+        else:
+            category_pages.update(dict.fromkeys(categories ^ old_categories))
+            for slug in categories & old_categories:
+                if category_pages.get(slug, ()) is not None:
+                    newer = Post.objects.in_category(slug).filter(
+                        status='published', published_at__gt=post.published_at,
+                    ).count()
+                    category_pages.setdefault(slug, set()).add(newer // _page_size() + 1)
+        newer = Post.objects.filter(status='published', published_at__gt=post.published_at).count()
+        pages.append(newer // _page_size() + 1)
+
+    if pages:
+        first_page = min(pages)
+        last_page = None if reordered else max(pages)
+        _export_list('api/v1/posts', {}, manifest, first_page, last_page)
+        for slug, numbers in category_pages.items():
+            directory = f'api/v1/categories/{slug}'
+            if numbers is None:
+                _export_list(directory, {'category': slug})
+            else:
+                for page in sorted(numbers):
+                    _export_list(directory, {'category': slug}, first_page=page, last_page=page)
+        _export_featured(list(category_pages))
+        export_home()
+    _write_manifest(manifest)
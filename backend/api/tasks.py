@@ -0,0 +1,111 @@
+from celery import shared_task
+from django.core.cache import cache
+import logging
+
+from . import cards, snapshot, warming
+from .home import invalidate_home
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_LOCK_KEY = 'api-snapshot-lock'
+SNAPSHOT_LOCK_TIMEOUT = 60 * 10
+WARM_LOCK_KEY = 'api-warm-lock'
+WARM_LOCK_TIMEOUT = 60 * 5
+
+
+def _snapshot_locked(task, description):
+    """Retry ``task`` while another export runs; log once the retries run out."""
+    if task.request.retries >= task.max_retries:
+        logger.error(
+            f"API snapshot still locked, skipped exporting {description}; "
+            "run manage.py export_api_snapshot to bring it up to date"
+        )
+        return f"Skipped snapshot export for {description}"
+    raise task.retry(countdown=10)
+
+
+@shared_task(bind=True, max_retries=10)
+def export_snapshot_for_posts(self, post_ids, fields=None):
+    """
+    Re-export the snapshot files affected by changed posts.
+    """
+    if not cache.add(SNAPSHOT_LOCK_KEY, 1, SNAPSHOT_LOCK_TIMEOUT):
+        return _snapshot_locked(self, f"posts {post_ids}")
+    try:
+        snapshot.export_for_posts(post_ids, fields)
+    finally:
+        cache.delete(SNAPSHOT_LOCK_KEY)
+    return f"Exported snapshot for {len(post_ids)} posts"
+
+
+@shared_task(bind=True, max_retries=10)
+def export_snapshot_categories(self, slugs):
+    """
+    Re-export the category list and the given categories.
+    """
+    if not cache.add(SNAPSHOT_LOCK_KEY, 1, SNAPSHOT_LOCK_TIMEOUT):
+        return _snapshot_locked(self, f"categories {slugs}")
+    try:
+        snapshot.export_categories(slugs)
+    finally:
+        cache.delete(SNAPSHOT_LOCK_KEY)
+    return f"Exported snapshot for {len(slugs)} categories"
+
+
+@shared_task
+def export_snapshot_theme():
+    """
+    Re-export the active theme.
+    """
+    snapshot.export_theme()
+    return "Exported theme snapshot"
+
+
+@shared_task
+def export_full_snapshot():
+    """
+    Export every snapshot file.
+    """
+    count = snapshot.export_all()
+    return f"Exported API snapshot with {count} posts"
+
+
+@shared_task(bind=True, max_retries=10)
+def warm_api_cache(self):
+    """
+    Pre-render the API responses affected by the changes queued since the last run.
+    """
+    if not cache.add(WARM_LOCK_KEY, 1, WARM_LOCK_TIMEOUT):
+        if self.request.retries >= self.max_retries:
+            # Better a cold cache than stale responses until the entries expire
+            logger.warning("API cache warming still locked, discarding the cached responses instead")
+            warming.pop_pending()
+            warming.discard()
+            return "Discarded API cache"
+        raise self.retry(countdown=10)
+    try:
+        post_ids, category_slugs = warming.pop_pending()
+        count = warming.warm(post_ids, category_slugs)
+    finally:
+        cache.delete(WARM_LOCK_KEY)
+    return f"Warmed {count} API responses"
+
+
+@shared_task
+def rebuild_post_cards():
+    """
+    Recreate every stored post card, picking up writes that bypassed the signals.
+    """
+    count = cards.rebuild()
+    return f"Rebuilt {count} post cards"
+
+
+@shared_task
+def refresh_label_cards(post_ids):
+    """
+    Refresh the cards of posts whose category or tag was renamed or deleted.
+    """
+    count = cards.refresh_in_batches(post_ids)
+    invalidate_home()
+    warming.schedule(post_ids=post_ids)
+    return f"Refreshed {count} post cards"
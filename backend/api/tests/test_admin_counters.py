@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from posts.models import Post
+from categories.models import Category
+from newsletter.models import Subscriber
+from utils import counters
+
+
+class AdminCountersTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            title='Draft Post',
+            content='Draft',
+            status='draft',
+            published_at=timezone.now(),
+        )
+        # Prime the cache so later reads come from the incremental updates
+        counters.reconcile()
+
+    def test_counters_follow_saves_and_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title='Published', content='Content', status='published')
+            self.post.status = 'published'
+            self.post.save()
+            Category.objects.create(name='News')
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.get_count('published_posts'), 2)
+            self.assertEqual(counters.get_count('draft_posts'), 0)
+            self.assertEqual(counters.get_count('categories'), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertEqual(counters.get_count('published_posts'), 1)
+
+    def test_rolled_back_writes_leave_counters_alone(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Post.objects.create(title='Published', content='Content', status='published')
+                Post.objects.filter(status='draft').update(status='published')
+                raise RuntimeError
+        self.assertEqual(counters.get_count('published_posts'), 0)
+        self.assertEqual(counters.get_count('draft_posts'), 1)
+
+    def test_counters_follow_queryset_update(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title='Second Draft', content='Draft', status='draft')
+            Post.objects.filter(status='draft').update(status='published')
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.get_count('published_posts'), 2)
+            self.assertEqual(counters.get_count('draft_posts'), 0)
+
+    def test_subscriber_counter_tracks_active_flag(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            subscriber = Subscriber.objects.create(email='reader@example.com')
+        self.assertEqual(counters.get_count('active_subscribers'), 1)
+        Subscriber.objects.filter(pk=subscriber.pk).update(is_active=False)
+        self.assertEqual(counters.get_count('active_subscribers'), 0)
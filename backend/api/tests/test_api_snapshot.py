@@ -0,0 +1,93 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from posts.models import Post
+from categories.models import Category
+from api import cards, snapshot
+
+
+class APISnapshotTestCase(TestCase):
+    def setUp(self):
+        snapshot_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, snapshot_root)
+        settings_override = override_settings(API_SNAPSHOT_ROOT=snapshot_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.root = snapshot_root
+
+        self.category = Category.objects.create(name='Travel')
+        now = timezone.now()
+        self.posts = []
+        for i in range(12):
+            post = Post.objects.create(
+                title=f'Post {i}', content='Content', excerpt='Excerpt',
+                status='published', published_at=now - timedelta(hours=i),
+            )
+            post.categories.add(self.category)
+            self.posts.append(post)
+        snapshot.export_all()
+
+    def read(self, relative_path):
+        with open(os.path.join(self.root, relative_path), 'rb') as f:
+            return json.loads(f.read())
+
+    def test_export_matches_api_responses(self):
+        page = self.read('api/v1/posts/pages/1.json')
+        self.assertEqual(page['results'], self.client.get('/api/v1/posts/').json()['results'])
+        self.assertEqual(page['next'], 'http://localhost:8000/api/v1/posts/?page=2')
+        self.assertEqual(self.read('api/v1/posts/post-0.json')['title'], 'Post 0')
+        self.assertEqual(len(self.read('api/v1/categories/travel/pages/2.json')['results']), 2)
+        self.assertEqual(self.read('api/v1/categories.json'), self.client.get('/api/v1/categories/').json())
+        with gzip.open(os.path.join(self.root, 'api/v1/posts/pages/2.json.gz')) as f:
+            self.assertEqual(len(json.loads(f.read())['results']), 2)
+
+    def test_export_does_not_count_views(self):
+        self.assertEqual(self.client.get('/api/v1/posts/trending/').json(), [])
+
+    def test_unpublishing_removes_detail_and_shrinks_pages(self):
+        post = self.posts[0]
+        Post.objects.filter(pk__in=[self.posts[0].pk, self.posts[1].pk]).update(status='draft')
+        # update() skips the signals that maintain the cards
+        cards.refresh([self.posts[0].pk, self.posts[1].pk])
+        snapshot.export_for_posts([self.posts[0].pk, self.posts[1].pk], ['status'])
+        self.assertFalse(os.path.exists(os.path.join(self.root, f'api/v1/posts/{post.slug}.json')))
+        self.assertEqual(len(self.read('api/v1/posts/pages/1.json')['results']), 10)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'api/v1/posts/pages/2.json')))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'api/v1/categories/travel/pages/2.json')))
+
+    def test_edit_rewrites_only_its_page(self):
+        post = self.posts[11]
+        Post.objects.filter(pk=post.pk).update(title='Renamed')
+        cards.refresh([post.pk])
+        page_1 = os.path.join(self.root, 'api/v1/posts/pages/1.json')
+        mtime = os.stat(page_1).st_mtime_ns
+        snapshot.export_for_posts([post.pk], ['title'])
+        self.assertEqual(os.stat(page_1).st_mtime_ns, mtime)
+        self.assertEqual(self.read('api/v1/posts/pages/2.json')['results'][1]['title'], 'Renamed')
+        self.assertEqual(self.read(f'api/v1/posts/{post.slug}.json')['title'], 'Renamed')
+
+    def test_save_without_new_publish_time_keeps_later_pages(self):
+        post = self.posts[0]
+        Post.objects.filter(pk=post.pk).update(title='Renamed')
+        cards.refresh([post.pk])
+        later = [os.path.join(self.root, path) for path in (
+            'api/v1/posts/pages/2.json', 'api/v1/categories/travel/pages/2.json',
+        )]
+        mtimes = [os.stat(path).st_mtime_ns for path in later]
+        # An admin save sends no update_fields
+        snapshot.export_for_posts([post.pk])
+        self.assertEqual([os.stat(path).st_mtime_ns for path in later], mtimes)
+        self.assertEqual(self.read('api/v1/categories/travel/pages/1.json')['results'][0]['title'], 'Renamed')
+
+        Post.objects.filter(pk=post.pk).update(published_at=timezone.now() - timedelta(days=1))
+        cards.refresh([post.pk])
+        snapshot.export_for_posts([post.pk])
+        self.assertEqual(self.read('api/v1/posts/pages/2.json')['results'][-1]['title'], 'Renamed')
+        self.assertEqual(self.read('api/v1/categories/travel/pages/2.json')['results'][-1]['title'], 'Renamed')
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import throttles
+from posts.models import Post
+
+RATES = {'list': '3/min', 'search': '1/min', 'detail': '2/min', 'subscribe': '30/min', 'subscribe_email': '5/hour'}
+
+
+@override_settings(
+    API_THROTTLE_ENABLED=True,
+    API_INTERNAL_TOKEN='ssr-secret',
+    REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES},
+)
+class ApiThrottlingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        throttles.reset_local_windows()
+        self.client = APIClient()
+        Post.objects.create(title='First', content='Content', status='published')
+
+    def test_list_is_throttled_before_the_view_runs(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/v1/posts/', {'page': 1}).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/posts/', {'page': 2})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+    def test_scopes_are_counted_separately(self):
+        self.assertEqual(self.client.get('/api/v1/posts/', {'search': 'first'}).status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/posts/', {'search': 'second'}).status_code, 429)
+        self.assertEqual(self.client.get('/api/v1/posts/first/').status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/posts/').status_code, 200)
+
+    def test_clients_are_counted_per_ip(self):
+        for _ in range(2):
+            self.client.get('/api/v1/posts/first/')
+        self.assertEqual(self.client.get('/api/v1/posts/first/').status_code, 429)
+        self.assertEqual(self.client.get('/api/v1/posts/first/', REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    def test_forwarded_for_is_only_trusted_behind_proxies(self):
+        for i in range(3):
+            self.client.get('/api/v1/posts/first/', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}')
+        self.assertEqual(self.client.get('/api/v1/posts/first/', HTTP_X_FORWARDED_FOR='203.0.113.9').status_code, 429)
+
+        throttles.reset_local_windows()
+        cache.clear()
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES, 'NUM_PROXIES': 1}):
+            for _ in range(2):
+                self.client.get('/api/v1/posts/first/', HTTP_X_FORWARDED_FOR='198.51.100.7, 203.0.113.1')
+            response = self.client.get('/api/v1/posts/first/', HTTP_X_FORWARDED_FOR='198.51.100.7, 203.0.113.1')
+            self.assertEqual(response.status_code, 429)
+            response = self.client.get('/api/v1/posts/first/', HTTP_X_FORWARDED_FOR='198.51.100.7, 203.0.113.2')
+            self.assertEqual(response.status_code, 200)
+
+    def test_internal_ssr_traffic_is_exempt(self):
+        for _ in range(5):
+            response = self.client.get('/api/v1/posts/first/', HTTP_X_INTERNAL_TOKEN='ssr-secret')
+            self.assertEqual(response.status_code, 200)
+        for _ in range(2):
+            self.client.get('/api/v1/posts/first/', HTTP_X_INTERNAL_TOKEN='wrong')
+        self.assertEqual(self.client.get('/api/v1/posts/first/', HTTP_X_INTERNAL_TOKEN='wrong').status_code, 429)
+
+    def test_non_ascii_internal_token_is_no_match(self):
+        response = self.client.get('/api/v1/posts/first/', HTTP_X_INTERNAL_TOKEN='ssr-s\xe9cret')
+        self.assertEqual(response.status_code, 200)
+        self.client.get('/api/v1/posts/first/', HTTP_X_INTERNAL_TOKEN='ssr-s\xe9cret')
+        response = self.client.get('/api/v1/posts/first/', HTTP_X_INTERNAL_TOKEN='ssr-s\xe9cret')
+        self.assertEqual(response.status_code, 429)
+
+    def test_retry_after_accounts_for_previous_window(self):
+        # The previous window's share of the sliding count decays over the window
+        self.assertEqual(throttles._retry_after(10, 60, 30, 0, 20), 3)
+        self.assertEqual(throttles._retry_after(10, 60, 30, 5, 20), 18)
+        self.assertEqual(throttles._retry_after(10, 60, 30, 10, 0), 36)
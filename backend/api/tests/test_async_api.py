@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.client import AsyncRequestFactory
+from django.utils import timezone
+
+from posts.models import Post
+from categories.models import Category
+from api import async_views
+
+
+class AsyncAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.category = Category.objects.create(name='Travel')
+        for i in range(12):
+            post = Post.objects.create(
+                title=f'Post {i}', content='Content', excerpt='Excerpt',
+                status='published', published_at=timezone.now(), is_featured=i % 2 == 0,
+            )
+            post.categories.add(self.category)
+            post.tags.add('django')
+
+    async def assertSameResponse(self, view, path, params=None, **kwargs):
+        response = await view(self.factory.get(path, params or {}), **kwargs)
+        expected = await self.async_client.get(path, params or {})
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+
+    async def test_post_list_matches_sync_view(self):
+        await self.assertSameResponse(async_views.post_list, '/api/v1/posts/')
+        await self.assertSameResponse(async_views.post_list, '/api/v1/posts/', {'page': 2, 'category': 'travel'})
+        await self.assertSameResponse(async_views.post_list, '/api/v1/posts/', {'search': 'Post 1', 'ordering': 'title'})
+        await self.assertSameResponse(async_views.post_list, '/api/v1/posts/', {'page': 9})
+
+    async def test_detail_and_other_endpoints_match_sync_views(self):
+        await self.assertSameResponse(async_views.post_detail, '/api/v1/posts/post-3/', slug='post-3')
+        await self.assertSameResponse(async_views.post_detail, '/api/v1/posts/missing/', slug='missing')
+        await self.assertSameResponse(async_views.featured_posts, '/api/v1/featured-posts/')
+        await self.assertSameResponse(async_views.category_list, '/api/v1/categories/')
+        await self.assertSameResponse(async_views.category_detail, '/api/v1/categories/travel/', slug='travel')
+        await self.assertSameResponse(async_views.active_theme, '/api/v1/theme/')
+
+    async def test_unsafe_methods_are_rejected(self):
+        response = await async_views.post_list(self.factory.post('/api/v1/posts/'))
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import cards, response_cache, warming
+from api.tasks import WARM_LOCK_KEY, warm_api_cache
+from categories.models import Category
+from posts.models import Post
+
+
+@override_settings(API_CACHE_TIMEOUT=60, API_CACHE_WARM_CONCURRENCY=1, API_CACHE_WARM_LIST_PAGES=1)
+class CacheWarmingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        warming.pop_pending()
+        self.client = APIClient()
+        self.travel = Category.objects.create(name='Travel')
+        self.post = Post.objects.create(title='Original', content='Content', status='published')
+        self.post.categories.add(self.travel)
+
+    def test_responses_are_served_from_cache(self):
+        first = self.client.get('/api/v1/posts/').json()
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/v1/posts/').json()
+        self.assertEqual(first, second)
+        # Uncacheable parameters go to the database
+        with self.assertNumQueries(4):
+            self.client.get('/api/v1/posts/', {'search': 'Original'})
+
+    def test_warming_renders_affected_responses_before_switching_version(self):
+        self.client.get('/api/v1/posts/')
+        Post.objects.filter(pk=self.post.pk).update(title='Edited')
+        # update() skips the signals that maintain the cards
+        cards.refresh([self.post.pk])
+        version = response_cache.current_version()
+
+        requests = warming.affected_requests([self.post.pk])
+        self.assertIn(('/api/v1/posts/original/', {}), requests)
+        self.assertIn(('/api/v1/posts/', {'category': 'travel'}), requests)
+        warming.warm([self.post.pk])
+
+        self.assertEqual(response_cache.current_version(), version + 1)
+        with self.assertNumQueries(0):
+            detail = self.client.get('/api/v1/posts/original/').json()
+            feed = self.client.get('/api/v1/posts/', {'category': 'travel'}).json()
+            latest = self.client.get('/api/v1/posts/').json()
+        self.assertEqual(detail['title'], 'Edited')
+        self.assertEqual(feed['results'][0]['title'], 'Edited')
+        self.assertEqual(latest['results'][0]['title'], 'Edited')
+
+    def test_frontend_query_strings_read_warmed_entries(self):
+        warming.warm([self.post.pk])
+        # getPosts() in frontend/lib/api.ts always adds limit, which the API ignores
+        with self.assertNumQueries(0):
+            latest = self.client.get('/api/v1/posts/?page=1&limit=9').json()
+            feed = self.client.get('/api/v1/posts/?page=1&limit=9&category=travel').json()
+        self.assertEqual(latest['results'][0]['title'], 'Original')
+        self.assertEqual(feed['count'], 1)
+
+    def test_bursts_are_deduplicated_into_one_task(self):
+        with mock.patch.object(warm_api_cache, 'apply_async') as apply_async:
+            warming.schedule(post_ids=[self.post.pk])
+            warming.schedule(post_ids=[self.post.pk], category_slugs=['travel'])
+        apply_async.assert_called_once()
+        self.assertEqual(warming.pop_pending(), ({self.post.pk}, {'travel'}))
+        self.assertEqual(warming.pop_pending(), (set(), set()))
+
+    def test_locked_out_warming_discards_the_cache(self):
+        self.client.get('/api/v1/posts/')
+        version = response_cache.current_version()
+        cache.add(WARM_LOCK_KEY, 1)
+        with self.assertLogs('api.tasks', 'WARNING'):
+            result = warm_api_cache.apply(retries=warm_api_cache.max_retries)
+        self.assertEqual(result.get(), 'Discarded API cache')
+        self.assertGreater(response_cache.current_version(), version)
+        with self.assertNumQueries(2):
+            self.client.get('/api/v1/posts/')
+
+    def test_warming_does_not_undo_a_discard(self):
+        version = response_cache.current_version()
+        render = warming.render
+        rendered = []
+
+        def discard_meanwhile(path, params):
+            if not rendered:
+                warming.discard()
+            rendered.append(path)
+            return render(path, params)
+
+        with mock.patch.object(warming, 'render', side_effect=discard_meanwhile):
+            warming.warm([self.post.pk])
+        self.assertEqual(response_cache.current_version(), version + 2)
+        with self.assertNumQueries(2):
+            self.client.get('/api/v1/posts/')
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from posts.category_counts import CACHE_KEY
+from posts.models import Post
+from categories.models import Category
+
+
+class CategoryFeedTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.travel = Category.objects.create(name='Travel')
+        self.food = Category.objects.create(name='Food')
+        self.both = Post.objects.create(title='Both', content='Content', status='published', is_featured=True)
+        self.both.categories.add(self.travel, self.food)
+        Post.objects.create(title='Travel only', content='Content', status='published').categories.add(self.travel)
+        Post.objects.create(title='Draft', content='Content', status='draft').categories.add(self.travel)
+
+    def test_category_filter_uses_exists_without_duplicates(self):
+        queryset = Post.objects.in_category('travel')
+        self.assertIn('EXISTS', str(queryset.query))
+        self.assertNotIn('DISTINCT', str(queryset.query))
+        self.assertEqual(sorted(post.slug for post in queryset), ['both', 'draft', 'travel-only'])
+
+    def test_category_and_categories_slug_are_the_same_filter(self):
+        by_category = self.client.get('/api/v1/posts/', {'category': 'travel'}).json()
+        by_slug = self.client.get('/api/v1/posts/', {'categories__slug': 'travel'}).json()
+        self.assertEqual(by_category, by_slug)
+        self.assertEqual(by_category['count'], 2)
+        featured = self.client.get('/api/v1/featured-posts/', {'categories__slug': 'food'}).json()
+        self.assertEqual([post['slug'] for post in featured['results']], ['both'])
+
+    @override_settings(CATEGORY_COUNTS_CACHE_TIMEOUT=3600)
+    def test_categories_include_cached_post_counts(self):
+        response = self.client.get('/api/v1/categories/')
+        counts = {category['slug']: category['post_count'] for category in response.json()['results']}
+        self.assertEqual(counts, {'food': 1, 'travel': 2})
+        with self.assertNumQueries(2):
+            self.client.get('/api/v1/categories/')
+
+
+@override_settings(CATEGORY_COUNTS_CACHE_TIMEOUT=3600)
+class CategoryCountInvalidationTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.travel = Category.objects.create(name='Travel')
+        self.post = Post.objects.create(title='Post', content='Content', status='published')
+        self.post.categories.add(self.travel)
+
+    def test_counts_are_invalidated_when_posts_change(self):
+        response = APIClient().get('/api/v1/categories/travel/')
+        self.assertEqual(response.json()['post_count'], 1)
+        self.assertIsNotNone(cache.get(CACHE_KEY))
+        self.post.status = 'draft'
+        self.post.save()
+        self.assertIsNone(cache.get(CACHE_KEY))
+        self.assertEqual(APIClient().get('/api/v1/categories/travel/').json()['post_count'], 0)
@@ -0,0 +1,134 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import re_path
+from django.views.static import serve
+from PIL import Image
+
+from posts.models import ExternalImage, Post
+from utils.storage import content_addressed_storage
+
+# Media as blog.urls serves it with DEBUG on
+urlpatterns = [
+    re_path(r'^media/(?P<path>.*)$', lambda request, path: serve(request, path, document_root=settings.MEDIA_ROOT)),
+]
+
+
+def image_bytes(color=(30, 160, 90)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 20), color).save(buffer, 'jpeg')
+    return buffer.getvalue()
+
+
+class ContentAddressedStorageTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_uploads_are_stored_once_under_their_hash(self):
+        first = Post.objects.create(title='First', content='Content', status='published')
+        first.featured_image.save('Holiday.JPG', ContentFile(image_bytes()))
+        second = Post.objects.create(title='Second', content='Content', status='published')
+        second.side_image_1.save('copy.jpg', ContentFile(image_bytes()))
+        second.side_image_2.save('other.jpg', ContentFile(image_bytes((200, 10, 10))))
+
+        name = first.featured_image.name
+        self.assertRegex(name, r'^hashed/([0-9a-f]{2})/\1[0-9a-f]{62}\.jpg$')
+        self.assertEqual(second.side_image_1.name, name)
+        self.assertNotEqual(second.side_image_2.name, name)
+        self.assertEqual(first.featured_image.url, f'/media/{name}')
+        self.assertEqual(sorted(os.listdir(os.path.dirname(first.featured_image.path))), [
+            os.path.basename(name), os.path.splitext(os.path.basename(name))[0] + '.webp',
+        ])
+
+        # Shared files outlive the rows pointing at them
+        first.featured_image.delete()
+        self.assertTrue(default_storage.exists(name))
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_hashed_media_is_served_immutable(self):
+        name = content_addressed_storage.save('photo.jpg', ContentFile(image_bytes()))
+        default_storage.save('posts/photo.jpg', ContentFile(image_bytes()))
+        response = self.client.get(f'/media/{name}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertIn('Accept', response['Vary'])
+        response = self.client.get('/media/posts/photo.jpg')
+        self.assertNotIn('immutable', response.get('Cache-Control', ''))
+        response = self.client.get('/media/hashed/00/missing.jpg')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('immutable', response.get('Cache-Control', ''))
+
+    def test_rehash_media_moves_existing_files(self):
+        old = default_storage.save('posts/2024/01/01/photo.jpg', ContentFile(image_bytes()))
+        copy = default_storage.save('posts/side_images/photo.jpg', ContentFile(image_bytes()))
+        kept = default_storage.save('posts/side_images/kept.jpg', ContentFile(image_bytes((0, 0, 0))))
+        post = Post.objects.create(
+            title='Old', content='Content', status='published',
+            featured_image=old, side_image_1=copy, side_image_2='https://picsum.photos/800/600',
+        )
+        Post.objects.create(title='Missing', content='Content', featured_image='posts/gone.jpg')
+
+        call_command('rehash_media', '--dry-run', stdout=io.StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.featured_image.name, old)
+
+        out = io.StringIO()
+        call_command('rehash_media', '--delete-originals', stdout=out)
+        self.assertIn('Rehashed 2 image fields, deleted 2 original files.', out.getvalue())
+        post.refresh_from_db()
+        self.assertTrue(post.featured_image.name.startswith('hashed/'))
+        self.assertEqual(post.side_image_1.name, post.featured_image.name)
+        self.assertEqual(post.side_image_2.name, 'https://picsum.photos/800/600')
+        self.assertTrue(os.path.exists(os.path.splitext(post.featured_image.path)[0] + '.webp'))
+        self.assertFalse(default_storage.exists(old))
+        self.assertFalse(default_storage.exists(copy))
+        self.assertTrue(default_storage.exists(kept))
+
+        # Already hashed: nothing to do
+        out = io.StringIO()
+        call_command('rehash_media', stdout=out)
+        self.assertIn('Rehashed 0 image fields', out.getvalue())
+
+    def test_orphaned_hashed_files_are_deleted(self):
+        post = Post.objects.create(title='Kept', content='Content', status='published')
+        post.featured_image.save('kept.jpg', ContentFile(image_bytes()))
+        embedded = content_addressed_storage.save('embedded.jpg', ContentFile(image_bytes((0, 0, 200))))
+        Post.objects.create(title='Embedded', content=f'![photo](/media/{embedded})')
+        mirrored = content_addressed_storage.save('mirrored.jpg', ContentFile(image_bytes((0, 200, 0))))
+        ExternalImage.objects.create(url='https://example.com/photo.jpg', name=mirrored)
+        orphan = content_addressed_storage.save('orphan.jpg', ContentFile(image_bytes((200, 0, 0))))
+        orphan_webp = default_storage.save(os.path.splitext(orphan)[0] + '.webp', ContentFile(b'webp'))
+        day_old = time.time() - 2 * 24 * 60 * 60
+        for root, _, files in os.walk(os.path.join(self.media_root, 'hashed')):
+            for filename in files:
+                os.utime(os.path.join(root, filename), (day_old, day_old))
+        # Just uploaded: its row may not be saved yet
+        recent = content_addressed_storage.save('recent.jpg', ContentFile(image_bytes((9, 9, 9))))
+
+        out = io.StringIO()
+        call_command('rehash_media', '--dry-run', '--delete-orphans', stdout=out)
+        self.assertIn('2 orphaned files would be deleted.', out.getvalue())
+        self.assertTrue(default_storage.exists(orphan))
+
+        out = io.StringIO()
+        call_command('rehash_media', '--delete-orphans', stdout=out)
+        self.assertIn('Deleted 2 orphaned files.', out.getvalue())
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertFalse(default_storage.exists(orphan_webp))
+        kept = post.featured_image.name
+        for name in (kept, os.path.splitext(kept)[0] + '.webp', embedded, mirrored, recent):
+            self.assertTrue(default_storage.exists(name), name)
@@ -0,0 +1,105 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from posts import content_images
+from posts import tasks
+from posts.models import Post
+
+
+def image_file(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 80, 40)).save(buffer, 'jpeg')
+    return ContentFile(buffer.getvalue())
+
+
+@override_settings(CONTENT_IMAGE_WIDTHS=[480, 960, 1440])
+class ContentImagesTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        default_storage.save('django-summernote/2026-10-19/photo.jpg', image_file(1200, 600))
+        default_storage.save('uploads/small.jpg', image_file(300, 200))
+        self.post = Post.objects.create(
+            title='Gallery', status='published',
+            content=(
+                '<p>Intro</p><img style="width: 100%;" src="/media/django-summernote/2026-10-19/photo.jpg">\n\n'
+                '![Small](/media/uploads/small.jpg "Small")\n\n'
+                '<img src="https://picsum.photos/800/600" alt="External">'
+            ),
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_finds_html_and_markdown_images(self):
+        self.assertEqual(content_images.image_sources(self.post.content), [
+            '/media/django-summernote/2026-10-19/photo.jpg',
+            'https://picsum.photos/800/600',
+            '/media/uploads/small.jpg',
+        ])
+
+    @override_settings(CONTENT_IMAGE_SIZES='(max-width: 768px) 100vw, 768px')
+    def test_optimize_post_writes_variants_and_leaves_content_alone(self):
+        content = self.post.content
+        self.assertEqual(content_images.optimize_post(self.post.pk), 2)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.content, content)
+        photo = self.post.content_images['/media/django-summernote/2026-10-19/photo.jpg']
+        self.assertEqual((photo['width'], photo['height']), (1200, 600))
+        self.assertEqual(photo['srcset'], (
+            '/media/django-summernote/2026-10-19/photo-480w.webp 480w, '
+            '/media/django-summernote/2026-10-19/photo-960w.webp 960w, '
+            '/media/django-summernote/2026-10-19/photo.jpg 1200w'
+        ))
+        with default_storage.open('django-summernote/2026-10-19/photo-480w.webp') as f:
+            self.assertEqual(Image.open(f).size, (480, 240))
+        # Smaller than every width: only its own size
+        self.assertEqual(self.post.content_images['/media/uploads/small.jpg']['srcset'], '/media/uploads/small.jpg 300w')
+        self.assertNotIn('https://picsum.photos/800/600', self.post.content_images)
+
+        # Running again changes nothing
+        with self.assertNumQueries(1):
+            content_images.optimize_post(self.post.pk)
+
+        # The API adds the sizes attribute the frontend renders with
+        data = APIClient().get(f'/api/v1/posts/{self.post.slug}/').json()
+        self.assertEqual(data['content'], content)
+        self.assertEqual(
+            data['content_images']['/media/uploads/small.jpg'],
+            {**self.post.content_images['/media/uploads/small.jpg'], 'sizes': '(max-width: 768px) 100vw, 768px'},
+        )
+
+    def test_only_content_changes_queue_processing(self):
+        post = Post.objects.get(pk=self.post.pk)
+        with mock.patch.object(tasks.optimize_content_images, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                post.title = 'Gallery, revisited'
+                post.save()
+            delay.assert_not_called()
+            with self.captureOnCommitCallbacks(execute=True):
+                post.content += '\n\nMore text.'
+                post.save(update_fields=['content'])
+            delay.assert_called_once_with(post.pk)
+
+    def test_concurrent_edit_is_not_overwritten(self):
+        process = content_images.process
+
+        def edit_then_process(content, known=None):
+            Post.objects.filter(pk=self.post.pk).update(content='Rewritten meanwhile')
+            return process(content, known)
+
+        with mock.patch.object(content_images, 'process', side_effect=edit_then_process):
+            content_images.optimize_post(self.post.pk)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.content, 'Rewritten meanwhile')
+        self.assertEqual(self.post.content_images, {})
@@ -0,0 +1,125 @@
+import gzip
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from posts.models import Post
+from categories.models import Category
+from feeds import builder
+from feeds.tasks import FEEDS_LOCK_KEY, rebuild_category_feeds, rebuild_feeds_for_posts
+from utils.files import FILE_MODE
+
+
+class FeedsTestCase(TestCase):
+    def setUp(self):
+        feeds_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, feeds_root)
+        settings_override = override_settings(FEEDS_ROOT=feeds_root, SITEMAP_SHARD_SIZE=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.category = Category.objects.create(name='Travel')
+        self.posts = []
+        for i in range(3):
+            post = Post.objects.create(
+                title=f'Post {i}', content='Content', excerpt='Excerpt',
+                status='published', published_at=timezone.now(),
+            )
+            post.categories.add(self.category)
+            self.posts.append(post)
+        builder.rebuild_all()
+
+    def test_sitemap_index_lists_shards(self):
+        response = self.client.get('/sitemap.xml')
+        self.assertEqual(response.status_code, 200)
+        body = b''.join(response.streaming_content).decode()
+        for shard in {post.pk // 2 for post in self.posts}:
+            self.assertIn(f'/sitemaps/posts-{shard}.xml', body)
+
+    def test_feeds_are_served_precompressed(self):
+        response = self.client.get('/feeds/rss.xml', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertIn('/posts/post-0', body)
+
+        response = self.client.get(f'/feeds/categories/{self.category.slug}/atom.xml')
+        self.assertIn('/posts/post-2', b''.join(response.streaming_content).decode())
+
+    def test_files_are_readable_by_other_users(self):
+        for name in ('sitemap.xml', 'sitemap.xml.gz', 'feeds/rss.xml'):
+            mode = os.stat(builder._path(name)).st_mode & 0o777
+            # 0644 under the usual umask, not mkstemp's 0600
+            self.assertEqual(mode, FILE_MODE)
+
+    def test_renaming_a_category_removes_its_old_feed(self):
+        with mock.patch.object(rebuild_category_feeds, 'delay', side_effect=rebuild_category_feeds) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.category.slug = 'trips'
+                self.category.save()
+        delay.assert_called_once_with(['travel', 'trips'])
+        self.assertFalse(os.path.exists(builder._path('feeds/categories/travel')))
+        self.assertTrue(os.path.exists(builder._path('feeds/categories/trips/rss.xml')))
+        self.assertEqual(list(builder._read_manifest()), ['trips'])
+
+    def test_locked_rebuilds_give_up_with_a_warning(self):
+        cache.add(FEEDS_LOCK_KEY, 1)
+        self.addCleanup(cache.delete, FEEDS_LOCK_KEY)
+        with self.assertLogs('feeds.tasks', 'WARNING'):
+            result = rebuild_feeds_for_posts.apply(
+                args=[[self.posts[0].pk]], retries=rebuild_feeds_for_posts.max_retries,
+            )
+        self.assertEqual(result.get(), f'Skipped rebuilding feeds for posts [{self.posts[0].pk}]')
+
+    def test_unknown_shards_are_not_built(self):
+        last_shard = max(post.pk for post in self.posts) // 2
+        for shard in (last_shard + 1, 10 ** 30):
+            response = self.client.get(f'/sitemaps/posts-{shard}.xml')
+            self.assertEqual(response.status_code, 404)
+        Post.objects.filter(pk__in=[post.pk for post in self.posts if post.pk // 2 == last_shard]).update(status='draft')
+        builder.build_sitemap_index()
+        response = self.client.get(f'/sitemaps/posts-{last_shard}.xml')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            sorted(os.listdir(builder._path('sitemaps'))),
+            sorted(['pages.xml', 'pages.xml.gz'] + [
+                name for post in self.posts if post.pk // 2 != last_shard
+                for name in (f'posts-{post.pk // 2}.xml', f'posts-{post.pk // 2}.xml.gz')
+            ]),
+        )
+
+    def test_unpublishing_rewrites_only_affected_files(self):
+        food = Category.objects.create(name='Food')
+        Post.objects.create(title='Recipe', content='Content', status='published').categories.add(food)
+        builder.rebuild_all()
+        shards = {}
+        for pk, slug in Post.objects.values_list('pk', 'slug'):
+            shards.setdefault(pk // 2, []).append(slug)
+        post = next(post for post in self.posts if len(shards[post.pk // 2]) > 1)
+        shard = post.pk // 2
+
+        def files():
+            unaffected = ['sitemaps/pages.xml', f'feeds/categories/{food.slug}/rss.xml']
+            unaffected += [builder.POSTS_SITEMAP.format(shard=other) for other in shards if other != shard]
+            return {
+                name: (os.stat(builder._path(name)).st_ino, os.stat(builder._path(name)).st_mtime_ns)
+                for name in unaffected
+            }
+
+        before = files()
+        Post.objects.filter(pk=post.pk).update(status='draft')
+        builder.rebuild_for_posts([post.pk])
+
+        with open(builder._path(builder.POSTS_SITEMAP.format(shard=shard))) as f:
+            sitemap = f.read()
+        self.assertNotIn(f'/posts/{post.slug}<', sitemap)
+        for slug in shards[shard]:
+            if slug != post.slug:
+                self.assertIn(f'/posts/{slug}<', sitemap)
+        with open(builder._path(f'feeds/categories/{self.category.slug}/rss.xml')) as f:
+            self.assertNotIn(f'/posts/{post.slug}<', f.read())
+        self.assertEqual(files(), before)
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.home import HOME_CACHE_KEY
+from posts.models import Post
+from categories.models import Category
+
+
+class HomeAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Travel')
+        for i in range(12):
+            post = Post.objects.create(
+                title=f'Post {i}', content='Content', status='published',
+                published_at=timezone.now(), is_featured=i < 3,
+            )
+            post.categories.add(self.category)
+
+    def test_home_matches_individual_endpoints(self):
+        data = self.client.get('/api/v1/home/').json()
+        posts = self.client.get('/api/v1/posts/').json()
+        self.assertEqual(data['posts']['results'], posts['results'])
+        self.assertEqual(data['posts']['count'], 12)
+        self.assertTrue(data['posts']['next'].endswith('/api/v1/posts/?page=2'))
+        self.assertEqual(data['featured_posts'], self.client.get('/api/v1/featured-posts/').json()['results'])
+        self.assertEqual(data['categories'], self.client.get('/api/v1/categories/').json()['results'])
+        self.assertIsNone(data['theme'])
+
+    @override_settings(HOME_CACHE_TIMEOUT=600)
+    def test_home_is_served_from_one_cache_entry(self):
+        self.client.get('/api/v1/home/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/v1/home/')
+
+    def test_home_is_not_cached_without_a_shared_cache(self):
+        self.client.get('/api/v1/home/')
+        self.assertIsNone(cache.get(HOME_CACHE_KEY))
+
+    @override_settings(HOME_CACHE_TIMEOUT=600)
+    def test_home_is_invalidated_when_posts_change(self):
+        self.client.get('/api/v1/home/')
+        post = Post.objects.get(slug='post-11')
+        post.title = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        data = self.client.get('/api/v1/home/').json()
+        self.assertIn('Renamed', [card['title'] for card in data['posts']['results']])
@@ -0,0 +1,162 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from posts import image_mirror
+from posts.models import ExternalImage, Post, PostCard
+
+
+def png_bytes(size=(40, 20)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (20, 120, 220)).save(buffer, 'png')
+    return buffer.getvalue()
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """Stand-in for an image host."""
+    requests = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append(self.path)
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            time.sleep(0.05)
+            if self.path.startswith('/slow'):
+                time.sleep(1)
+            if self.path.startswith('/page'):
+                self.reply(b'<html></html>', 'text/html')
+            elif self.path.startswith('/huge'):
+                self.reply(b'\0' * 5000, 'image/png')
+            elif self.path.startswith('/missing'):
+                self.send_error(404)
+            else:
+                self.reply(png_bytes(), 'image/png')
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def reply(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except BrokenPipeError:
+            # The client timed out
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(
+    EXTERNAL_IMAGE_CONCURRENCY=2, EXTERNAL_IMAGE_TIMEOUT=0.5, EXTERNAL_IMAGE_MAX_BYTES=1000,
+)
+class ImageMirrorTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        ImageHandler.requests, ImageHandler.max_active = [], 0
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_canonical_url_repairs_mangled_values(self):
+        self.assertEqual(image_mirror.canonical_url('https://picsum.photos/800/600?random=1'), 'https://picsum.photos/800/600?random=1')
+        self.assertEqual(image_mirror.canonical_url('https:/picsum.photos/800/600'), 'https://picsum.photos/800/600')
+        self.assertEqual(image_mirror.canonical_url('/media/https%3A/images.pexels.com/a.jpg'), 'https://images.pexels.com/a.jpg')
+        self.assertIsNone(image_mirror.canonical_url('posts/2026/10/19/photo.jpg'))
+
+    def test_external_images_are_mirrored_once_and_served_locally(self):
+        post = Post.objects.create(
+            title='Mirrored', content='Content', status='published',
+            featured_image=f'{self.base}/photo.png',
+            # The same image, mangled
+            side_image_1=f'{self.base.replace("http://", "http:/")}/photo.png',
+        )
+        other = Post.objects.create(
+            title='Other', content='Content', status='published', featured_image=f'{self.base}/photo.png',
+        )
+        self.assertEqual(image_mirror.mirror_pending(), 3)
+        self.assertEqual(ImageHandler.requests, ['/photo.png'])
+
+        post.refresh_from_db()
+        other.refresh_from_db()
+        name = ExternalImage.objects.get(url=f'{self.base}/photo.png').name
+        self.assertTrue(name.startswith('hashed/') and name.endswith('.png'))
+        self.assertEqual(post.featured_image.name, name)
+        self.assertEqual(post.side_image_1.name, name)
+        self.assertEqual(other.featured_image.name, name)
+        # Saved like an upload: WebP copy and a real placeholder on the card
+        self.assertTrue(os.path.exists(os.path.splitext(post.featured_image.path)[0] + '.webp'))
+        card = PostCard.objects.get(pk=post.pk).payload
+        self.assertEqual(card['featured_image'], f'/media/{name}')
+        self.assertTrue(card['blur_data_url'].startswith('data:image/jpeg'))
+        data = APIClient().get(f'/api/v1/posts/{post.slug}/').json()
+        self.assertEqual(data['side_image_1'], f'/media/{name}')
+
+        # Nothing left to do
+        self.assertEqual(image_mirror.mirror_pending(), 0)
+        self.assertEqual(len(ImageHandler.requests), 1)
+
+    def test_failures_are_recorded_and_fields_kept(self):
+        urls = [f'{self.base}/{path}' for path in ('page', 'huge', 'missing', 'slow.png', 'a.png', 'b.png')]
+        for i, url in enumerate(urls):
+            Post.objects.create(title=f'Post {i}', content='Content', status='published', featured_image=url)
+        self.assertEqual(image_mirror.mirror_pending(), 2)
+        self.assertLessEqual(ImageHandler.max_active, 2)
+
+        errors = dict(ExternalImage.objects.values_list('url', 'error'))
+        self.assertEqual(errors[urls[0]], 'Not an image (text/html)')
+        self.assertIn('Too large', errors[urls[1]])
+        self.assertIn('404', errors[urls[2]])
+        self.assertEqual(errors[urls[3]], 'Timed out')
+        self.assertEqual(errors[urls[4]], '')
+        self.assertEqual(Post.objects.get(title='Post 0').featured_image.name, urls[0])
+
+        # Failed URLs wait for the retry interval
+        ImageHandler.requests = []
+        image_mirror.mirror_pending()
+        self.assertEqual(ImageHandler.requests, [])
+        with override_settings(EXTERNAL_IMAGE_RETRY_INTERVAL=0):
+            image_mirror.mirror_pending()
+        self.assertEqual(len(ImageHandler.requests), 4)
+        self.assertEqual(ExternalImage.objects.get(url=urls[0]).attempts, 2)
+
+    def test_uploads_are_left_alone(self):
+        default_storage.save('posts/photo.png', ContentFile(png_bytes()))
+        Post.objects.create(title='Upload', content='Content', status='published', featured_image='posts/photo.png')
+        self.assertEqual(image_mirror.pending_fields(), [])
+        self.assertFalse(image_mirror.has_external_images('posts.Post', Post.objects.values('pk')))
@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+from unittest import mock
+
+from posts.models import Post
+from categories.models import Category
+from posts.signals import posts_changed
+from utils import paginator
+
+
+class PostAdminChangelistTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        self.category = Category.objects.create(name='Travel')
+        self.post = Post.objects.create(
+            title='Walking in Lisbon',
+            content='A long walk by the river.',
+            status='published',
+            published_at=timezone.now(),
+        )
+        self.post.categories.add(self.category)
+        Post.objects.create(title='Cooking at home', content='Pasta.', status='draft')
+
+    def test_search_matches_title_and_content(self):
+        response = self.client.get('/admin/posts/post/', {'q': 'river'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['cl'].result_list), [self.post])
+
+    def test_row_estimate_is_cached_between_page_loads(self):
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.object(paginator, '_explain_rows', return_value=50000) as explain:
+            counts = [
+                paginator.EstimatedCountPaginator(Post.objects.all(), 20).count
+                for _ in range(2)
+            ]
+        self.assertEqual(counts, [50000, 50000])
+        self.assertEqual(explain.call_count, 1)
+
+    def test_cached_filters_render_and_filter(self):
+        month = self.post.published_at.strftime('%Y-%m')
+        response = self.client.get('/admin/posts/post/', {'published_month': month})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self.post, response.context['cl'].result_list)
+        response = self.client.get('/admin/posts/post/', {'categories__id__exact': self.category.pk})
+        self.assertEqual(list(response.context['cl'].result_list), [self.post])
+
+    def _run_action(self, action, posts):
+        return self.client.post('/admin/posts/post/', {
+            'action': action,
+            '_selected_action': [post.pk for post in posts],
+        })
+
+    def test_bulk_actions_send_one_batched_signal(self):
+        drafts = [Post.objects.create(title=f'Draft {i}', content='Draft') for i in range(5)]
+        batches = []
+
+        def receiver(sender, post_ids, fields, **kwargs):
+            batches.append((sorted(post_ids), fields))
+
+        posts_changed.connect(receiver)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                self._run_action('publish_selected_posts', drafts)
+        finally:
+            posts_changed.disconnect(receiver)
+        self.assertEqual(batches, [(sorted(p.pk for p in drafts), ['status'])])
+        self.assertEqual(Post.objects.filter(status='published').count(), 6)
+
+    def test_schedule_and_move_to_category(self):
+        future = Post.objects.create(
+            title='Future', content='Soon', status='draft',
+            published_at=timezone.now() + timedelta(days=1),
+        )
+        response = self._run_action('schedule_selected_posts', [future, self.post])
+        self.assertEqual(response.status_code, 302)
+        future.refresh_from_db()
+        self.assertEqual(future.status, 'draft')
+
+        food = Category.objects.create(name='Food')
+        self._run_action(f'move_to_category_{food.pk}', [future, self.post])
+        self.assertEqual(list(self.post.categories.all()), [food])
+        self.assertEqual(list(future.categories.all()), [food])
@@ -0,0 +1,38 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from categories.models import Category
+
+
+class PostBatchAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name='Travel')
+        self.posts = []
+        for title in ('First', 'Second', 'Third'):
+            post = Post.objects.create(title=title, content='Content', status='published')
+            post.categories.add(category)
+            self.posts.append(post)
+        self.draft = Post.objects.create(title='Draft', content='Content', status='draft')
+
+    def test_batch_by_slug_keeps_request_order_and_reports_missing(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/posts/batch/', {'slugs': 'third,first,draft,nope,first'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([post['slug'] for post in data['results']], ['third', 'first'])
+        self.assertEqual(data['missing'], ['draft', 'nope'])
+        self.assertEqual(data['results'][0]['categories'][0]['slug'], 'travel')
+
+    def test_batch_by_id(self):
+        response = self.client.get('/api/v1/posts/batch/', {'ids': f'{self.posts[1].pk},{self.draft.pk}'})
+        data = response.json()
+        self.assertEqual([post['id'] for post in data['results']], [self.posts[1].pk])
+        self.assertEqual(data['missing'], [self.draft.pk])
+
+    def test_batch_rejects_invalid_requests(self):
+        self.assertEqual(self.client.get('/api/v1/posts/batch/').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/posts/batch/', {'ids': 'a,b'}).status_code, 400)
+        slugs = ','.join(f'post-{i}' for i in range(51))
+        self.assertEqual(self.client.get('/api/v1/posts/batch/', {'slugs': slugs}).status_code, 400)
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from taggit.models import Tag
+
+from api import cards
+from api.tasks import refresh_label_cards
+from api.serializers import PostListSerializer
+from posts.models import Post, PostCard
+from categories.models import Category
+
+
+class PostCardTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.travel = Category.objects.create(name='Travel')
+        now = timezone.now()
+        self.posts = []
+        for i in range(3):
+            post = Post.objects.create(
+                title=f'Post {i}', content='Content', status='published',
+                published_at=now - timedelta(hours=i), is_featured=i == 0,
+            )
+            post.categories.add(self.travel)
+            post.tags.add('django')
+            self.posts.append(post)
+        Post.objects.create(title='Draft', content='Content', status='draft')
+
+    def card(self, post):
+        return PostCard.objects.get(pk=post.pk).payload
+
+    def test_cards_hold_the_list_payload_of_published_posts(self):
+        post = Post.objects.prefetch_related('categories', 'tags').get(pk=self.posts[0].pk)
+        self.assertEqual(self.card(post), PostListSerializer(post).data)
+        self.assertEqual(PostCard.objects.count(), 3)
+
+    def test_lists_match_the_queryset_path(self):
+        # ?ordering= isn't served from cards
+        for path, params in [
+            ('/api/v1/posts/', {}),
+            ('/api/v1/featured-posts/', {}),
+            ('/api/v1/featured-posts/', {'category': 'travel'}),
+        ]:
+            with self.subTest(path=path, params=params):
+                from_cards = self.client.get(path, params).json()
+                from_posts = self.client.get(path, {**params, 'ordering': '-published_at'}).json()
+                self.assertEqual(from_cards['results'], from_posts['results'])
+                self.assertEqual(from_cards['count'], from_posts['count'])
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/posts/', {'category': 'travel', 'fields': 'slug,tags'})
+        self.assertEqual(response.json()['results'][0], {'slug': 'post-0', 'tags': ['django']})
+
+    def test_frontend_query_string_is_served_from_cards(self):
+        # getPosts() in frontend/lib/api.ts always adds limit, which the API ignores
+        with self.assertNumQueries(2) as queries:
+            response = self.client.get('/api/v1/posts/?page=1&limit=9&category=travel')
+        self.assertIn('posts_postcard', queries.captured_queries[-1]['sql'])
+        self.assertEqual([post['slug'] for post in response.json()['results']], ['post-0', 'post-1', 'post-2'])
+
+    def test_writes_refresh_cards(self):
+        post = self.posts[1]
+        post.title = 'Renamed'
+        post.save()
+        self.assertEqual(self.card(post)['title'], 'Renamed')
+        post.tags.add('python')
+        self.assertEqual(sorted(self.card(post)['tags']), ['django', 'python'])
+        post.status = 'draft'
+        post.save()
+        self.assertFalse(PostCard.objects.filter(pk=post.pk).exists())
+
+    def test_cards_roll_back_with_the_post(self):
+        post = self.posts[1]
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                post.title = 'Renamed'
+                post.save()
+                raise RuntimeError
+        self.assertEqual(self.card(post)['title'], 'Post 1')
+
+    def test_category_and_tag_edits_refresh_cards(self):
+        with mock.patch.object(refresh_label_cards, 'delay', side_effect=refresh_label_cards) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.travel.name = 'Trips'
+                self.travel.save()
+                # Not inside the admin request's transaction
+                delay.assert_not_called()
+            self.assertEqual(self.card(self.posts[0])['categories'][0]['name'], 'Trips')
+            tag = Tag.objects.get(name='django')
+            with self.captureOnCommitCallbacks(execute=True):
+                tag.name = 'Django'
+                tag.save()
+            self.assertEqual(self.card(self.posts[0])['tags'], ['Django'])
+            with self.captureOnCommitCallbacks(execute=True):
+                self.travel.delete()
+                tag.delete()
+        self.assertEqual(self.card(self.posts[0])['categories'], [])
+        self.assertEqual(self.card(self.posts[0])['tags'], [])
+
+    def test_label_refresh_runs_in_batches(self):
+        with mock.patch.object(cards, 'REBUILD_BATCH_SIZE', 2), mock.patch.object(cards, 'refresh') as refresh:
+            refresh_label_cards([post.pk for post in self.posts])
+        self.assertEqual([len(call.args[0]) for call in refresh.call_args_list], [2, 1])
+
+    def test_rebuild_command(self):
+        Post.objects.filter(pk=self.posts[2].pk).update(status='draft')
+        out = StringIO()
+        call_command('rebuild_post_cards', '--if-empty', stdout=out)
+        self.assertIn('skipping', out.getvalue())
+        self.assertTrue(PostCard.objects.filter(pk=self.posts[2].pk).exists())
+        PostCard.objects.all().delete()
+        call_command('rebuild_post_cards', '--if-empty', stdout=out)
+        self.assertEqual(set(PostCard.objects.values_list('pk', flat=True)), {self.posts[0].pk, self.posts[1].pk})
+
+    def test_refresh_reuses_placeholders_of_unchanged_images(self):
+        Post.objects.filter(pk=self.posts[0].pk).update(featured_image='posts/missing.jpg')
+        cards.refresh([self.posts[0].pk])
+        card = PostCard.objects.get(pk=self.posts[0].pk)
+        card.payload['blur_data_url'] = 'data:stored'
+        card.save()
+        cards.refresh([self.posts[0].pk])
+        self.assertEqual(self.card(self.posts[0])['blur_data_url'], 'data:stored')
@@ -0,0 +1,45 @@
+from io import StringIO
+import threading
+import time
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from blog import warmup
+from utils.management.commands.profile_imports import parse_importtime
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     PIL._version
+import time:       200 |        300 |   PIL
+import time:       400 |        400 |   blog.settings
+import time:        50 |        750 | blog
+import time:        10 |         10 | json
+"""
+
+
+class ProfileImportsTestCase(SimpleTestCase):
+    def test_parse_importtime_links_children_to_parents(self):
+        entries = {name: (self_us, cumulative_us, parent) for name, self_us, cumulative_us, parent in parse_importtime(IMPORTTIME_OUTPUT)}
+        self.assertEqual(entries['PIL._version'], (100, 100, 'PIL'))
+        self.assertEqual(entries['PIL'], (200, 300, 'blog'))
+        self.assertEqual(entries['blog.settings'][2], 'blog')
+        self.assertIsNone(entries['json'][2])
+
+    def test_command_reports_import_chain(self):
+        out = StringIO()
+        call_command('profile_imports', target='setup', limit=5, module=['django.apps'], stdout=out)
+        self.assertIn('modules imported in', out.getvalue())
+        self.assertIn('django.apps is imported via', out.getvalue())
+
+
+class WorkerWarmUpTestCase(SimpleTestCase):
+    def test_slow_warm_up_is_abandoned(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        with mock.patch.object(warmup, '_render_endpoints', side_effect=release.wait):
+            started = time.monotonic()
+            with self.assertLogs('blog.warmup', 'WARNING'):
+                warmup.warm_up(0.05)
+        self.assertLess(time.monotonic() - started, 1)
@@ -0,0 +1,162 @@
+"""
+Query budget and plan checks for the hot paths.
+
+Every hot path has a fixed number of queries (any database). On PostgreSQL
+(TEST_DATABASE_URL) each captured statement is also EXPLAINed against a
+seeded archive and must not sequentially scan a large table, except for
+counts that keep most of the table anyway and the paths in SEQ_SCAN_PATHS.
+"""
+from datetime import timedelta
+import unittest
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from taggit.models import Tag, TaggedItem
+
+from api import cards
+from categories.models import Category
+from posts.models import Post
+from posts.tasks import publish_scheduled_posts
+from utils import counters
+
+
+def admin_counts(client):
+    for count in counters.COUNTERS.values():
+        count()
+
+
+# name -> (run, number of queries)
+HOT_PATHS = {
+    # count and page of the stored cards (api.cards)
+    'list': (lambda client: client.get('/api/v1/posts/'), 2),
+    'featured': (lambda client: client.get('/api/v1/featured-posts/'), 2),
+    'category': (lambda client: client.get('/api/v1/posts/', {'category': 'rare'}), 2),
+    # count, page, categories and tags prefetches
+    'search': (lambda client: client.get('/api/v1/posts/', {'search': 'needle'}), 4),
+    # post and its prefetches
+    'detail': (lambda client: client.get('/api/v1/posts/post-7/'), 3),
+    # count, select for the log, then in a transaction the update with its
+    # status counts (savepoint) and the card refresh: posts, two prefetches,
+    # old placeholders and the upsert
+    'scheduled-publish': (lambda client: publish_scheduled_posts(), 13),
+    'admin-counts': (admin_counts, len(counters.COUNTERS)),
+}
+
+# ?search= is a substring match over content as well, which no index serves
+SEQ_SCAN_PATHS = {'search'}
+LARGE_TABLES = ('posts_post', 'posts_post_categories', 'taggit_taggeditem', 'posts_postcard')
+# Tables smaller than this may be scanned; the planner rightly prefers it
+ROW_THRESHOLD = 1000
+# A count keeping at least this share of a table reads most of it whatever the plan
+COUNT_SCAN_FRACTION = 0.5
+
+
+def seed_posts(total, rare_every=400, featured_every=500, draft_every=200, needle_every=4000):
+    """Bulk-create an archive of ``total`` posts with categories, tags and cards."""
+    now = timezone.now()
+    common = Category.objects.create(name='Common')
+    rare = Category.objects.create(name='Rare')
+    tags = Tag.objects.bulk_create([Tag(name=f'tag-{i}', slug=f'tag-{i}') for i in range(20)])
+    posts = []
+    for i in range(total):
+        draft = i % draft_every == 0
+        published_at = now - timedelta(minutes=i)
+        if draft and i % (draft_every * 2):
+            # Every other draft is scheduled for tomorrow; the rest are due
+            published_at = now + timedelta(days=1)
+        posts.append(Post(
+            title=f'Needle post {i}' if i % needle_every == 1 else f'Post {i}',
+            slug=f'post-{i}',
+            content=f'Body of post {i}',
+            status='draft' if draft else 'published',
+            is_featured=i % featured_every == 3,
+            published_at=published_at,
+        ))
+    posts = Post.objects.bulk_create(posts, batch_size=2000)
+    through = Post.categories.through
+    through.objects.bulk_create([
+        through(post_id=post.pk, category_id=(rare if i % rare_every == 1 else common).pk)
+        for i, post in enumerate(posts)
+    ], batch_size=2000)
+    content_type = ContentType.objects.get_for_model(Post)
+    TaggedItem.objects.bulk_create([
+        TaggedItem(tag=tags[i % len(tags)], content_type=content_type, object_id=post.pk)
+        for i, post in enumerate(posts)
+    ], batch_size=2000)
+    cards.rebuild()
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+class HotPathQueryCountTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_posts(40, rare_every=4, featured_every=5, draft_every=10, needle_every=20)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_hot_path_query_counts(self):
+        for name, (run, queries) in HOT_PATHS.items():
+            with self.subTest(name):
+                with self.assertNumQueries(queries):
+                    response = run(self.client)
+                if hasattr(response, 'status_code'):
+                    self.assertEqual(response.status_code, 200)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Query plans are checked on PostgreSQL (set TEST_DATABASE_URL)')
+class HotPathQueryPlanTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_posts(20000)
+        with connection.cursor() as cursor:
+            for table in LARGE_TABLES:
+                cursor.execute(f'ANALYZE {table}')
+            cursor.execute('SELECT relname, reltuples FROM pg_class WHERE relname IN %s', [LARGE_TABLES])
+            cls.table_rows = dict(cursor.fetchall())
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            return cursor.fetchone()[0][0]['Plan']
+
+    def large_seq_scans(self, sql):
+        is_count = sql.startswith('SELECT COUNT(')
+        for node in plan_nodes(self.explain(sql)):
+            rows = self.table_rows.get(node.get('Relation Name'), 0)
+            if node['Node Type'] != 'Seq Scan' or rows < ROW_THRESHOLD:
+                continue
+            if is_count and node['Plan Rows'] >= rows * COUNT_SCAN_FRACTION:
+                continue
+            yield f"{node['Relation Name']} ({node['Plan Rows']:.0f} of {rows:.0f} rows)"
+
+    def test_hot_paths_avoid_sequential_scans(self):
+        for name, (run, _) in HOT_PATHS.items():
+            if name in SEQ_SCAN_PATHS:
+                continue
+            with self.subTest(name):
+                with CaptureQueriesContext(connection) as captured:
+                    run(self.client)
+                statements = [
+                    query['sql'] for query in captured.captured_queries
+                    if query['sql'].startswith(('SELECT', 'UPDATE'))
+                ]
+                self.assertTrue(statements)
+                for sql in statements:
+                    scans = list(self.large_seq_scans(sql))
+                    self.assertFalse(scans, f'Sequential scan on {", ".join(scans)}:\n{sql}')
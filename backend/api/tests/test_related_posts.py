@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from categories.models import Category
+from search.models import RelatedPosts
+from search.tasks import INDEX_LOCK_KEY, update_related_posts
+from search import similarity
+from search.similarity import SimilarityIndex, rebuild_index, update_posts
+
+
+class FakeRedis:
+    """The string and hash commands the index store uses, in memory."""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value.encode()
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({str(k).encode(): v for k, v in mapping.items()})
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def unlink(self, key):
+        self.hashes.pop(key, None)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+class RelatedPostsAPITestCase(TestCase):
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.index_dir)
+        settings_override = override_settings(RELATED_POSTS_INDEX_DIR=self.index_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        travel = Category.objects.create(name='Travel')
+        food = Category.objects.create(name='Food')
+        self.lisbon = self._post('Walking in Lisbon', 'Trams, hills and river views in Lisbon.', travel)
+        self.porto = self._post('A weekend in Porto', 'River views, hills and trams in Porto.', travel)
+        self.pasta = self._post('Fresh pasta at home', 'Flour, eggs and a rolling pin.', food)
+
+    def _post(self, title, content, category):
+        post = Post.objects.create(title=title, content=content, status='published')
+        post.categories.add(category)
+        return post
+
+    def test_related_posts_are_ranked_by_similarity(self):
+        rebuild_index()
+        response = self.client.get(f'/api/v1/posts/{self.lisbon.slug}/related/')
+        self.assertEqual(response.status_code, 200)
+        slugs = [post['slug'] for post in response.json()]
+        self.assertEqual(slugs[0], self.porto.slug)
+        self.assertNotIn(self.lisbon.slug, slugs)
+
+    def test_incremental_update_adds_new_post_to_neighbours(self):
+        rebuild_index()
+        seville = self._post('Hills of Seville', 'Trams and river views in Seville.', self.lisbon.categories.first())
+        update_posts([seville.pk])
+        self.assertIn(seville.pk, RelatedPosts.objects.get(post=self.lisbon).related_ids)
+        self.assertTrue(RelatedPosts.objects.filter(post=seville).exists())
+
+    def test_updates_only_store_changed_rows(self):
+        rebuild_index()
+        base = SimilarityIndex.load()
+        seville = self._post('Hills of Seville', 'Trams and river views in Seville.', self.lisbon.categories.first())
+        with mock.patch.object(SimilarityIndex, 'save') as save:
+            update_posts([seville.pk])
+            self.pasta.status = 'draft'
+            self.pasta.save()
+            update_posts([self.pasta.pk])
+        save.assert_not_called()
+        # Another worker sees the base with the delta applied
+        similarity._base_cache.clear()
+        index = SimilarityIndex.load()
+        self.assertEqual(
+            sorted(index.post_ids.tolist()),
+            sorted(set(base.post_ids.tolist()) - {self.pasta.pk} | {seville.pk}),
+        )
+        row = index.post_ids.tolist().index(self.lisbon.pk)
+        self.assertEqual((index.matrix[row] != base.matrix[base.post_ids.tolist().index(self.lisbon.pk)]).nnz, 0)
+
+    def test_updates_that_give_up_are_indexed_by_the_next_run(self):
+        rebuild_index()
+        seville = self._post('Hills of Seville', 'Trams and river views in Seville.', self.lisbon.categories.first())
+        cache.add(INDEX_LOCK_KEY, 1)
+        self.addCleanup(cache.delete, INDEX_LOCK_KEY)
+        with self.assertLogs('search.tasks', 'WARNING'):
+            result = update_related_posts.apply(args=[[seville.pk]], retries=update_related_posts.max_retries)
+        self.assertEqual(result.get(), 'Queued 1 posts for the next index run')
+        self.assertFalse(RelatedPosts.objects.filter(post=seville).exists())
+
+        cache.delete(INDEX_LOCK_KEY)
+        update_related_posts.apply(args=[[self.pasta.pk]])
+        self.assertTrue(RelatedPosts.objects.filter(post=seville).exists())
+
+    def test_index_is_shared_through_redis(self):
+        redis = FakeRedis()
+        with mock.patch('search.similarity.get_redis', return_value=redis):
+            rebuild_index()
+            self.assertEqual(os.listdir(self.index_dir), [])
+            generation = json.loads(redis.values[similarity.RedisIndexStore.META_KEY])['generation']
+            base_key = similarity.RedisIndexStore('').base_key(generation)
+            self.assertEqual(len(redis.hashes[base_key]), 3)
+
+            seville = self._post('Hills of Seville', 'Trams and river views in Seville.', self.lisbon.categories.first())
+            with mock.patch('search.similarity.rebuild_index') as rebuild:
+                update_posts([seville.pk])
+            rebuild.assert_not_called()
+            self.assertEqual(len(redis.hashes[base_key]), 3)
+            self.assertEqual(list(redis.hashes[similarity.RedisIndexStore.DELTA_KEY]), [str(seville.pk).encode()])
+
+            # A rebuild replaces the base and clears the delta
+            rebuild_index()
+            self.assertNotIn(base_key, redis.hashes)
+            self.assertNotIn(similarity.RedisIndexStore.DELTA_KEY, redis.hashes)
+        self.assertIn(seville.pk, RelatedPosts.objects.get(post=self.lisbon).related_ids)
+
+    def test_unindexed_post_falls_back_to_shared_category(self):
+        response = self.client.get(f'/api/v1/posts/{self.lisbon.slug}/related/')
+        self.assertEqual([post['slug'] for post in response.json()], [self.porto.slug])
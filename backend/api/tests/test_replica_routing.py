@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.db.utils import OperationalError
+
+from blog import db_routers
+from blog.db_routers import ReplicaRouter, use_replicas, reset_replica_health
+from middleware.replica_middleware import ReplicaRoutingMiddleware
+from posts.models import Post
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRoutingTestCase(SimpleTestCase):
+    def setUp(self):
+        reset_replica_health()
+        self.addCleanup(reset_replica_health)
+        self.router = ReplicaRouter()
+
+    def test_reads_use_primary_outside_api_requests(self):
+        with mock.patch.object(db_routers, 'replica_lag', return_value=0):
+            self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_reads_use_healthy_replica(self):
+        with mock.patch.object(db_routers, 'replica_lag', side_effect=lambda alias: 0 if alias == 'replica2' else 60):
+            with use_replicas(), self.assertLogs('blog.db_routers', 'WARNING'):
+                self.assertEqual(self.router.db_for_read(Post), 'replica2')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_unavailable_replicas_fall_back_to_primary(self):
+        with mock.patch.object(db_routers, 'replica_lag', side_effect=OperationalError), \
+                mock.patch.object(db_routers, 'connections'):
+            with use_replicas(), self.assertLogs('blog.db_routers', 'WARNING'):
+                self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_health_checks_are_cached(self):
+        with mock.patch.object(db_routers, 'replica_lag', return_value=0) as lag:
+            with use_replicas():
+                for _ in range(5):
+                    self.router.db_for_read(Post)
+        self.assertEqual(lag.call_count, 2)
+
+    def test_middleware_routes_safe_api_requests_and_sticks_after_writes(self):
+        seen = []
+        middleware = ReplicaRoutingMiddleware(lambda request: seen.append(db_routers._replicas_allowed.get()) or HttpResponse())
+        factory = RequestFactory()
+
+        middleware(factory.get('/api/v1/posts/'))
+        middleware(factory.get('/admin/'))
+        response = middleware(factory.post('/api/v1/subscribe/'))
+        sticky = factory.get('/api/v1/posts/')
+        sticky.COOKIES['db_primary'] = response.cookies['db_primary'].value
+        middleware(sticky)
+
+        self.assertEqual(seen, [True, False, False, False])
+        self.assertEqual(response.cookies['db_primary']['max-age'], 10)
@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from monitoring import slow_queries
+from monitoring.models import SlowQuery
+from posts.models import Post
+
+
+class SlowQueryRecorderTestCase(TestCase):
+    def setUp(self):
+        slow_queries.pop_pending()
+
+    def test_normalize_replaces_literals(self):
+        first = slow_queries.normalize("SELECT * FROM t WHERE a = 'x' AND id IN (1, 2, 3)  LIMIT 10")
+        second = slow_queries.normalize("SELECT * FROM t WHERE a = 'it''s' AND id IN (7) LIMIT 20")
+        self.assertEqual(first, 'SELECT * FROM t WHERE a = ? AND id IN (...) LIMIT ?')
+        self.assertEqual(slow_queries.fingerprint(first), slow_queries.fingerprint(second))
+        # Placeholders normalize like the literals they stand for
+        self.assertEqual(slow_queries.normalize('SELECT * FROM t WHERE a = %s AND id IN (%s, %s) LIMIT 10'), first)
+        # Digits inside identifiers are kept
+        self.assertEqual(slow_queries.normalize('SELECT U0."id" FROM t U0'), 'SELECT U0."id" FROM t U0')
+
+    def test_only_plain_selects_are_explained(self):
+        self.assertTrue(slow_queries.is_plain_select("SELECT * FROM t WHERE note = 'for update'"))
+        for sql in [
+            'SELECT * FROM t WHERE id = 1 FOR UPDATE',
+            'SELECT * FROM t FOR NO KEY UPDATE SKIP LOCKED',
+            'select * from t for share',
+            'SELECT * INTO t2 FROM t',
+            'SELECT 1; DELETE FROM t',
+            'UPDATE t SET a = 1',
+        ]:
+            self.assertFalse(slow_queries.is_plain_select(sql), sql)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_EXPLAIN_RATE=1)
+    def test_queries_over_threshold_are_buffered(self):
+        with connection.execute_wrapper(slow_queries.record_slow_queries):
+            Post.objects.filter(slug='missing').first()
+        [entry] = slow_queries.pop_pending()
+        self.assertNotIn('missing', entry['sql'])
+        self.assertIn('"slug" = ?', entry['sql'])
+        self.assertGreaterEqual(entry['ms'], 0)
+        # Sampled for EXPLAIN: the full text stays in the buffer only
+        self.assertIn("'missing'", entry['explain'])
+
+    def test_buffer_failures_never_reach_the_query(self):
+        with mock.patch.object(slow_queries, 'get_redis', side_effect=ConnectionError), \
+                override_settings(SLOW_QUERY_THRESHOLD_MS=0):
+            with connection.execute_wrapper(slow_queries.record_slow_queries), \
+                    self.assertLogs('monitoring.slow_queries', 'WARNING'):
+                self.assertIsNone(Post.objects.filter(slug='missing').first())
+
+    def test_occurrences_are_aggregated_per_fingerprint(self):
+        normalized = 'SELECT * FROM posts_post WHERE slug = ?'
+        slow_queries.flush([{'sql': normalized, 'ms': 120.0}])
+        slow_queries.flush([
+            {'sql': normalized, 'ms': 80.0, 'explain': "SELECT * FROM posts_post WHERE slug = 'b'"},
+            {'sql': normalized, 'ms': 100.0},
+        ])
+        entry = SlowQuery.objects.get()
+        self.assertEqual(entry.calls, 3)
+        self.assertEqual(entry.max_ms, 120.0)
+        self.assertEqual(entry.mean_ms, 100.0)
+        self.assertEqual(entry.normalized_sql, normalized)
+        # Plans are only captured on PostgreSQL
+        self.assertEqual(entry.plan, '')
+
+    def test_plans_are_stored_with_literals_masked(self):
+        plan = "Index Scan using users_email on users (cost=0.29..8.30 rows=1)\n  Index Cond: (email = 'reader@example.com'::text)"
+        with mock.patch.object(slow_queries, 'explain_analyze', return_value=('default', plan)):
+            slow_queries.record('SELECT * FROM users WHERE email = ?', 1, 50.0, 50.0, explain="SELECT 'x'")
+        self.assertEqual(
+            SlowQuery.objects.get().plan,
+            "Index Scan using users_email on users (cost=0.29..8.30 rows=1)\n  Index Cond: (email = '?'::text)",
+        )
+
+    def test_recorder_ignores_its_own_queries(self):
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=0):
+            with connection.execute_wrapper(slow_queries.record_slow_queries):
+                slow_queries.record('SELECT ?', 1, 5.0, 5.0)
+        self.assertEqual(slow_queries.pop_pending(), [])
@@ -0,0 +1,45 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from categories.models import Category
+
+
+class SparseFieldsetsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name='Travel')
+        for i in range(3):
+            post = Post.objects.create(
+                title=f'Post {i}', content='Long content', status='published',
+                published_at=timezone.now(), is_featured=True,
+            )
+            post.categories.add(category)
+            post.tags.add('django')
+
+    def test_fields_trim_response_and_select(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/posts/', {'fields': 'slug,title,published_at'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['results'][0]), {'slug', 'title', 'published_at'})
+        # count + page, no prefetch queries, and content isn't loaded
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('"content"', queries[1]['sql'])
+
+    def test_omit_keeps_other_fields(self):
+        response = self.client.get('/api/v1/posts/post-1/', {'omit': 'content,side_image_1_blur,side_image_2_blur'})
+        data = response.json()
+        self.assertNotIn('content', data)
+        self.assertEqual(data['categories'][0]['slug'], 'travel')
+        self.assertEqual(data['tags'], ['django'])
+
+    def test_featured_posts_support_fields(self):
+        response = self.client.get('/api/v1/featured-posts/', {'fields': 'slug,tags'})
+        self.assertEqual(response.json()['results'][0], {'slug': 'post-2', 'tags': ['django']})
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/v1/posts/', {'fields': 'slug,nope'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,39 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from newsletter.models import Subscriber
+from newsletter.queue import save_subscribers
+
+
+class SubscribeAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_subscribe_normalizes_email(self):
+        response = self.client.post('/api/v1/subscribe/', {'email': 'Reader@Example.com'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Subscriber.objects.filter(email='reader@example.com').exists())
+
+    def test_duplicate_email_is_rejected_case_insensitively(self):
+        Subscriber.objects.create(email='reader@example.com')
+        response = self.client.post('/api/v1/subscribe/', {'email': 'READER@example.com'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_subscribe_is_throttled_per_email(self):
+        for _ in range(5):
+            self.client.post('/api/v1/subscribe/', {'email': 'reader@example.com'}, format='json')
+        response = self.client.post('/api/v1/subscribe/', {'email': 'Reader@example.com'}, format='json')
+        self.assertEqual(response.status_code, 429)
+
+    def test_save_subscribers_skips_existing_and_duplicate_emails(self):
+        Subscriber.objects.create(email='first@example.com')
+        emails = save_subscribers([
+            {'email': 'First@example.com', 'name': ''},
+            {'email': 'second@example.com', 'name': 'Second'},
+            {'email': 'SECOND@example.com', 'name': ''},
+        ])
+        self.assertEqual(sorted(emails), ['first@example.com', 'second@example.com'])
+        self.assertEqual(Subscriber.objects.count(), 2)
+        self.assertEqual(Subscriber.objects.get(email='second@example.com').name, 'Second')
@@ -0,0 +1,138 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from newsletter import queue
+from newsletter.models import Subscriber
+from newsletter.tasks import drain_subscriber_queue
+
+
+class FakeRedis:
+    """The list and set commands the queue uses, in memory."""
+
+    def __init__(self):
+        self.lists = {}
+        self.sets = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def sadd(self, key, *members):
+        members = {m.encode() if isinstance(m, str) else m for m in members}
+        added = members - self.sets.setdefault(key, set())
+        self.sets[key] |= members
+        return len(added)
+
+    def srem(self, key, *members):
+        members = {m.encode() if isinstance(m, str) else m for m in members}
+        removed = members & self.sets.setdefault(key, set())
+        self.sets[key] -= members
+        return len(removed)
+
+    def rpush(self, key, *values):
+        items = self.lists.setdefault(key, [])
+        items.extend(v.encode() if isinstance(v, str) else v for v in values)
+        return len(items)
+
+    def lmove(self, source, destination, src, dest):
+        items = self.lists.setdefault(source, [])
+        if not items:
+            return None
+        item = items.pop(0 if src == 'LEFT' else -1)
+        target = self.lists.setdefault(destination, [])
+        if dest == 'LEFT':
+            target.insert(0, item)
+        else:
+            target.append(item)
+        return item
+
+    def lrem(self, key, count, value):
+        items = self.lists.setdefault(key, [])
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue_call(*args):
+            self.calls.append((name, args))
+            return self
+        return queue_call
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+@override_settings(NEWSLETTER_QUEUE_SUBSCRIPTIONS=True)
+class SubscriberQueueTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(queue, 'get_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def queued(self):
+        return [item['email'] for item in queue.decode(self.redis.lists.get(queue.QUEUE_KEY, []))]
+
+    def processing(self):
+        return self.redis.lists.get(queue.PROCESSING_KEY, [])
+
+    def test_subscribe_endpoint_queues_sign_ups(self):
+        client = APIClient()
+        response = client.post('/api/v1/subscribe/', {'email': 'Reader@Example.com'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        response = client.post('/api/v1/subscribe/', {'email': 'reader@example.com'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.queued(), ['reader@example.com'])
+        self.assertFalse(Subscriber.objects.exists())
+
+    def test_enqueue_skips_emails_already_waiting(self):
+        self.assertTrue(queue.enqueue_subscriber('First@example.com', 'First'))
+        self.assertFalse(queue.enqueue_subscriber('first@example.com'))
+        self.assertTrue(queue.enqueue_subscriber('second@example.com'))
+        self.assertEqual(self.queued(), ['first@example.com', 'second@example.com'])
+
+    def test_pop_batch_moves_items_until_acknowledged(self):
+        for i in range(3):
+            queue.enqueue_subscriber(f'reader{i}@example.com')
+        items = queue.pop_batch(2)
+        self.assertEqual([entry['email'] for entry in queue.decode(items)], ['reader0@example.com', 'reader1@example.com'])
+        self.assertEqual(self.queued(), ['reader2@example.com'])
+        self.assertEqual(self.processing(), items)
+        queue.ack(items)
+        self.assertEqual(self.processing(), [])
+
+    def test_drain_writes_batches_and_releases_emails(self):
+        for i in range(5):
+            queue.enqueue_subscriber(f'reader{i}@example.com')
+        self.assertEqual(drain_subscriber_queue(batch_size=2), 'Drained 5 queued subscribers')
+        self.assertEqual(Subscriber.objects.count(), 5)
+        self.assertEqual((self.queued(), self.processing()), ([], []))
+        # Released emails can be queued again
+        self.assertTrue(queue.enqueue_subscriber('reader0@example.com'))
+
+    def test_failed_write_keeps_sign_ups_for_the_next_drain(self):
+        for i in range(3):
+            queue.enqueue_subscriber(f'reader{i}@example.com')
+        with mock.patch('newsletter.tasks.save_subscribers', side_effect=DatabaseError('down')):
+            with self.assertRaises(DatabaseError):
+                drain_subscriber_queue(batch_size=2)
+        self.assertEqual(len(self.processing()), 2)
+        self.assertFalse(Subscriber.objects.exists())
+
+        self.assertEqual(drain_subscriber_queue(batch_size=2), 'Drained 3 queued subscribers')
+        self.assertEqual(
+            sorted(Subscriber.objects.values_list('email', flat=True)),
+            ['reader0@example.com', 'reader1@example.com', 'reader2@example.com'],
+        )
+        self.assertEqual((self.queued(), self.processing()), ([], []))
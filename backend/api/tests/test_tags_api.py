@@ -0,0 +1,47 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from posts.models import Post, TagPostCount
+from posts.tag_counts import refresh_tag_counts
+from categories.models import Category
+
+
+class TagsAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.travel = Category.objects.create(name='Travel')
+        self.food = Category.objects.create(name='Food')
+        for i, (category, tags) in enumerate([
+            (self.travel, ['django', 'python']),
+            (self.travel, ['django']),
+            (self.food, ['django', 'recipes']),
+        ]):
+            post = Post.objects.create(title=f'Post {i}', content='Content', status='published')
+            post.categories.add(category)
+            post.tags.add(*tags)
+        draft = Post.objects.create(title='Draft', content='Content', status='draft')
+        draft.tags.add('python')
+        refresh_tag_counts()
+
+    def test_tag_list_is_served_from_stored_counts(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/tags/')
+        counts = {tag['slug']: tag['count'] for tag in response.json()['results']}
+        self.assertEqual(counts, {'django': 3, 'python': 1, 'recipes': 1})
+        self.assertEqual(response.json()['results'][0]['slug'], 'django')
+
+    def test_tag_counts_per_category(self):
+        response = self.client.get('/api/v1/tags/', {'category': 'travel'})
+        counts = {tag['slug']: tag['count'] for tag in response.json()['results']}
+        self.assertEqual(counts, {'django': 2, 'python': 1})
+
+    def test_refresh_replaces_counts(self):
+        Post.objects.filter(title='Post 0').update(status='draft')
+        refresh_tag_counts()
+        self.assertFalse(TagPostCount.objects.filter(tag__slug='python').exists())
+        self.assertEqual(TagPostCount.objects.get(tag__slug='django', category=None).count, 2)
+
+    def test_tag_detail_returns_post_feed(self):
+        response = self.client.get('/api/v1/tags/recipes/')
+        self.assertEqual([post['slug'] for post in response.json()['results']], ['post-2'])
+        self.assertEqual(self.client.get('/api/v1/tags/missing/').status_code, 404)
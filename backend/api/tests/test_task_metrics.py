@@ -0,0 +1,44 @@
+from datetime import timedelta
+import time
+
+from celery.app.task import Context
+from django.test import TestCase
+from django.utils import timezone
+
+from monitoring import task_metrics
+from monitoring.models import TaskMetrics
+from monitoring.tasks import benchmark_task
+
+
+class TaskMetricsTestCase(TestCase):
+    def setUp(self):
+        task_metrics.pop_pending()
+
+    def test_task_runs_are_recorded_and_flushed(self):
+        benchmark_task.apply()
+        benchmark_task.apply(kwargs={'sleep_ms': 20})
+        benchmark_task.apply(kwargs={'fail': True})
+        pending = task_metrics.pop_pending()
+        self.assertEqual(pending[benchmark_task.name]['runs'], 3)
+        self.assertEqual(pending[benchmark_task.name]['failures'], 1)
+        self.assertGreaterEqual(pending[benchmark_task.name]['max_runtime_ms'], 20)
+
+        task_metrics.persist(pending)
+        task_metrics.persist({benchmark_task.name: {'runs': 1, 'max_runtime_ms': 5}})
+        row = TaskMetrics.objects.get(task_name=benchmark_task.name)
+        self.assertEqual((row.runs, row.failures, row.retries), (4, 1, 0))
+        self.assertGreaterEqual(row.max_runtime_ms, 20)
+
+    def test_queue_wait_is_measured_from_publish_or_eta(self):
+        now = time.time()
+        self.assertIsNone(task_metrics.queue_wait_ms(Context({})))
+        self.assertGreaterEqual(task_metrics.queue_wait_ms(Context({'published_at': now - 2})), 2000)
+        # A countdown is not counted as waiting
+        eta = (timezone.now() - timedelta(seconds=1)).isoformat()
+        wait = task_metrics.queue_wait_ms(Context({'published_at': now - 60, 'eta': eta}))
+        self.assertLess(wait, 5000)
+
+    def test_publish_stamps_header(self):
+        headers = {}
+        task_metrics.stamp_published_at(sender=benchmark_task.name, headers=headers)
+        self.assertAlmostEqual(headers['published_at'], time.time(), delta=5)
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from posts.tasks import flush_post_views
+from posts import popularity
+from categories.models import Category
+
+
+class TrendingPostsAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        popularity._local_views.clear()
+        popularity._local_scores.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Travel')
+        self.popular = Post.objects.create(title='Popular', content='Content', status='published')
+        self.popular.categories.add(self.category)
+        self.quiet = Post.objects.create(title='Quiet', content='Content', status='published')
+
+    def _view(self, post, times):
+        for _ in range(times):
+            self.client.get(f'/api/v1/posts/{post.slug}/')
+
+    def test_views_are_buffered_and_flushed_in_batch(self):
+        self._view(self.popular, 3)
+        self._view(self.quiet, 1)
+        self.popular.refresh_from_db()
+        self.assertEqual(self.popular.view_count, 0)
+
+        flush_post_views()
+        self.popular.refresh_from_db()
+        self.quiet.refresh_from_db()
+        self.assertEqual((self.popular.view_count, self.quiet.view_count), (3, 1))
+
+    def test_failed_flush_keeps_views_and_later_views_survive_a_flush(self):
+        self._view(self.popular, 2)
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaises(RuntimeError):
+            with mock.patch.object(popularity, 'persist_views', side_effect=RuntimeError):
+                flush_post_views()
+        self.assertEqual(popularity.pending_views(), {self.popular.pk: 2})
+
+        persist_views = popularity.persist_views
+
+        def view_during_flush(pending):
+            popularity.record_view(self.popular.pk)
+            return persist_views(pending)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with mock.patch.object(popularity, 'persist_views', side_effect=view_during_flush):
+                flush_post_views()
+        self.popular.refresh_from_db()
+        self.assertEqual(self.popular.view_count, 2)
+        self.assertEqual(popularity.pending_views(), {self.popular.pk: 1})
+
+    def test_post_leaves_trending_of_removed_category(self):
+        self._view(self.popular, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.popular.categories.remove(self.category)
+        self.assertEqual(popularity.trending_ids(self.category.slug), [])
+        self.assertEqual(popularity.trending_ids(), [self.popular.pk])
+
+    def test_trending_is_ordered_and_filterable_by_category(self):
+        self._view(self.quiet, 1)
+        self._view(self.popular, 2)
+        response = self.client.get('/api/v1/posts/trending/')
+        self.assertEqual([p['slug'] for p in response.json()], ['popular', 'quiet'])
+
+        response = self.client.get('/api/v1/posts/trending/', {'category': self.category.slug})
+        self.assertEqual([p['slug'] for p in response.json()], ['popular'])
+
+        # Card payloads are cached after the first request
+        with self.assertNumQueries(0):
+            self.client.get('/api/v1/posts/trending/')
@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+
+from rest_framework.throttling import SimpleRateThrottle
+
+from newsletter.queue import normalize_email
+from utils.redis_client import get_redis, get_async_redis
+
+
+class SubscribeEmailRateThrottle(SimpleRateThrottle):
+    """Limit sign-up attempts per (case-insensitive) email address."""
+    scope = 'subscribe_email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not email or not isinstance(email, str):
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': normalize_email(email),
+        }
+
+
+# Sliding-window limits applied by middleware.throttle_middleware before any
+# view runs. Each client has a counter per window; a request is allowed while
+# the previous window's count (weighted by how much of it still overlaps the
+# sliding window) plus the current count stays under the limit.
+
+THROTTLE_KEY = 'throttle:{scope}:{ident}:{window}'
+
+# KEYS: current window, previous window
+# ARGV: limit, weight of the previous window, window seconds
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current >= tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]) * 2)
+return {1, current + 1, previous}
+"""
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+# In-process fallback used when Redis is not configured
+_local_lock = threading.Lock()
+_local_windows = {}
+_LOCAL_MAX_KEYS = 10000
+
+
+def parse_rate(rate):
+    """Parse a DRF-style rate such as '120/min' into ``(requests, seconds)``."""
+    num, period = rate.split('/')
+    return int(num), RATE_PERIODS[period[0]]
+
+
+def _window(window_seconds):
+    now = time.time()
+    index = int(now // window_seconds)
+    return index, now - index * window_seconds
+
+
+def _retry_after(limit, window_seconds, elapsed, current, previous):
+    """Seconds until the sliding count drops under ``limit`` again."""
+    if current < limit and previous:
+        # The previous window's share shrinks as the window slides
+        excess = previous * (1 - elapsed / window_seconds) + current - limit + 1
+        wait = excess * window_seconds / previous
+    else:
+        # Wait for the next window, then for this one's share to shrink
+        wait = window_seconds - elapsed + (current - limit + 1) * window_seconds / max(current, 1)
+    return max(1, math.ceil(wait))
+
+
+def _keys(scope, ident, index):
+    return [THROTTLE_KEY.format(scope=scope, ident=ident, window=window) for window in (index, index - 1)]
+
+
+def _local_hit(keys, limit, weight, index):
+    with _local_lock:
+        if len(_local_windows) > _LOCAL_MAX_KEYS:
+            for key in [key for key in _local_windows if int(key.rsplit(':', 1)[1]) < index - 1]:
+                del _local_windows[key]
+        current, previous = _local_windows.get(keys[0], 0), _local_windows.get(keys[1], 0)
+        if previous * weight + current >= limit:
+            return False, current, previous
+        _local_windows[keys[0]] = current + 1
+        return True, current + 1, previous
+
+
+def hit(scope, ident, rate):
+    """
+    Count a request against ``rate`` for ``(scope, ident)``.
+
+    Returns None when it is allowed, otherwise the number of seconds to
+    wait (for ``Retry-After``).
+    """
+    limit, window_seconds = parse_rate(rate)
+    index, elapsed = _window(window_seconds)
+    keys = _keys(scope, ident, index)
+    weight = 1 - elapsed / window_seconds
+    client = get_redis()
+    if client is None:
+        allowed, current, previous = _local_hit(keys, limit, weight, index)
+    else:
+        allowed, current, previous = client.eval(SLIDING_WINDOW_SCRIPT, 2, *keys, limit, weight, window_seconds)
+    if allowed:
+        return None
+    return _retry_after(limit, window_seconds, elapsed, int(current), int(previous))
+
+
+async def ahit(scope, ident, rate):
+    """Async version of ``hit`` for the ASGI middleware chain."""
+    client = get_async_redis()
+    if client is None:
+        return hit(scope, ident, rate)
+    limit, window_seconds = parse_rate(rate)
+    index, elapsed = _window(window_seconds)
+    keys = _keys(scope, ident, index)
+    allowed, current, previous = await client.eval(
+        SLIDING_WINDOW_SCRIPT, 2, *keys, limit, 1 - elapsed / window_seconds, window_seconds,
+    )
+    if allowed:
+        return None
+    return _retry_after(limit, window_seconds, elapsed, int(current), int(previous))
+
+
+def reset_local_windows():
+    with _local_lock:
+        _local_windows.clear()
@@ -1,14 +1,18 @@
-from django.urls import path, include
+import re
+
+from django.conf import settings
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    PostViewSet, CategoryViewSet,
+    PostViewSet, CategoryViewSet, TagViewSet,
     FeaturedPostsAPIView, SubscriberCreateAPIView,
-    active_theme
+    active_theme, home
 )
 
 router = DefaultRouter()
 router.register(r'posts', PostViewSet, basename='post')
 router.register(r'categories', CategoryViewSet, basename='category')
+router.register(r'tags', TagViewSet, basename='tag')
 
 # API patterns without the v1/ prefix (it's already added in the main urls.py)
 urlpatterns = [
@@ -17,4 +21,22 @@ urlpatterns = [
     path('featured-posts/', FeaturedPostsAPIView.as_view(), name='featured-posts'),
     path('subscribe/', SubscriberCreateAPIView.as_view(), name='newsletter-subscribe'),
     path('theme/', active_theme, name='active-theme'),
-] 
\ No newline at end of file
+    path('home/', home, name='home'),
+]
+
+if settings.ASYNC_API:
+    from . import async_views
+
+    # Keep list-level actions such as posts/trending/ on the sync viewset
+    list_actions = '|'.join(
+        re.escape(action.url_path) for action in PostViewSet.get_extra_actions() if not action.detail
+    )
+    urlpatterns = [
+        path('posts/', async_views.post_list),
+        re_path(rf'^posts/(?!(?:{list_actions})/)(?P<slug>[^/.]+)/$', async_views.post_detail),
+        path('featured-posts/', async_views.featured_posts),
+        path('categories/', async_views.category_list),
+        path('categories/<slug:slug>/', async_views.category_detail),
+        path('theme/', async_views.active_theme),
+    ] + urlpatterns
+ 
\ No newline at end of file
@@ -1,55 +1,195 @@
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, generics, filters
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
 
-from posts.models import Post
+from taggit.models import Tag
+
+from posts.models import Post, TagPostCount
+from posts import category_counts, popularity
+from search.models import RelatedPosts
 from categories.models import Category
 from newsletter.models import Subscriber
+from newsletter.queue import queue_enabled, enqueue_subscriber
 from .serializers import (
     PostListSerializer, PostDetailSerializer,
-    CategorySerializer, SubscriberSerializer,
-    ActiveThemeSerializer
+    SubscriberSerializer,
+    SubscriberIngestSerializer, ActiveThemeSerializer,
+    TagCountSerializer, CategoryWithCountSerializer
 )
+from .cards import PostCardListMixin
+from .fieldsets import SparseFieldsetMixin
+from .home import get_home
+from . import cards, response_cache
+from .prerender import is_prerender
+from .throttles import SubscribeEmailRateThrottle
 from themes.models import ExtendedTheme, Theme
 
 
-class PostViewSet(viewsets.ReadOnlyModelViewSet):
+def filter_by_category(queryset, request):
+    """
+    Apply the category filter of a post list request.
+    
+    'category' and the older 'categories__slug' are the same filter; both
+    go through ``PostQuerySet.in_category`` (an EXISTS subquery).
+    """
+    params = request.query_params
+    category_slug = params.get('category') or params.get('categories__slug')
+    if category_slug:
+        return queryset.in_category(category_slug)
+    return queryset
+
+
+class PostViewSet(PostCardListMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows posts to be viewed.
+    
+    Supports sparse fieldsets, e.g. ?fields=slug,title,published_at or ?omit=content
+    Plain and category lists are read from the stored post cards (api.cards).
     """
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['categories__slug', 'tags__name', 'is_featured']
+    filterset_fields = ['tags__name', 'is_featured']
     search_fields = ['title', 'content', 'excerpt']
     ordering_fields = ['published_at', 'title']
     lookup_field = 'slug'
+    # Maximum number of posts a single batch request may ask for
+    batch_max_size = 50
     
     def get_queryset(self):
         queryset = Post.objects.filter(status='published').prefetch_related('categories', 'tags')
-        category_slug = self.request.query_params.get('category')
-        if category_slug:
-            queryset = queryset.filter(categories__slug=category_slug)
-        return queryset
+        queryset = filter_by_category(queryset, self.request)
+        # retrieve reads the categories to record the view
+        return self.narrow_queryset(queryset, ('categories',) if self.action == 'retrieve' else ())
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return PostDetailSerializer
         return PostListSerializer
+    
+    def list(self, request, *args, **kwargs):
+        key, data = response_cache.get(request)
+        if data is None:
+            if cards.servable(request):
+                data = self.list_cards()
+            else:
+                data = super().list(request, *args, **kwargs).data
+            response_cache.store(key, data)
+        return Response(data)
+    
+    def retrieve(self, request, *args, **kwargs):
+        key, data = response_cache.get(request)
+        if data is None:
+            instance = self.get_object()
+            data = self.get_serializer(instance).data
+            response_cache.store(key, data)
+            category_slugs = [category.slug for category in instance.categories.all()]
+        else:
+            # Cached payloads are never sparse
+            category_slugs = [category['slug'] for category in data['categories']]
+        if not is_prerender(request):
+            # Buffered in Redis and flushed to the database by posts.tasks.flush_post_views
+            popularity.record_view(data['id'], category_slugs)
+        return Response(data)
+    
+    @action(detail=False)
+    def trending(self, request):
+        """
+        Returns the most viewed posts with time-decayed scores.
+        
+        Optional 'category' (slug) and 'limit' (max 50) query parameters.
+        Served from Redis: the ranking comes from a sorted set and card
+        payloads from the cache.
+        """
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        post_ids = popularity.trending_ids(request.query_params.get('category'), limit)
+        # Cached cards are always complete; sparse fieldsets are applied afterwards
+        context = dict(self.get_serializer_context(), sparse_fields=None)
+        cards = popularity.get_cards(
+            post_ids, lambda posts: PostListSerializer(posts, many=True, context=context).data
+        )
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            cards = [{name: card[name] for name in fields} for card in cards]
+        return Response(cards)
+    
+    @action(detail=False)
+    def batch(self, request):
+        """
+        Returns several posts in one request, in the order they were asked for.
+        
+        Pass either 'slugs' or 'ids' as a comma-separated list (at most
+        batch_max_size values). Posts that don't exist or aren't published
+        are reported in 'missing'.
+        Example: /api/v1/posts/batch/?slugs=first-post,second-post
+        """
+        if 'ids' in request.query_params:
+            lookup, raw = 'pk', request.query_params['ids']
+        else:
+            lookup, raw = 'slug', request.query_params.get('slugs', '')
+        keys = list(dict.fromkeys(value.strip() for value in raw.split(',') if value.strip()))
+        if not keys:
+            raise ValidationError({'detail': "Pass 'slugs' or 'ids' as a comma-separated list."})
+        if len(keys) > self.batch_max_size:
+            raise ValidationError({'detail': f'At most {self.batch_max_size} posts can be requested at once.'})
+        if lookup == 'pk':
+            try:
+                keys = list(dict.fromkeys(int(key) for key in keys))
+            except ValueError:
+                raise ValidationError({'detail': "'ids' must be integers."})
+        
+        found = {getattr(post, lookup): post for post in self.get_queryset().filter(**{f'{lookup}__in': keys})}
+        posts = [found[key] for key in keys if key in found]
+        serializer = self.get_serializer(posts, many=True)
+        return Response({
+            'results': serializer.data,
+            'missing': [key for key in keys if key not in found],
+        })
+    
+    @action(detail=True)
+    def related(self, request, slug=None):
+        """
+        Returns posts similar to this one from the precomputed similarity index.
+        Falls back to the latest posts sharing a category until the post is indexed.
+        """
+        post = self.get_object()
+        limit = settings.RELATED_POSTS_COUNT
+        index = RelatedPosts.objects.filter(post=post).values_list('related_ids', flat=True).first()
+        queryset = self.narrow_queryset(Post.objects.filter(status='published').prefetch_related('categories', 'tags'))
+        if index:
+            related = {p.pk: p for p in queryset.filter(pk__in=index[:limit])}
+            posts = [related[pk] for pk in index if pk in related]
+        else:
+            shared = Post.categories.through.objects.filter(
+                post_id=OuterRef('pk'), category_id__in=post.categories.values('pk')
+            )
+            posts = list(queryset.filter(Exists(shared)).exclude(pk=post.pk)[:limit])
+        serializer = PostListSerializer(posts, many=True, context=self.get_serializer_context())
+        return Response(serializer.data)
 
 
-class FeaturedPostsAPIView(generics.ListAPIView):
+class FeaturedPostsAPIView(PostCardListMixin, SparseFieldsetMixin, generics.ListAPIView):
     """
     API endpoint that returns featured posts.
     
     Can be filtered by category using the 'category' query parameter.
     Example: /api/v1/featured-posts/?category=technology
+    Supports sparse fieldsets like the posts endpoint (?fields= / ?omit=).
+    Read from the stored post cards unless ?ordering= is given.
     """
     serializer_class = PostListSerializer
+    featured_cards = True
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['categories__slug']
+    filter_backends = [filters.OrderingFilter]
     ordering_fields = ['published_at']
     ordering = ['-published_at']  # Default ordering
     
@@ -61,31 +201,105 @@ class FeaturedPostsAPIView(generics.ListAPIView):
             'categories', 'tags'
         )
         
-        # Filter by category if provided in query params
-        category_slug = self.request.query_params.get('category')
-        if category_slug:
-            queryset = queryset.filter(categories__slug=category_slug)
-            
-        return queryset
+        return self.narrow_queryset(filter_by_category(queryset, self.request))
+    
+    def list(self, request, *args, **kwargs):
+        key, data = response_cache.get(request)
+        if data is None:
+            if cards.servable(request):
+                data = self.list_cards()
+            else:
+                data = super().list(request, *args, **kwargs).data
+            response_cache.store(key, data)
+        return Response(data)
 
 
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows categories to be viewed.
+    
+    Each category includes its published post count (cached, see
+    posts.category_counts).
     """
     queryset = Category.objects.all()
-    serializer_class = CategorySerializer
+    serializer_class = CategoryWithCountSerializer
+    permission_classes = [AllowAny]
+    lookup_field = 'slug'
+    # Set by callers that already have the counts (the async views)
+    post_counts = None
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.post_counts is None:
+            self.post_counts = category_counts.post_counts()
+        context['category_post_counts'] = self.post_counts
+        return context
+
+
+class TagViewSet(viewsets.GenericViewSet):
+    """
+    API endpoint for browsing tags.
+    
+    The list returns tags with their published post counts, most used first;
+    pass 'category' (slug) for counts within a category. Counts are read from
+    precomputed rows (posts.tag_counts). The detail returns the tag's post feed.
+    Example: /api/v1/tags/?category=technology, /api/v1/tags/django/
+    """
     permission_classes = [AllowAny]
     lookup_field = 'slug'
+    
+    def get_queryset(self):
+        queryset = TagPostCount.objects.select_related('tag').order_by('-count', 'tag__name')
+        category_slug = self.request.query_params.get('category')
+        if category_slug:
+            return queryset.filter(category__slug=category_slug)
+        return queryset.filter(category__isnull=True)
+    
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return PostListSerializer
+        return TagCountSerializer
+    
+    def list(self, request):
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+    
+    def retrieve(self, request, slug=None):
+        tag = get_object_or_404(Tag, slug=slug)
+        posts = Post.objects.filter(status='published', tags=tag).prefetch_related('categories', 'tags')
+        page = self.paginate_queryset(posts)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
 
 
 class SubscriberCreateAPIView(generics.CreateAPIView):
     """
     API endpoint that allows new subscribers to sign up.
+    
+    When NEWSLETTER_QUEUE_SUBSCRIPTIONS is enabled the request is only
+    validated and queued, and a 202 is returned; the sign-up is written by
+    the drain_subscriber_queue Celery task.
     """
     queryset = Subscriber.objects.all()
     serializer_class = SubscriberSerializer
     permission_classes = [AllowAny]
+    # Per-IP limits are applied by middleware.throttle_middleware
+    throttle_classes = [SubscribeEmailRateThrottle]
+    
+    def get_serializer_class(self):
+        if queue_enabled():
+            return SubscriberIngestSerializer
+        return SubscriberSerializer
+    
+    def create(self, request, *args, **kwargs):
+        if not queue_enabled():
+            return super().create(request, *args, **kwargs)
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Duplicates are acknowledged the same way so the response never
+        # reveals whether an address is already subscribed
+        enqueue_subscriber(**serializer.validated_data)
+        return Response({**serializer.data, 'queued': True}, status=status.HTTP_202_ACCEPTED)
 
 
 # API endpoint to fetch the active theme and hero section data
@@ -106,4 +320,15 @@ def active_theme(request):
         return Response(None)
     
     serializer = ActiveThemeSerializer(ext)
-    return Response(serializer.data) 
\ No newline at end of file
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def home(request):
+    """
+    Returns everything the homepage renders in one response: the active theme,
+    featured posts, categories and the first page of posts.
+    Cached as a single entry and invalidated when any of them change.
+    """
+    return Response(get_home(request))
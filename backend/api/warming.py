@@ -0,0 +1,143 @@
+"""
+Cache warming after posts are published or edited.
+
+Changed posts and categories are collected in a Redis set and one
+``warm_api_cache`` task runs shortly after the first change, so an
+editorial burst is warmed once. The task works out which responses the
+changes affect (the first post list pages, featured posts, the homepage,
+the changed posts and the feeds of their categories), renders them with
+``render_endpoint`` into the next ``api.response_cache`` version using up
+to API_CACHE_WARM_CONCURRENCY threads, and then switches to that version.
+
+Without REDIS_URL an in-process set is used.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from posts.models import Post
+from utils.redis_client import get_redis
+from . import response_cache
+from .prerender import render_endpoint
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'api-warm:pending'
+SCHEDULED_KEY = 'api-warm:scheduled'
+POST_LIST_PATH = '/api/v1/posts/'
+FEATURED_PATH = '/api/v1/featured-posts/'
+# Cached by api.home itself; rendering it rebuilds that entry
+HOME_PATH = '/api/v1/home/'
+
+# In-process fallback used when Redis is not configured
+_local_lock = threading.Lock()
+_local_pending = set()
+
+
+def schedule(post_ids=(), category_slugs=()):
+    """Queue posts and categories for warming; one task runs per burst of changes."""
+    from .tasks import warm_api_cache
+
+    if not response_cache.enabled():
+        return
+    members = [f'post:{pk}' for pk in post_ids] + [f'category:{slug}' for slug in category_slugs]
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            _local_pending.update(members)
+    elif members:
+        client.sadd(PENDING_KEY, *members)
+    delay = settings.API_CACHE_WARM_DELAY
+    if cache.add(SCHEDULED_KEY, 1, delay):
+        warm_api_cache.apply_async(countdown=delay)
+
+
+def pop_pending():
+    """Atomically take the queued changes as ``(post ids, category slugs)``."""
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            members = set(_local_pending)
+            _local_pending.clear()
+    else:
+        pipe = client.pipeline()
+        pipe.smembers(PENDING_KEY)
+        pipe.delete(PENDING_KEY)
+        raw, _ = pipe.execute()
+        members = {member.decode() for member in raw}
+    post_ids, category_slugs = set(), set()
+    for member in members:
+        kind, value = member.split(':', 1)
+        if kind == 'post':
+            post_ids.add(int(value))
+        else:
+            category_slugs.add(value)
+    return post_ids, category_slugs
+
+
+def affected_requests(post_ids, category_slugs=()):
+    """Return the ``(path, params)`` requests whose responses the changes affect."""
+    requests = [(POST_LIST_PATH, {'page': page}) for page in range(1, settings.API_CACHE_WARM_LIST_PAGES + 1)]
+    requests += [(FEATURED_PATH, {}), (HOME_PATH, {})]
+    slugs = set(category_slugs)
+    posts = Post.objects.filter(pk__in=post_ids, status='published').prefetch_related('categories')
+    for post in posts:
+        requests.append((f'{POST_LIST_PATH}{post.slug}/', {}))
+        slugs.update(category.slug for category in post.categories.all())
+    for slug in sorted(slugs):
+        requests += [(POST_LIST_PATH, {'category': slug}), (FEATURED_PATH, {'category': slug})]
+    return requests
+
+
+def render(path, params):
+    """Render one request; returns its data, or None if it didn't succeed."""
+    try:
+        response = render_endpoint(path, params)
+    except Exception:
+        logger.warning('Could not warm %s %s', path, params, exc_info=True)
+        return None
+    if response.status_code != 200:
+        return None
+    return response.data if hasattr(response, 'data') else json.loads(response.content)
+
+
+def render_in_thread(request):
+    try:
+        return render(*request)
+    finally:
+        # Each thread opened its own database connections
+        connections.close_all()
+
+
+def warm(post_ids, category_slugs=()):
+    """Render the affected responses into the next version and switch to it."""
+    requests = affected_requests(post_ids, category_slugs)
+    previous = response_cache.current_version()
+    version = response_cache.next_version()
+    concurrency = settings.API_CACHE_WARM_CONCURRENCY
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(render_in_thread, requests))
+    else:
+        results = [render(path, params) for path, params in requests]
+    cache.set_many({
+        response_cache.response_key(path, params, version): data
+        for (path, params), data in zip(requests, results)
+        if data is not None and path != HOME_PATH
+    }, settings.API_CACHE_TIMEOUT)
+    if response_cache.current_version() == previous:
+        response_cache.set_version(version)
+    else:
+        # discard() moved readers on meanwhile; don't switch them back
+        logger.info('API cache version changed during warming, not switching to %s', version)
+    return len(requests)
+
+
+def discard():
+    """Switch readers to an empty version, for when the changes can't be warmed."""
+    response_cache.set_version(response_cache.next_version())
@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog.settings')
@@ -13,6 +14,55 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
 
+# Celery Beat schedule. Kept here rather than in settings.py so web workers
+# and management commands don't import celery.schedules just to load settings.
+app.conf.beat_schedule = {
+    'publish-scheduled-posts': {
+        'task': 'posts.tasks.publish_scheduled_posts',
+        'schedule': crontab(minute='*/5'),  # Run every 5 minutes
+    },
+    'drain-subscriber-queue': {
+        'task': 'newsletter.tasks.drain_subscriber_queue',
+        'schedule': 30.0,  # Run every 30 seconds
+    },
+    'flush-post-views': {
+        'task': 'posts.tasks.flush_post_views',
+        'schedule': 60.0,  # Run every minute
+    },
+    'rebuild-related-posts-index': {
+        'task': 'search.tasks.rebuild_related_posts_index',
+        'schedule': crontab(hour=3, minute=0),  # Run nightly
+    },
+    'rebuild-post-cards': {
+        'task': 'api.tasks.rebuild_post_cards',
+        'schedule': crontab(hour=3, minute=30),  # Run nightly
+    },
+    'rebuild-all-feeds': {
+        'task': 'feeds.tasks.rebuild_all_feeds',
+        'schedule': crontab(hour=4, minute=0),  # Run nightly, catching up on skipped rebuilds
+    },
+    'mirror-external-images': {
+        'task': 'posts.tasks.mirror_external_images',
+        'schedule': crontab(minute=15),  # Run hourly, retrying failed downloads
+    },
+    'refresh-tag-counts': {
+        'task': 'posts.tasks.refresh_tag_counts',
+        'schedule': crontab(minute='*/30'),  # Run every 30 minutes
+    },
+    'flush-slow-queries': {
+        'task': 'monitoring.tasks.flush_slow_queries',
+        'schedule': 60.0,  # Run every minute
+    },
+    'flush-task-metrics': {
+        'task': 'monitoring.tasks.flush_task_metrics',
+        'schedule': 60.0,  # Run every minute
+    },
+    'reconcile-admin-counters': {
+        'task': 'utils.tasks.reconcile_admin_counters',
+        'schedule': crontab(minute='*/15'),  # Run every 15 minutes
+    },
+}
+
 
 @app.task(bind=True)
 def debug_task(self):
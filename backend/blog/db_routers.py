@@ -0,0 +1,108 @@
+"""
+Read-replica routing.
+
+Reads are sent to a replica only inside ``use_replicas()``, which
+``ReplicaRoutingMiddleware`` enters for safe API requests. Everything else
+(admin, Celery, writes, and requests shortly after the client's own write)
+stays on the primary.
+
+Replica health is checked at most every REPLICA_CHECK_INTERVAL seconds per
+process: a replica that can't be reached or whose replay lag exceeds
+REPLICA_MAX_LAG is skipped until the next check, and reads fall back to the
+primary when no replica is usable.
+"""
+from contextlib import contextmanager
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+_replicas_allowed = contextvars.ContextVar('replicas_allowed', default=False)
+
+# Seconds behind the primary; 0 when the replica has replayed everything it received
+LAG_QUERY = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+_health_lock = threading.Lock()
+_health = {}  # alias -> (checked_at, usable)
+
+
+@contextmanager
+def use_replicas():
+    """Allow reads in this context to be served by a replica."""
+    token = _replicas_allowed.set(True)
+    try:
+        yield
+    finally:
+        _replicas_allowed.reset(token)
+
+
+def replica_lag(alias):
+    """Return the replication lag of ``alias`` in seconds."""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_QUERY)
+        return float(cursor.fetchone()[0])
+
+
+def replica_usable(alias):
+    """Return True if ``alias`` answered its last health check with acceptable lag."""
+    now = time.monotonic()
+    with _health_lock:
+        checked_at, usable = _health.get(alias, (None, False))
+        if checked_at is not None and now - checked_at < settings.REPLICA_CHECK_INTERVAL:
+            return usable
+        # Other threads keep using the previous result while this one checks
+        _health[alias] = (now, usable)
+    try:
+        lag = replica_lag(alias)
+        usable = lag <= settings.REPLICA_MAX_LAG
+        if not usable:
+            logger.warning('Replica %s is %.1fs behind, reading from the primary', alias, lag)
+    except DatabaseError:
+        logger.warning('Replica %s is unavailable, reading from the primary', alias, exc_info=True)
+        usable = False
+        connections[alias].close()
+    with _health_lock:
+        _health[alias] = (time.monotonic(), usable)
+    return usable
+
+
+def reset_replica_health():
+    with _health_lock:
+        _health.clear()
+
+
+class ReplicaRouter:
+    """Route reads to a healthy replica inside ``use_replicas()``; everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if not _replicas_allowed.get():
+            return None
+        replicas = [alias for alias in settings.DATABASE_REPLICAS if replica_usable(alias)]
+        if not replicas:
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -1,5 +1,7 @@
 import os
 
+import dj_database_url
+
 os.environ.setdefault('SECRET_KEY', 'test-secret-key')
 os.environ.setdefault('DEBUG', 'True')
 os.environ.setdefault('POSTGRES_DB', 'test')
@@ -15,16 +17,39 @@ from .settings import *  # noqa
 SECRET_KEY = 'test-secret-key'
 DEBUG = True
 
-# Use in-memory SQLite database for tests
-DATABASES = {
+# Use in-memory SQLite database for tests. TEST_DATABASE_URL points the
+# suite at PostgreSQL instead, which the query plan tests need.
+if os.environ.get('TEST_DATABASE_URL'):
+    DATABASES = {'default': dj_database_url.parse(os.environ['TEST_DATABASE_URL'])}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+    }
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': ':memory:',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+REDIS_URL = None
+
+# Rendering admin pages must not depend on a collectstatic manifest
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
 
 CELERY_BROKER_URL = 'memory://'
 CELERY_RESULT_BACKEND = 'cache+memory://'
 
 # Remove apps that require external services
 INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'media']
+
+# Replicas come from DATABASE_REPLICA_URLS, which the test database replaces
+DATABASE_REPLICAS = []
+
+# Responses must reflect writes immediately; no worker warms the cache
+API_CACHE_TIMEOUT = 0
+
+# The whole suite runs from one client IP
+API_THROTTLE_ENABLED = False
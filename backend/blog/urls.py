@@ -9,6 +9,8 @@ urlpatterns = [
     path('api/v1/', include('api.urls')),
     path('markdownx/', include(markdownx_urls)),
     path('summernote/', include('django_summernote.urls')),
+    # Prebuilt sitemaps and RSS/Atom feeds
+    path('', include('feeds.urls')),
 ]
 
 # Serve media files in development
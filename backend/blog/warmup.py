@@ -0,0 +1,62 @@
+"""
+Worker start-up helpers used by gunicorn.conf.py.
+
+``preload_modules`` imports Pillow's image plugins, which Pillow loads on
+first use, once in the gunicorn master so forked workers share them.
+``warm_up`` runs in each worker once the application is loaded: it drops
+connections inherited from the master and makes the first request's
+one-off work (URL resolver, view and serializer imports, cached homepage
+payload) happen before traffic arrives.
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Loaded by Pillow on the first Image.open()
+PRELOAD_MODULES = ['PIL.JpegImagePlugin', 'PIL.PngImagePlugin']
+
+# Rendered through the real views to fill the shared caches
+WARM_UP_ENDPOINTS = ['/api/v1/home/']
+
+
+def preload_modules():
+    import importlib
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+
+
+def _render_endpoints():
+    from django.db import connections
+    from django.urls import get_resolver
+    from api.prerender import render_endpoint
+
+    try:
+        get_resolver().url_patterns
+        for path in WARM_UP_ENDPOINTS:
+            render_endpoint(path)
+    except Exception:
+        # A worker that can't warm up still serves requests
+        logger.warning('Worker warm-up failed', exc_info=True)
+    finally:
+        # This thread's connections are never reused
+        connections.close_all()
+
+
+def warm_up(timeout):
+    """
+    Warm the worker, giving up after ``timeout`` seconds so a slow database
+    can't keep it from reporting to the arbiter.
+    """
+    from django.db import connections
+    from utils.redis_client import get_redis
+
+    # Sockets opened in the master must not be shared between workers
+    connections.close_all()
+    get_redis.cache_clear()
+
+    thread = threading.Thread(target=_render_endpoints, name='warm-up', daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        logger.warning('Worker warm-up took longer than %s seconds, serving without it', timeout)
@@ -0,0 +1,239 @@
+"""
+Builds sitemap and RSS/Atom files under FEEDS_ROOT.
+
+Files are written once, next to a gzip-compressed copy, and served as-is by
+``feeds.views``. Post sitemaps are sharded by primary key
+(``pk // SITEMAP_SHARD_SIZE``) so that a change to a post only rewrites the
+shard it belongs to, and are generated by streaming published posts with
+``iterator()``.
+
+Layout::
+
+    sitemap.xml                       sitemap index
+    sitemaps/pages.xml                home and category pages
+    sitemaps/posts-<shard>.xml        post URLs
+    feeds/rss.xml, feeds/atom.xml     latest posts
+    feeds/categories/<slug>/rss.xml   latest posts in a category (and atom.xml)
+    feeds/manifest.json               post ids listed in each category feed
+"""
+import json
+import os
+import shutil
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import F, Max
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+
+from categories.models import Category
+from posts.models import Post
+from utils.files import write_precompressed, remove_precompressed
+
+SITEMAP_INDEX = 'sitemap.xml'
+PAGES_SITEMAP = 'sitemaps/pages.xml'
+POSTS_SITEMAP = 'sitemaps/posts-{shard}.xml'
+FEED_FILES = {'rss': (Rss201rev2Feed, 'rss.xml'), 'atom': (Atom1Feed, 'atom.xml')}
+MANIFEST = 'feeds/manifest.json'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def _path(relative_path):
+    return os.path.join(settings.FEEDS_ROOT, relative_path)
+
+
+def _site_url(path):
+    return settings.SITE_URL.rstrip('/') + path
+
+
+def write_file(relative_path, chunks, compress=True):
+    """Write ``chunks`` (an iterable of str) under FEEDS_ROOT with a gzip copy."""
+    write_precompressed(
+        _path(relative_path), (chunk.encode('utf-8') for chunk in chunks), compress=compress,
+    )
+
+
+def remove_file(relative_path):
+    remove_precompressed(_path(relative_path))
+
+
+def _url_entry(location, lastmod=None):
+    entry = f'<url><loc>{escape(location)}</loc>'
+    if lastmod:
+        entry += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+    return entry + '</url>\n'
+
+
+def _urlset(entries):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+    yield from entries
+    yield '</urlset>\n'
+
+
+def shard_for(post_id):
+    return post_id // settings.SITEMAP_SHARD_SIZE
+
+
+def has_posts_shard(shard):
+    """Whether the sitemap shard lists any published post."""
+    published = Post.objects.filter(status='published')
+    last = published.aggregate(last=Max('pk'))['last']
+    # Numbers past the highest pk never reach a (possibly overflowing) range query
+    if last is None or shard > shard_for(last):
+        return False
+    size = settings.SITEMAP_SHARD_SIZE
+    return published.filter(pk__gte=shard * size, pk__lt=(shard + 1) * size).exists()
+
+
+def build_posts_sitemap(shard):
+    """Write the sitemap shard for posts with ``pk`` in the shard's range."""
+    size = settings.SITEMAP_SHARD_SIZE
+    posts = (
+        Post.objects.filter(status='published', pk__gte=shard * size, pk__lt=(shard + 1) * size)
+        .order_by('pk')
+        .values_list('slug', 'updated_at')
+    )
+    write_file(POSTS_SITEMAP.format(shard=shard), _urlset(
+        _url_entry(_site_url(f'/posts/{slug}'), updated_at)
+        for slug, updated_at in posts.iterator(chunk_size=2000)
+    ))
+
+
+def build_pages_sitemap():
+    entries = [_url_entry(_site_url('/'))]
+    entries += [
+        _url_entry(_site_url(f'/category/{slug}'))
+        for slug in Category.objects.values_list('slug', flat=True)
+    ]
+    write_file(PAGES_SITEMAP, _urlset(entries))
+
+
+def build_sitemap_index():
+    """
+    Write the sitemap index listing the pages sitemap and every non-empty
+    post shard, and remove shard files that are now empty.
+    """
+    size = settings.SITEMAP_SHARD_SIZE
+    shards = (
+        Post.objects.filter(status='published')
+        .annotate(shard=F('pk') / size)
+        .order_by()
+        .values('shard')
+        .annotate(lastmod=Max('updated_at'))
+        .order_by('shard')
+    )
+    shard_lastmods = {row['shard']: row['lastmod'] for row in shards}
+
+    def entries():
+        yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+        yield f'<sitemap><loc>{escape(_site_url("/" + PAGES_SITEMAP))}</loc></sitemap>\n'
+        for shard, lastmod in shard_lastmods.items():
+            location = escape(_site_url('/' + POSTS_SITEMAP.format(shard=shard)))
+            yield f'<sitemap><loc>{location}</loc><lastmod>{lastmod.date().isoformat()}</lastmod></sitemap>\n'
+        yield '</sitemapindex>\n'
+
+    write_file(SITEMAP_INDEX, entries())
+
+    sitemap_dir = _path('sitemaps')
+    if os.path.isdir(sitemap_dir):
+        for name in os.listdir(sitemap_dir):
+            if name.startswith('posts-') and name.endswith('.xml'):
+                shard = int(name[len('posts-'):-len('.xml')])
+                if shard not in shard_lastmods:
+                    remove_file(f'sitemaps/{name}')
+    return list(shard_lastmods)
+
+
+def _write_feeds(directory, title, link, description, posts):
+    for feed_class, filename in FEED_FILES.values():
+        feed = feed_class(
+            title=title,
+            link=link,
+            description=description,
+            feed_url=_site_url(f'/{directory}/{filename}'),
+            language=settings.LANGUAGE_CODE,
+        )
+        for post in posts:
+            feed.add_item(
+                title=post.title,
+                link=_site_url(f'/posts/{post.slug}'),
+                description=post.excerpt,
+                unique_id=_site_url(f'/posts/{post.slug}'),
+                pubdate=post.published_at,
+                updateddate=post.updated_at,
+            )
+        write_file(f'{directory}/{filename}', [feed.writeString('utf-8')])
+
+
+def _latest_posts(category=None):
+    posts = Post.objects.filter(status='published', published_at__lte=timezone.now())
+    if category is not None:
+        posts = posts.filter(categories=category)
+    posts = posts.only('pk', 'title', 'slug', 'excerpt', 'published_at', 'updated_at')
+    return list(posts.order_by('-published_at')[:settings.FEED_ITEM_COUNT])
+
+
+def build_site_feeds():
+    _write_feeds('feeds', 'Latest posts', _site_url('/'), 'Latest posts', _latest_posts())
+
+
+def _read_manifest():
+    try:
+        with open(_path(MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_manifest(manifest):
+    write_file(MANIFEST, [json.dumps(manifest)], compress=False)
+
+
+def build_category_feeds(slugs):
+    """Write the feeds of the given categories, removing feeds of deleted ones."""
+    manifest = _read_manifest()
+    found = set()
+    for category in Category.objects.filter(slug__in=slugs):
+        found.add(category.slug)
+        posts = _latest_posts(category)
+        _write_feeds(
+            f'feeds/categories/{category.slug}', category.name,
+            _site_url(f'/category/{category.slug}'), category.description or category.name, posts,
+        )
+        manifest[category.slug] = [post.pk for post in posts]
+    for slug in set(slugs) - found:
+        shutil.rmtree(_path(f'feeds/categories/{slug}'), ignore_errors=True)
+        manifest.pop(slug, None)
+    if found or set(slugs) & set(_read_manifest()):
+        _write_manifest(manifest)
+
+
+def rebuild_for_posts(post_ids):
+    """
+    Rewrite only the files affected by changes to ``post_ids``: their sitemap
+    shards, the sitemap index, the site feeds and the feeds of categories the
+    posts belong to now or were listed in before.
+    """
+    for shard in {shard_for(pk) for pk in post_ids}:
+        build_posts_sitemap(shard)
+    build_sitemap_index()
+    build_site_feeds()
+
+    changed = set(post_ids)
+    slugs = set(
+        Post.categories.through.objects.filter(post_id__in=post_ids)
+        .values_list('category__slug', flat=True)
+    )
+    slugs.update(slug for slug, listed in _read_manifest().items() if changed.intersection(listed))
+    build_category_feeds(slugs)
+
+
+def rebuild_all():
+    """Regenerate every sitemap and feed file."""
+    build_pages_sitemap()
+    for shard in build_sitemap_index():
+        build_posts_sitemap(shard)
+    build_site_feeds()
+    slugs = list(Category.objects.values_list('slug', flat=True))
+    stale = set(_read_manifest()) - set(slugs)
+    build_category_feeds(slugs + list(stale))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from feeds import builder
+
+
+class Command(BaseCommand):
+    help = 'Generate the sitemap index, sitemap shards and RSS/Atom feeds'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Building sitemaps and feeds...')
+        builder.rebuild_all()
+        self.stdout.write(self.style.SUCCESS('Sitemaps and feeds built.'))
@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from categories.models import Category
+from posts.models import Post
+from posts.signals import posts_changed
+from .tasks import rebuild_feeds_for_posts, rebuild_category_feeds
+
+# Changes to any other field don't show up in sitemaps or feeds
+FEED_FIELDS = {'title', 'slug', 'excerpt', 'status', 'published_at', 'categories'}
+
+
+@receiver(posts_changed, sender=Post)
+def rebuild_post_feeds(sender, post_ids, fields=None, **kwargs):
+    if fields is None or FEED_FIELDS.intersection(fields):
+        rebuild_feeds_for_posts.delay(list(post_ids))
+
+
+@receiver(post_init, sender=Category)
+def remember_category_slug(sender, instance, **kwargs):
+    """Keep the loaded slug so a rename can remove the old feed."""
+    # Read from __dict__ so deferred fields are not fetched
+    instance._feed_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def rebuild_feeds_for_category(sender, instance, **kwargs):
+    # build_category_feeds removes the files of slugs that no longer exist
+    slugs = sorted({instance.slug, instance._feed_slug} - {None})
+    instance._feed_slug = instance.slug
+    transaction.on_commit(lambda: rebuild_category_feeds.delay(slugs))
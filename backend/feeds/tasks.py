@@ -0,0 +1,65 @@
+from celery import shared_task
+from django.core.cache import cache
+import logging
+
+from . import builder
+
+logger = logging.getLogger(__name__)
+
+FEEDS_LOCK_KEY = 'feeds-build-lock'
+FEEDS_LOCK_TIMEOUT = 60 * 10
+
+
+def _locked_out(task, description):
+    """
+    Retry ``task`` while another build holds the lock. Once the retries run
+    out, log and return a message: the nightly ``rebuild_all_feeds`` brings
+    the files up to date.
+    """
+    if task.request.retries >= task.max_retries:
+        logger.warning(f"Feeds still locked, skipped rebuilding {description} until the next full rebuild")
+        return f"Skipped rebuilding {description}"
+    raise task.retry(countdown=10)
+
+
+@shared_task(bind=True, max_retries=10)
+def rebuild_feeds_for_posts(self, post_ids):
+    """
+    Regenerate the sitemap shards and feeds affected by changed posts.
+    """
+    if not cache.add(FEEDS_LOCK_KEY, 1, FEEDS_LOCK_TIMEOUT):
+        return _locked_out(self, f"feeds for posts {post_ids}")
+    try:
+        builder.rebuild_for_posts(post_ids)
+    finally:
+        cache.delete(FEEDS_LOCK_KEY)
+    return f"Rebuilt feeds for {len(post_ids)} posts"
+
+
+@shared_task(bind=True, max_retries=10)
+def rebuild_category_feeds(self, slugs):
+    """
+    Regenerate the pages sitemap and the feeds of changed categories.
+    """
+    if not cache.add(FEEDS_LOCK_KEY, 1, FEEDS_LOCK_TIMEOUT):
+        return _locked_out(self, f"feeds for categories {slugs}")
+    try:
+        builder.build_pages_sitemap()
+        builder.build_category_feeds(slugs)
+    finally:
+        cache.delete(FEEDS_LOCK_KEY)
+    return f"Rebuilt feeds for {len(slugs)} categories"
+
+
+@shared_task(bind=True, max_retries=10)
+def rebuild_all_feeds(self):
+    """
+    Regenerate every sitemap and feed file.
+    """
+    if not cache.add(FEEDS_LOCK_KEY, 1, FEEDS_LOCK_TIMEOUT):
+        return _locked_out(self, "all sitemaps and feeds")
+    try:
+        builder.rebuild_all()
+    finally:
+        cache.delete(FEEDS_LOCK_KEY)
+    return "Rebuilt all sitemaps and feeds"
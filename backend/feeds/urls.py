@@ -0,0 +1,13 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('sitemap.xml', views.sitemap_index, name='sitemap-index'),
+    path('sitemaps/pages.xml', views.pages_sitemap, name='sitemap-pages'),
+    path('sitemaps/posts-<int:shard>.xml', views.posts_sitemap, name='sitemap-posts'),
+    path('feeds/rss.xml', views.site_feed, {'kind': 'rss'}, name='feed-rss'),
+    path('feeds/atom.xml', views.site_feed, {'kind': 'atom'}, name='feed-atom'),
+    path('feeds/categories/<slug:slug>/rss.xml', views.category_feed, {'kind': 'rss'}, name='category-feed-rss'),
+    path('feeds/categories/<slug:slug>/atom.xml', views.category_feed, {'kind': 'atom'}, name='category-feed-atom'),
+]
@@ -0,0 +1,63 @@
+import os
+
+from django.conf import settings
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from . import builder
+
+CONTENT_TYPES = {
+    'sitemap': 'application/xml',
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+}
+
+
+def _serve(request, relative_path, content_type, build):
+    """
+    Serve a prebuilt file, preferring its gzip copy when the client accepts it.
+    Files that have never been built are generated once with ``build``.
+    """
+    path = os.path.join(settings.FEEDS_ROOT, relative_path)
+    if not os.path.exists(path):
+        build()
+        if not os.path.exists(path):
+            raise Http404
+    if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '') and os.path.exists(path + '.gz'):
+        response = FileResponse(open(path + '.gz', 'rb'), content_type=content_type)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    patch_cache_control(response, public=True, max_age=300)
+    return response
+
+
+def sitemap_index(request):
+    return _serve(request, builder.SITEMAP_INDEX, CONTENT_TYPES['sitemap'], builder.build_sitemap_index)
+
+
+def pages_sitemap(request):
+    return _serve(request, builder.PAGES_SITEMAP, CONTENT_TYPES['sitemap'], builder.build_pages_sitemap)
+
+
+def posts_sitemap(request, shard):
+    def build():
+        # Any integer matches the URL; only shards with posts get a file
+        if builder.has_posts_shard(shard):
+            builder.build_posts_sitemap(shard)
+
+    return _serve(request, builder.POSTS_SITEMAP.format(shard=shard), CONTENT_TYPES['sitemap'], build)
+
+
+def site_feed(request, kind):
+    filename = builder.FEED_FILES[kind][1]
+    return _serve(request, f'feeds/{filename}', CONTENT_TYPES[kind], builder.build_site_feeds)
+
+
+def category_feed(request, slug, kind):
+    filename = builder.FEED_FILES[kind][1]
+    return _serve(
+        request, f'feeds/categories/{slug}/{filename}', CONTENT_TYPES[kind],
+        lambda: builder.build_category_feeds([slug]),
+    )
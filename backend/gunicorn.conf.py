@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration, picked up automatically from the working directory
+(`gunicorn blog.wsgi:application`, or `blog.asgi:application` with
+`-k uvicorn.workers.UvicornWorker`).
+
+Each worker warms up for at most GUNICORN_WARMUP_TIMEOUT seconds before
+taking traffic, so new or restarted containers serve their first requests
+at full speed. Gunicorn's own defaults are kept (one worker, no
+preloading); GUNICORN_WORKERS sizes the pool and GUNICORN_PRELOAD=true
+imports the application once in the master and forks it into the workers.
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
+warmup_timeout = float(os.environ.get('GUNICORN_WARMUP_TIMEOUT', 10))
+
+
+def on_starting(server):
+    if preload_app:
+        from blog.warmup import preload_modules
+        preload_modules()
+
+
+def post_worker_init(worker):
+    # The application is loaded; the arbiter expects a heartbeat within
+    # worker.timeout, so the warm-up must not take longer
+    from blog.warmup import warm_up
+    worker.notify()
+    warm_up(min(warmup_timeout, worker.timeout))
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+
+class MediaCacheMiddleware:
+    """
+    Mark content-addressed media (utils.storage) as cacheable forever: the
+    bytes behind such a URL never change.
+    """
+    MAX_AGE = 60 * 60 * 24 * 365
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        path = request.path
+        if response.status_code == 200 and path.startswith(f'{settings.MEDIA_URL}{settings.CONTENT_ADDRESSED_DIR}/'):
+            patch_cache_control(response, public=True, max_age=self.MAX_AGE, immutable=True)
+            if path.lower().endswith(('.jpg', '.jpeg', '.png')):
+                # WebPMiddleware may answer with the .webp copy
+                patch_vary_headers(response, ('Accept',))
+        return response
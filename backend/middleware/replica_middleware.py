@@ -0,0 +1,53 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from blog.db_routers import use_replicas
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe API requests read from the database replicas.
+
+    Any unsafe request sets a short-lived cookie that keeps the client on
+    the primary, so it reads its own writes while the replicas catch up.
+    Works in both sync and async middleware chains.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.reads_from_replicas(request):
+            with use_replicas():
+                return self.get_response(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        if self.reads_from_replicas(request):
+            with use_replicas():
+                return await self.get_response(request)
+        return self.process_response(request, await self.get_response(request))
+
+    def reads_from_replicas(self, request):
+        return (
+            request.method in SAFE_METHODS
+            and request.path.startswith(settings.REPLICA_ROUTED_PATHS)
+            and settings.REPLICA_STICKY_COOKIE not in request.COOKIES
+        )
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,91 @@
+import hmac
+import json
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.throttling import BaseThrottle
+
+from api.throttles import hit, ahit
+
+SUBSCRIBE_PATH = '/api/v1/subscribe/'
+DETAIL_PATH = re.compile(r'^/api/v1/(posts|categories|tags)/(?!trending/|batch/)[^/]+/(related/)?$')
+INTERNAL_TOKEN_HEADER = 'HTTP_X_INTERNAL_TOKEN'
+
+
+class ApiThrottleMiddleware:
+    """
+    Rate limit API clients per IP before any view work runs.
+
+    Requests fall into the 'list', 'search', 'detail' and 'subscribe' scopes,
+    limited by the rates of the same name in REST_FRAMEWORK's
+    DEFAULT_THROTTLE_RATES with sliding-window counters in Redis
+    (api.throttles). Throttled clients get a small 429 with Retry-After.
+    The Next.js server sends API_INTERNAL_TOKEN and is never throttled.
+    Works in both sync and async middleware chains.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rates = settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        scope = self.get_scope(request)
+        if scope:
+            retry_after = hit(scope, self.get_ident(request), self.rates[scope])
+            if retry_after is not None:
+                return self.throttled(retry_after)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        scope = self.get_scope(request)
+        if scope:
+            retry_after = await ahit(scope, self.get_ident(request), self.rates[scope])
+            if retry_after is not None:
+                return self.throttled(retry_after)
+        return await self.get_response(request)
+
+    def get_scope(self, request):
+        """Return the throttle scope of a request, or None when it isn't throttled."""
+        if not settings.API_THROTTLE_ENABLED or not request.path.startswith('/api/'):
+            return None
+        if self.is_internal(request):
+            return None
+        if request.method == 'POST' and request.path == SUBSCRIBE_PATH:
+            scope = 'subscribe'
+        elif request.method not in ('GET', 'HEAD'):
+            return None
+        elif request.GET.get('search'):
+            scope = 'search'
+        elif DETAIL_PATH.match(request.path):
+            scope = 'detail'
+        else:
+            scope = 'list'
+        return scope if scope in self.rates else None
+
+    def is_internal(self, request):
+        token = settings.API_INTERNAL_TOKEN
+        if not token:
+            return False
+        try:
+            # As bytes: compare_digest rejects non-ASCII str
+            return hmac.compare_digest(request.META.get(INTERNAL_TOKEN_HEADER, '').encode(), token.encode())
+        except (TypeError, UnicodeError):
+            return False
+
+    def get_ident(self, request):
+        # REMOTE_ADDR, or X-Forwarded-For behind NUM_PROXIES proxies, like the DRF throttles
+        return BaseThrottle().get_ident(request)
+
+    def throttled(self, retry_after):
+        body = {'detail': f'Request was throttled. Expected available in {retry_after} seconds.'}
+        response = HttpResponse(json.dumps(body), status=429, content_type='application/json')
+        response['Retry-After'] = str(retry_after)
+        return response
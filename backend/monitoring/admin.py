@@ -0,0 +1,66 @@
+from django.contrib import admin
+from .models import SlowQuery, TaskMetrics
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('short_sql', 'calls', 'mean', 'max', 'total', 'has_plan', 'last_seen')
+    search_fields = ('normalized_sql',)
+    ordering = ('-total_ms',)
+    
+    def short_sql(self, obj):
+        return str(obj)
+    short_sql.short_description = 'Query'
+    
+    def mean(self, obj):
+        return f'{obj.mean_ms:.1f} ms'
+    
+    def max(self, obj):
+        return f'{obj.max_ms:.1f} ms'
+    max.admin_order_field = 'max_ms'
+    
+    def total(self, obj):
+        return f'{obj.total_ms / 1000:.1f} s'
+    total.admin_order_field = 'total_ms'
+    
+    def has_plan(self, obj):
+        return bool(obj.plan)
+    has_plan.boolean = True
+    has_plan.short_description = 'Plan'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TaskMetrics)
+class TaskMetricsAdmin(admin.ModelAdmin):
+    list_display = (
+        'task_name', 'period_start', 'runs', 'failures', 'retries',
+        'mean_runtime', 'max_runtime', 'mean_queue_wait', 'max_queue_wait',
+    )
+    list_filter = ('task_name', 'period_start')
+    date_hierarchy = 'period_start'
+    ordering = ('-period_start', 'task_name')
+    
+    def mean_runtime(self, obj):
+        return f'{obj.mean_runtime_ms:.1f} ms'
+    
+    def max_runtime(self, obj):
+        return f'{obj.max_runtime_ms:.1f} ms'
+    max_runtime.admin_order_field = 'max_runtime_ms'
+    
+    def mean_queue_wait(self, obj):
+        return f'{obj.mean_queue_ms:.1f} ms'
+    
+    def max_queue_wait(self, obj):
+        return f'{obj.max_queue_ms:.1f} ms'
+    max_queue_wait.admin_order_field = 'max_queue_ms'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
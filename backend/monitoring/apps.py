@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+
+    def ready(self):
+        # Install the slow query recorder on new connections
+        import monitoring.slow_queries
+        # Connect the Celery task signal handlers
+        import monitoring.task_metrics
@@ -0,0 +1,37 @@
+import time
+
+from celery.result import ResultSet
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.tasks import benchmark_task
+
+
+class Command(BaseCommand):
+    help = 'Queue no-op tasks and report how fast the running Celery workers get through them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help='Number of tasks to queue')
+        parser.add_argument('--sleep-ms', type=int, default=0, help='Time each task sleeps, to simulate work')
+        parser.add_argument('--timeout', type=float, default=300)
+
+    def handle(self, *args, **options):
+        count = options['count']
+        started = time.time()
+        sent_at, results = [], []
+        for _ in range(count):
+            sent_at.append(time.time())
+            results.append(benchmark_task.delay(options['sleep_ms']))
+        queued = time.time() - started
+        self.stdout.write(f'Queued {count} tasks in {queued:.2f}s; waiting for workers...')
+        try:
+            ran_at = ResultSet(results).join(timeout=options['timeout'])
+        except Exception as exc:
+            raise CommandError(f'Tasks did not finish: {exc!r}. Is a worker running?')
+        elapsed = time.time() - started
+
+        latencies = sorted((ran - sent) * 1000 for sent, ran in zip(sent_at, ran_at))
+        self.stdout.write(f'throughput: {count / elapsed:.1f} tasks/s ({elapsed:.2f}s total)')
+        for name, pct in (('p50', 50), ('p95', 95), ('p99', 99)):
+            value = latencies[min(len(latencies) - 1, len(latencies) * pct // 100)]
+            self.stdout.write(f'{name} send-to-start: {value:.1f} ms')
+        self.stdout.write('Per-task queue wait and runtime are in the admin under Monitoring > Task metrics.')
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(max_length=200)),
+                ('period_start', models.DateTimeField()),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('retries', models.PositiveIntegerField(default=0)),
+                ('total_runtime_ms', models.FloatField(default=0)),
+                ('max_runtime_ms', models.FloatField(default=0)),
+                ('queued', models.PositiveIntegerField(default=0)),
+                ('total_queue_ms', models.FloatField(default=0)),
+                ('max_queue_ms', models.FloatField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'task metrics',
+                'ordering': ['-period_start', 'task_name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskmetrics',
+            constraint=models.UniqueConstraint(fields=('task_name', 'period_start'), name='unique_task_metrics_period'),
+        ),
+    ]
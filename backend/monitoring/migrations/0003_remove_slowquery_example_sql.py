@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:44
+
+import re
+
+from django.db import migrations, models
+
+
+def mask_plans(apps, schema_editor):
+    """Plans captured so far repeat the literals of their query."""
+    SlowQuery = apps.get_model('monitoring', 'SlowQuery')
+    string = re.compile(r"'(?:[^']|'')*'")
+    for entry in SlowQuery.objects.exclude(plan='').only('pk', 'plan'):
+        SlowQuery.objects.filter(pk=entry.pk).update(plan=string.sub("'?'", entry.plan))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0002_taskmetrics'),
+    ]
+
+    operations = [
+        migrations.RunPython(mask_plans, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='slowquery',
+            name='example_sql',
+        ),
+        migrations.AlterField(
+            model_name='slowquery',
+            name='plan',
+            field=models.TextField(blank=True, help_text='EXPLAIN (ANALYZE, BUFFERS) of a sampled occurrence, string literals masked.'),
+        ),
+    ]
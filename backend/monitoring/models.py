@@ -0,0 +1,59 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    """Aggregated statistics for one normalized query that exceeded SLOW_QUERY_THRESHOLD_MS."""
+    fingerprint = models.CharField(max_length=40, unique=True)
+    normalized_sql = models.TextField()
+    calls = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField()
+    plan = models.TextField(blank=True, help_text="EXPLAIN (ANALYZE, BUFFERS) of a sampled occurrence, string literals masked.")
+    plan_database = models.CharField(max_length=100, blank=True)
+    plan_captured_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name_plural = 'slow queries'
+        ordering = ['-total_ms']
+    
+    def __str__(self):
+        return self.normalized_sql[:80]
+    
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.calls if self.calls else 0
+
+
+class TaskMetrics(models.Model):
+    """Celery task executions of one task name during one hour (see monitoring.task_metrics)."""
+    task_name = models.CharField(max_length=200)
+    period_start = models.DateTimeField()
+    runs = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    retries = models.PositiveIntegerField(default=0)
+    total_runtime_ms = models.FloatField(default=0)
+    max_runtime_ms = models.FloatField(default=0)
+    # Runs whose queue wait is known (published through the broker)
+    queued = models.PositiveIntegerField(default=0)
+    total_queue_ms = models.FloatField(default=0)
+    max_queue_ms = models.FloatField(default=0)
+    
+    class Meta:
+        verbose_name_plural = 'task metrics'
+        ordering = ['-period_start', 'task_name']
+        constraints = [
+            models.UniqueConstraint(fields=['task_name', 'period_start'], name='unique_task_metrics_period'),
+        ]
+    
+    def __str__(self):
+        return f'{self.task_name} @ {self.period_start:%Y-%m-%d %H:00}'
+    
+    @property
+    def mean_runtime_ms(self):
+        return self.total_runtime_ms / self.runs if self.runs else 0
+    
+    @property
+    def mean_queue_ms(self):
+        return self.total_queue_ms / self.queued if self.queued else 0
@@ -0,0 +1,219 @@
+"""
+Opt-in slow query recorder (SLOW_QUERY_THRESHOLD_MS).
+
+An execute wrapper on every connection times each query. Queries over the
+threshold are normalized (literals replaced with ``?``) and buffered in a
+Redis list, or in-process without REDIS_URL, so the query that was slow
+never waits on the broker. The ``flush_slow_queries`` task folds the buffer
+into per-fingerprint statistics every minute (``SlowQuery``, browsable in
+the admin). Only normalized SQL is stored.
+
+A SLOW_QUERY_EXPLAIN_RATE share of slow plain SELECTs (no locking clause
+such as FOR UPDATE, no SELECT INTO, a single statement) keeps its full
+text in the buffer, so the flush can re-run it with EXPLAIN (ANALYZE, BUFFERS), on a
+replica when one is usable. The plan is stored with its string literals
+masked, next to the query's numbers.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, IntegrityError, connections, router, transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.db_routers import use_replicas
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_KEY = 'slow-query-explained:{fingerprint}'
+PENDING_KEY = 'monitoring:slow-queries:pending'
+# Occurrences kept between flushes; older ones are dropped first
+MAX_PENDING = 10000
+
+# Set while recording, so the recorder's own queries are never reported
+_recording = contextvars.ContextVar('slow_query_recording', default=False)
+
+_PLACEHOLDER = re.compile(r'%s')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+# Clauses that make a SELECT take row locks or write when it is re-run
+_NOT_READ_ONLY = re.compile(r'\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b|\bINTO\b|;', re.IGNORECASE)
+
+# In-process fallback used when Redis is not configured
+_local_lock = threading.Lock()
+_local_pending = []
+
+
+def normalize(sql):
+    """Replace literals and placeholders with ``?`` so occurrences of one query share a fingerprint."""
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()
+
+
+def is_plain_select(sql):
+    """Whether re-running ``sql`` under EXPLAIN ANALYZE only reads."""
+    sql = normalize(sql)
+    return sql[:6].upper() == 'SELECT' and not _NOT_READ_ONLY.search(sql)
+
+
+def mask_literals(plan):
+    """Hide the string literals (emails, session keys) a plan repeats from its query."""
+    return _STRING.sub("'?'", plan)
+
+
+def record_slow_queries(execute, sql, params, many, context):
+    if _recording.get():
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+            report(sql, params, many, context, duration_ms)
+
+
+def report(sql, params, many, context, duration_ms):
+    """Buffer a slow query for the next flush; never lets a failure reach the caller."""
+    try:
+        entry = {'sql': normalize(sql), 'ms': duration_ms}
+        if (
+            not many and is_plain_select(sql)
+            and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE
+        ):
+            connection = context['connection']
+            entry['explain'] = connection.ops.last_executed_query(context['cursor'].cursor, sql, params)
+        client = get_redis()
+        if client is None:
+            with _local_lock:
+                _local_pending.append(entry)
+                del _local_pending[:-MAX_PENDING]
+            return
+        pipe = client.pipeline()
+        pipe.rpush(PENDING_KEY, json.dumps(entry))
+        pipe.ltrim(PENDING_KEY, -MAX_PENDING, -1)
+        pipe.execute()
+    except Exception:
+        logger.warning('Could not record a slow query', exc_info=True)
+
+
+def pop_pending():
+    """Atomically take the buffered occurrences."""
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            pending = list(_local_pending)
+            _local_pending.clear()
+        return pending
+    pipe = client.pipeline()
+    pipe.lrange(PENDING_KEY, 0, -1)
+    pipe.delete(PENDING_KEY)
+    raw, _ = pipe.execute()
+    return [json.loads(item) for item in raw]
+
+
+def flush(entries):
+    """Fold buffered occurrences into their fingerprints' statistics; returns the number of queries."""
+    grouped = {}
+    for entry in entries:
+        stats = grouped.setdefault(entry['sql'], {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'explain': None})
+        stats['calls'] += 1
+        stats['total_ms'] += entry['ms']
+        stats['max_ms'] = max(stats['max_ms'], entry['ms'])
+        stats['explain'] = stats['explain'] or entry.get('explain')
+    for normalized, stats in grouped.items():
+        record(normalized, **stats)
+    return len(grouped)
+
+
+def record(normalized, calls, total_ms, max_ms, explain=None):
+    """
+    Add occurrences to the statistics of a normalized query, capturing a plan
+    from ``explain`` (the full text of one occurrence) when given.
+    """
+    from .models import SlowQuery
+
+    key = fingerprint(normalized)
+    token = _recording.set(True)
+    try:
+        now = timezone.now()
+        rows = SlowQuery.objects.filter(fingerprint=key)
+        changes = dict(
+            calls=F('calls') + calls,
+            total_ms=F('total_ms') + total_ms,
+            max_ms=Greatest('max_ms', Value(max_ms)),
+            last_seen=now,
+        )
+        if not rows.update(**changes):
+            try:
+                with transaction.atomic():
+                    SlowQuery.objects.create(
+                        fingerprint=key, normalized_sql=normalized, calls=calls, total_ms=total_ms,
+                        max_ms=max_ms, last_seen=now,
+                    )
+            except IntegrityError:
+                # Created concurrently by another worker
+                rows.update(**changes)
+        if explain and cache.add(EXPLAIN_KEY.format(fingerprint=key), 1, settings.SLOW_QUERY_EXPLAIN_INTERVAL):
+            alias, plan = explain_analyze(explain)
+            if plan:
+                rows.update(plan=mask_literals(plan), plan_database=alias, plan_captured_at=now)
+    finally:
+        _recording.reset(token)
+
+
+def explain_analyze(sql):
+    """
+    Run EXPLAIN (ANALYZE, BUFFERS) for a plain SELECT on a usable replica
+    (or the primary) inside a rolled-back transaction. Returns
+    ``(alias, plan)``; the plan is None on databases other than PostgreSQL,
+    for statements that aren't plain SELECTs, or on errors.
+    """
+    from .models import SlowQuery
+
+    if not is_plain_select(sql):
+        return None, None
+
+    with use_replicas():
+        alias = router.db_for_read(SlowQuery) or DEFAULT_DB_ALIAS
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return alias, None
+    try:
+        with transaction.atomic(using=alias):
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL statement_timeout = %s', [settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS])
+                cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {sql}')
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+            transaction.set_rollback(True, using=alias)
+    except DatabaseError:
+        logger.warning('Could not EXPLAIN slow query on %s', alias, exc_info=True)
+        return alias, None
+    return alias, plan
+
+
+@receiver(connection_created)
+def add_slow_query_recorder(sender, connection, **kwargs):
+    if settings.SLOW_QUERY_THRESHOLD_MS and record_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_slow_queries)
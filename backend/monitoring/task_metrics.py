@@ -0,0 +1,172 @@
+"""
+Celery task metrics: runs, failures, retries, runtime and queue wait per task name.
+
+``before_task_publish`` stamps each message with its publish time and
+``task_prerun``/``task_postrun`` time the execution. The numbers are
+buffered in a Redis hash (one increment per task, no database write on
+the worker's hot path) and folded into hourly ``TaskMetrics`` rows by the
+``flush_task_metrics`` task, next to the slow queries in the admin.
+
+Queue wait is measured from publishing (or from the ETA/countdown, when
+the task was scheduled) to the start of execution, so it includes the
+time spent waiting for a free worker. Without REDIS_URL an in-process
+buffer is used, which only sees tasks run by the flushing process.
+"""
+from collections import defaultdict
+from datetime import datetime
+import threading
+import time
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from utils.redis_client import get_redis
+
+PENDING_KEY = 'monitoring:task-metrics:pending'
+PUBLISHED_HEADER = 'published_at'
+
+# Buffered metric -> (TaskMetrics field, how it is combined)
+METRICS = {
+    'runs': ('runs', 'sum'),
+    'failures': ('failures', 'sum'),
+    'retries': ('retries', 'sum'),
+    'runtime_ms': ('total_runtime_ms', 'sum'),
+    'max_runtime_ms': ('max_runtime_ms', 'max'),
+    'queued': ('queued', 'sum'),
+    'queue_ms': ('total_queue_ms', 'sum'),
+    'max_queue_ms': ('max_queue_ms', 'max'),
+}
+
+# KEYS: pending hash
+# ARGV: task name, runtime ms, queue wait ms ('' when unknown), state
+RECORD_SCRIPT = """
+local prefix = ARGV[1] .. '|'
+local function set_max(field, value)
+    local current = tonumber(redis.call('HGET', KEYS[1], prefix .. field))
+    if not current or current < value then
+        redis.call('HSET', KEYS[1], prefix .. field, value)
+    end
+end
+redis.call('HINCRBY', KEYS[1], prefix .. 'runs', 1)
+if ARGV[4] == 'FAILURE' then
+    redis.call('HINCRBY', KEYS[1], prefix .. 'failures', 1)
+elseif ARGV[4] == 'RETRY' then
+    redis.call('HINCRBY', KEYS[1], prefix .. 'retries', 1)
+end
+redis.call('HINCRBYFLOAT', KEYS[1], prefix .. 'runtime_ms', ARGV[2])
+set_max('max_runtime_ms', tonumber(ARGV[2]))
+if ARGV[3] ~= '' then
+    redis.call('HINCRBY', KEYS[1], prefix .. 'queued', 1)
+    redis.call('HINCRBYFLOAT', KEYS[1], prefix .. 'queue_ms', ARGV[3])
+    set_max('max_queue_ms', tonumber(ARGV[3]))
+end
+return 1
+"""
+
+# In-process fallback used when Redis is not configured
+_local_lock = threading.Lock()
+_local_metrics = defaultdict(lambda: defaultdict(float))
+
+
+def record(task_name, runtime_ms, queue_ms=None, state='SUCCESS'):
+    """Buffer the metrics of one task execution."""
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            metrics = _local_metrics[task_name]
+            metrics['runs'] += 1
+            if state == 'FAILURE':
+                metrics['failures'] += 1
+            elif state == 'RETRY':
+                metrics['retries'] += 1
+            metrics['runtime_ms'] += runtime_ms
+            metrics['max_runtime_ms'] = max(metrics['max_runtime_ms'], runtime_ms)
+            if queue_ms is not None:
+                metrics['queued'] += 1
+                metrics['queue_ms'] += queue_ms
+                metrics['max_queue_ms'] = max(metrics['max_queue_ms'], queue_ms)
+        return
+    client.eval(RECORD_SCRIPT, 1, PENDING_KEY, task_name, runtime_ms, '' if queue_ms is None else queue_ms, state)
+
+
+def pop_pending():
+    """Atomically take the buffered metrics as ``{task name: {metric: value}}``."""
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            pending = {name: dict(metrics) for name, metrics in _local_metrics.items()}
+            _local_metrics.clear()
+        return pending
+    pipe = client.pipeline()
+    pipe.hgetall(PENDING_KEY)
+    pipe.delete(PENDING_KEY)
+    raw, _ = pipe.execute()
+    pending = defaultdict(dict)
+    for field, value in raw.items():
+        name, metric = field.decode().rsplit('|', 1)
+        pending[name][metric] = float(value)
+    return dict(pending)
+
+
+def persist(pending):
+    """Add buffered metrics to the current hour's ``TaskMetrics`` rows."""
+    from .models import TaskMetrics
+
+    period_start = timezone.now().replace(minute=0, second=0, microsecond=0)
+    for name, metrics in pending.items():
+        changes, initial = {}, {}
+        for metric, value in metrics.items():
+            field, combine = METRICS[metric]
+            initial[field] = value
+            if combine == 'max':
+                changes[field] = Greatest(field, Value(value))
+            else:
+                changes[field] = F(field) + value
+        rows = TaskMetrics.objects.filter(task_name=name, period_start=period_start)
+        if rows.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                TaskMetrics.objects.create(task_name=name, period_start=period_start, **initial)
+        except IntegrityError:
+            # Created concurrently by another flush
+            rows.update(**changes)
+    return len(pending)
+
+
+def queue_wait_ms(request):
+    """Milliseconds between a task becoming due and starting, or None if unknown."""
+    published_at = request.get(PUBLISHED_HEADER) or (request.get('headers') or {}).get(PUBLISHED_HEADER)
+    if published_at is None:
+        return None
+    ready_at = float(published_at)
+    eta = request.get('eta')
+    if eta:
+        if isinstance(eta, str):
+            eta = datetime.fromisoformat(eta)
+        ready_at = max(ready_at, eta.timestamp())
+    return max(0.0, (time.time() - ready_at) * 1000)
+
+
+@before_task_publish.connect
+def stamp_published_at(sender=None, headers=None, **kwargs):
+    if headers is not None:
+        headers[PUBLISHED_HEADER] = time.time()
+
+
+@task_prerun.connect
+def start_timer(sender=None, task=None, **kwargs):
+    task.request.metrics_queue_ms = queue_wait_ms(task.request)
+    task.request.metrics_started = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task(sender=None, task=None, state=None, **kwargs):
+    started = task.request.get('metrics_started')
+    if started is None:
+        return
+    runtime_ms = (time.perf_counter() - started) * 1000
+    record(task.name, runtime_ms, task.request.get('metrics_queue_ms'), state)
@@ -0,0 +1,37 @@
+import time
+
+from celery import shared_task
+
+from . import slow_queries, task_metrics
+
+
+@shared_task
+def flush_slow_queries():
+    """
+    Fold the buffered slow queries into their fingerprints' statistics,
+    capturing plans for the occurrences sampled for EXPLAIN.
+    """
+    count = slow_queries.flush(slow_queries.pop_pending())
+    return f"Flushed {count} slow queries"
+
+
+@shared_task
+def flush_task_metrics():
+    """
+    Persist the buffered Celery task metrics to the hourly TaskMetrics rows.
+    """
+    count = task_metrics.persist(task_metrics.pop_pending())
+    return f"Flushed metrics for {count} tasks"
+
+
+@shared_task
+def benchmark_task(sleep_ms=0, fail=False):
+    """
+    No-op task for measuring worker throughput (see the benchmark_tasks
+    command). Returns the time it ran at.
+    """
+    if sleep_ms:
+        time.sleep(sleep_ms / 1000)
+    if fail:
+        raise RuntimeError('benchmark_task failed on request')
+    return time.time()
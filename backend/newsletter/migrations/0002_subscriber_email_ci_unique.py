@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:44
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+def lowercase_emails(apps, schema_editor):
+    """
+    Merge subscribers whose emails differ only in case, keeping an active
+    one (the oldest), and lowercase the rest so the constraint can be added.
+    """
+    Subscriber = apps.get_model('newsletter', 'Subscriber')
+    seen = set()
+    duplicates = []
+    for subscriber in Subscriber.objects.order_by('-is_active', 'created_at', 'pk'):
+        email = subscriber.email.strip().lower()
+        if email in seen:
+            duplicates.append(subscriber.pk)
+        else:
+            seen.add(email)
+    Subscriber.objects.filter(pk__in=duplicates).delete()
+    for subscriber in Subscriber.objects.only('pk', 'email'):
+        email = subscriber.email.strip().lower()
+        if subscriber.email != email:
+            Subscriber.objects.filter(pk=subscriber.pk).update(email=email)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='subscriber',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='newsletter_subscriber_email_ci_unique'),
+        ),
+    ]
@@ -1,4 +1,14 @@
 from django.db import models
+from django.db.models.functions import Lower
+from utils import counters
+
+
+class SubscriberQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if 'is_active' in kwargs:
+            counters.invalidate('active_subscribers')
+        return rows
 
 
 class Subscriber(models.Model):
@@ -7,8 +17,13 @@ class Subscriber(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = SubscriberQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(Lower('email'), name='newsletter_subscriber_email_ci_unique'),
+        ]
     
     def __str__(self):
-        return self.email 
\ No newline at end of file
+        return self.email
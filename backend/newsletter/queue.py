@@ -0,0 +1,110 @@
+"""
+Redis-backed ingestion queue for newsletter sign-ups.
+
+The subscribe endpoint pushes validated sign-ups onto a Redis list and a
+Celery task drains it in batches, so a burst of sign-ups turns into a few
+bulk INSERTs instead of one uniqueness check and INSERT per request.
+
+A batch is moved to a processing list (LMOVE) rather than removed, and
+acknowledged only once it is written, so a failed write loses nothing: the
+next drain puts unacknowledged sign-ups back at the head of the queue.
+"""
+import json
+
+from django.conf import settings
+
+from utils.redis_client import get_redis
+from utils import counters
+from .models import Subscriber
+
+QUEUE_KEY = 'newsletter:subscribe:queue'
+PENDING_KEY = 'newsletter:subscribe:pending'
+PROCESSING_KEY = 'newsletter:subscribe:processing'
+
+
+def normalize_email(email):
+    """Emails are stored lowercased so duplicates are detected case-insensitively."""
+    return email.strip().lower()
+
+
+def queue_enabled():
+    """Return True when sign-ups should go through the queue."""
+    return settings.NEWSLETTER_QUEUE_SUBSCRIPTIONS and get_redis() is not None
+
+
+def enqueue_subscriber(email, name=''):
+    """
+    Queue a sign-up for the next drain.
+
+    Returns False if the same email is already waiting in the queue.
+    """
+    client = get_redis()
+    email = normalize_email(email)
+    if not client.sadd(PENDING_KEY, email):
+        return False
+    client.rpush(QUEUE_KEY, json.dumps({'email': email, 'name': name}))
+    return True
+
+
+def pop_batch(size):
+    """
+    Atomically move up to ``size`` queued sign-ups to the processing list
+    and return them as raw items; ``ack`` removes them once written.
+    """
+    pipe = get_redis().pipeline()
+    for _ in range(size):
+        pipe.lmove(QUEUE_KEY, PROCESSING_KEY, 'LEFT', 'RIGHT')
+    return [item for item in pipe.execute() if item is not None]
+
+
+def decode(items):
+    return [json.loads(item) for item in items]
+
+
+def ack(items):
+    """Drop written sign-ups from the processing list."""
+    if items:
+        pipe = get_redis().pipeline()
+        for item in items:
+            pipe.lrem(PROCESSING_KEY, 1, item)
+        pipe.execute()
+
+
+def requeue_unacked():
+    """
+    Put sign-ups left in the processing list by a failed drain back at the
+    head of the queue, in order. Returns how many were moved.
+    """
+    client = get_redis()
+    moved = 0
+    while client.lmove(PROCESSING_KEY, QUEUE_KEY, 'RIGHT', 'LEFT') is not None:
+        moved += 1
+    return moved
+
+
+def release(emails):
+    """Forget queued emails once they have been written to the database."""
+    if emails:
+        get_redis().srem(PENDING_KEY, *emails)
+
+
+def save_subscribers(entries):
+    """
+    Insert a batch of sign-ups, skipping emails that already exist.
+
+    Uses ``bulk_create(ignore_conflicts=True)`` which becomes
+    ``INSERT ... ON CONFLICT DO NOTHING`` on PostgreSQL.
+    Returns the list of normalized emails in the batch.
+    """
+    unique = {}
+    for entry in entries:
+        email = normalize_email(entry['email'])
+        unique.setdefault(email, entry.get('name', ''))
+    Subscriber.objects.bulk_create(
+        [Subscriber(email=email, name=name) for email, name in unique.items()],
+        ignore_conflicts=True,
+    )
+    # bulk_create sends no signals and conflicts are skipped silently,
+    # so let the dashboard recount on its next read
+    counters.invalidate('active_subscribers')
+    return list(unique)
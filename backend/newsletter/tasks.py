@@ -0,0 +1,35 @@
+from celery import shared_task
+from django.conf import settings
+import logging
+
+from .queue import ack, decode, pop_batch, release, requeue_unacked, save_subscribers, queue_enabled
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def drain_subscriber_queue(batch_size=None):
+    """
+    Drain queued newsletter sign-ups into the database in batches.
+    """
+    if not queue_enabled():
+        return "Subscriber queue disabled"
+
+    batch_size = batch_size or settings.NEWSLETTER_QUEUE_BATCH_SIZE
+    requeued = requeue_unacked()
+    if requeued:
+        logger.warning(f"Requeued {requeued} sign-ups from an interrupted drain")
+    total = 0
+    while True:
+        items = pop_batch(batch_size)
+        if not items:
+            break
+        # A failing write leaves the batch in the processing list
+        emails = save_subscribers(decode(items))
+        ack(items)
+        release(emails)
+        total += len(emails)
+
+    if total:
+        logger.info(f"Saved {total} queued newsletter sign-ups")
+    return f"Drained {total} queued subscribers"
@@ -1,7 +1,12 @@
 from django.contrib import admin
 from django.utils import timezone
-from .models import Post
+from .models import Post, ExternalImage
+from .bulk import bulk_update_posts, bulk_set_category
+from .admin_filters import CachedCategoryListFilter, PublishedMonthListFilter
 from django_summernote.admin import SummernoteModelAdmin
+from categories.models import Category
+from search.fulltext import search_posts
+from utils.paginator import EstimatedCountPaginator
 
 
 @admin.register(Post)
@@ -24,43 +29,99 @@ class PostAdmin(SummernoteModelAdmin):
         'is_featured',
         'published_at',
     )
-    list_filter = ('status', 'is_featured', 'published_at', 'categories')
+    list_filter = (
+        'status',
+        'is_featured',
+        'published_at',
+        PublishedMonthListFilter,
+        ('categories', CachedCategoryListFilter),
+    )
     search_fields = ('title', 'slug', 'excerpt', 'content')
     prepopulated_fields = {'slug': ('title',)}
-    date_hierarchy = 'published_at'
     ordering = ('-published_at',)
     filter_horizontal = ('categories',)
+    # Avoid exact COUNT(*) queries on large archives
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Use the indexed full-text/trigram search instead of icontains over every field."""
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+    
+    actions = [
+        'schedule_selected_posts',
+        'publish_selected_posts',
+        'unpublish_selected_posts',
+        'feature_selected_posts',
+        'unfeature_selected_posts',
+    ]
     
-    actions = ['schedule_selected_posts']
+    # Bulk actions run as set-based updates through posts.bulk so that large
+    # selections don't save (and re-process images for) each post in turn.
     
     def schedule_selected_posts(self, request, queryset):
         """Schedule posts to be published at their published_at time"""
-        updated = 0
-        already_scheduled = 0
-        now = timezone.now()
-        
-        for post in queryset:
-            # Skip posts that are already published or have a published_at date in the past
-            if post.status == 'published' or not post.published_at or post.published_at <= now:
-                already_scheduled += 1
-                continue
-            
-            # Ensure the post remains a draft so it can be published by Celery later
-            if post.status != 'draft':
-                post.status = 'draft'
-                post.save()
-                updated += 1
+        selected = queryset.count()
+        # Posts that are already published or have a published_at date in the past are skipped;
+        # the rest are kept as drafts so they can be published by Celery later
+        eligible = queryset.filter(published_at__gt=timezone.now()).exclude(status='published')
+        updated = bulk_update_posts(eligible, status='draft')
+        skipped = selected - updated
         
         if updated:
             message = f"{updated} posts have been scheduled for future publication."
-            if already_scheduled:
-                message += f" {already_scheduled} posts were skipped (already published or past date)."
+            if skipped:
+                message += f" {skipped} posts were skipped (already published or past date)."
             self.message_user(request, message)
         else:
             self.message_user(request, "No posts were scheduled. Posts must have a future publication date.")
     
     schedule_selected_posts.short_description = "Schedule selected posts for future publication"
     
+    def publish_selected_posts(self, request, queryset):
+        updated = bulk_update_posts(queryset.exclude(status='published'), status='published')
+        self.message_user(request, f"{updated} posts have been published.")
+    
+    publish_selected_posts.short_description = "Publish selected posts"
+    
+    def unpublish_selected_posts(self, request, queryset):
+        updated = bulk_update_posts(queryset.filter(status='published'), status='draft')
+        self.message_user(request, f"{updated} posts have been moved back to draft.")
+    
+    unpublish_selected_posts.short_description = "Unpublish selected posts"
+    
+    def feature_selected_posts(self, request, queryset):
+        updated = bulk_update_posts(queryset.filter(is_featured=False), is_featured=True)
+        self.message_user(request, f"{updated} posts have been featured.")
+    
+    feature_selected_posts.short_description = "Feature selected posts"
+    
+    def unfeature_selected_posts(self, request, queryset):
+        updated = bulk_update_posts(queryset.filter(is_featured=True), is_featured=False)
+        self.message_user(request, f"{updated} posts are no longer featured.")
+    
+    unfeature_selected_posts.short_description = "Remove selected posts from featured"
+    
+    def get_actions(self, request):
+        """Add one "Move to category" action per category."""
+        actions = super().get_actions(request)
+        for category in Category.objects.only('pk', 'name'):
+            name = f'move_to_category_{category.pk}'
+            actions[name] = (
+                self._make_move_to_category_action(category),
+                name,
+                f"Move selected posts to category \"{category.name}\"",
+            )
+        return actions
+    
+    def _make_move_to_category_action(self, category):
+        def move_to_category(modeladmin, request, queryset):
+            updated = bulk_set_category(queryset, category)
+            modeladmin.message_user(request, f"{updated} posts have been moved to {category.name}.")
+        return move_to_category
+    
     fieldsets = (
         ('Content', {
             'fields': ('title', 'slug', 'excerpt', 'content')
@@ -72,4 +133,18 @@ class PostAdmin(SummernoteModelAdmin):
             'fields': ('status', 'is_featured', 'published_at', 'categories', 'tags'),
             'description': 'Set publication date in the future and status as "Draft" for scheduled publishing.'
         }),
-    ) 
\ No newline at end of file
+    ) 
+
+
+@admin.register(ExternalImage)
+class ExternalImageAdmin(admin.ModelAdmin):
+    list_display = ('url', 'name', 'error', 'attempts', 'updated_at')
+    list_filter = ('error',)
+    search_fields = ('url',)
+    ordering = ('-updated_at',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
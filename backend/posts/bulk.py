@@ -0,0 +1,46 @@
+"""
+Set-based bulk operations on posts.
+
+These replace per-row ``save()`` loops: each operation runs a constant
+number of queries regardless of how many posts are selected, skips the
+WebP generation done by ``Post.save``, and sends a single
+``posts_changed`` signal for the whole batch.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Post
+from .signals import notify_posts_changed
+
+
+def bulk_update_posts(queryset, **values):
+    """
+    Apply ``values`` to every post in ``queryset`` with one UPDATE.
+    Returns the number of posts updated.
+    """
+    with transaction.atomic():
+        post_ids = list(queryset.values_list('pk', flat=True))
+        if not post_ids:
+            return 0
+        updated = Post.objects.filter(pk__in=post_ids).update(updated_at=timezone.now(), **values)
+        notify_posts_changed(post_ids, list(values))
+    return updated
+
+
+def bulk_set_category(queryset, category):
+    """
+    Replace the categories of every post in ``queryset`` with ``category``.
+    Returns the number of posts updated.
+    """
+    through = Post.categories.through
+    with transaction.atomic():
+        post_ids = list(queryset.values_list('pk', flat=True))
+        if not post_ids:
+            return 0
+        through.objects.filter(post_id__in=post_ids).delete()
+        through.objects.bulk_create(
+            [through(post_id=post_id, category_id=category.pk) for post_id in post_ids]
+        )
+        Post.objects.filter(pk__in=post_ids).update(updated_at=timezone.now())
+        notify_posts_changed(post_ids, ['categories'])
+    return len(post_ids)
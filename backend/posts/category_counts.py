@@ -0,0 +1,53 @@
+"""
+Cached published-post counts per category, for the category endpoints.
+
+One GROUP BY over the categories through table (served by its
+(category_id, post_id) index) is cached until posts change status or
+categories, or a category is deleted. Without a shared cache
+(CATEGORY_COUNTS_CACHE_TIMEOUT = 0) the counts are computed on every read.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Post
+
+CACHE_KEY = 'category-post-counts'
+# Changes to these fields can change the counts
+COUNTED_FIELDS = {'status', 'categories'}
+
+
+def compute_post_counts():
+    through = Post.categories.through
+    rows = (
+        through.objects.filter(post__status='published')
+        .order_by()
+        .values_list('category_id')
+        .annotate(n=Count('post_id'))
+    )
+    return dict(rows)
+
+
+def post_counts():
+    """Return ``{category_id: published post count}``; categories without posts are absent."""
+    if not settings.CATEGORY_COUNTS_CACHE_TIMEOUT:
+        return compute_post_counts()
+    counts = cache.get(CACHE_KEY)
+    if counts is None:
+        counts = compute_post_counts()
+        cache.set(CACHE_KEY, counts, settings.CATEGORY_COUNTS_CACHE_TIMEOUT)
+    return counts
+
+
+async def apost_counts():
+    if not settings.CATEGORY_COUNTS_CACHE_TIMEOUT:
+        return await sync_to_async(compute_post_counts)()
+    counts = await cache.aget(CACHE_KEY)
+    if counts is None:
+        counts = await sync_to_async(post_counts)()
+    return counts
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
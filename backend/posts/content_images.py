@@ -0,0 +1,141 @@
+"""
+Responsive variants for images embedded in post content.
+
+Images inserted through Summernote (HTML ``<img>``) or Markdown
+(``![alt](src)``) are served from MEDIA_URL at their original size. After a
+post's content changes, the ``optimize_content_images`` task opens each
+local image once, writes WebP variants at CONTENT_IMAGE_WIDTHS next to it
+and stores the result in ``Post.content_images``:
+
+    {src: {'width': ..., 'height': ..., 'srcset': 'url 480w, ...'}}
+
+The content itself is never modified. The API returns ``content_images``
+with CONTENT_IMAGE_SIZES added to each entry, and the frontend applies
+``srcset``, ``sizes`` and ``width``/``height`` when it renders the images.
+The frontend renders content with react-markdown and no rehype-raw, so raw
+HTML ``<img>`` tags from Summernote are not rendered there and only
+Markdown images get these attributes; HTML images are still processed.
+
+External images and files that can't be opened are left alone.
+"""
+from html import unescape
+import io
+import logging
+import os
+import re
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+HTML_IMAGE_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+HTML_ATTRIBUTE_RE = re.compile(r'''([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?''')
+MARKDOWN_IMAGE_RE = re.compile(r'!\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+VARIANT_SUFFIX = '-{width}w.webp'
+
+
+def parse_attributes(tag):
+    attributes = {}
+    body = tag[len('<img'):].rstrip('>').rstrip('/')
+    for match in HTML_ATTRIBUTE_RE.finditer(body):
+        name, *values = match.groups()
+        value = next((v for v in values if v is not None), '')
+        attributes[name.lower()] = unescape(value)
+    return attributes
+
+
+def image_sources(content):
+    """Return the distinct image sources in ``content``, in order of appearance."""
+    sources = [parse_attributes(tag).get('src') for tag in HTML_IMAGE_RE.findall(content)]
+    sources += MARKDOWN_IMAGE_RE.findall(content)
+    return list(dict.fromkeys(src for src in sources if src))
+
+
+def storage_name(src):
+    """Storage name of a MEDIA_URL image source, or None for anything else."""
+    if not src.startswith(settings.MEDIA_URL):
+        return None
+    name = unquote(src[len(settings.MEDIA_URL):])
+    if not name or name.startswith('/') or '..' in name.split('/'):
+        return None
+    return name
+
+
+def variant_name(name, width):
+    return os.path.splitext(name)[0] + VARIANT_SUFFIX.format(width=width)
+
+
+def optimize(src):
+    """
+    Write the WebP variants of one image and return its ``content_images``
+    entry, or None if it isn't a readable local image.
+    """
+    name = storage_name(src)
+    if name is None or name.endswith('.svg') or not default_storage.exists(name):
+        return None
+    try:
+        with default_storage.open(name, 'rb') as f:
+            image = Image.open(f)
+            image.load()
+    except Exception:
+        logger.warning('Could not open content image %s', src, exc_info=True)
+        return None
+    width, height = image.size
+    candidates = []
+    for target in sorted(settings.CONTENT_IMAGE_WIDTHS):
+        if target >= width:
+            break
+        variant = variant_name(name, target)
+        if not default_storage.exists(variant):
+            resized = image.copy()
+            resized.thumbnail((target, height))
+            if resized.mode not in ('RGB', 'RGBA'):
+                resized = resized.convert('RGBA' if 'transparency' in resized.info else 'RGB')
+            buffer = io.BytesIO()
+            resized.save(buffer, 'webp', quality=settings.CONTENT_IMAGE_QUALITY)
+            default_storage.save(variant, ContentFile(buffer.getvalue()))
+        candidates.append(f'{default_storage.url(variant)} {target}w')
+    candidates.append(f'{src} {width}w')
+    return {'width': width, 'height': height, 'srcset': ', '.join(candidates)}
+
+
+def process(content, known=None):
+    """
+    Return the ``content_images`` of post content.
+
+    ``known`` holds the previous ``content_images``; its entries are reused
+    for images whose variants were already written.
+    """
+    known = known or {}
+    images = {}
+    for src in image_sources(content):
+        image = known.get(src) or optimize(src)
+        if image is not None:
+            images[src] = image
+    return images
+
+
+def optimize_post(post_id):
+    """
+    Process a post's content and store the result.
+
+    The row is only updated if its content hasn't changed meanwhile; a later
+    edit queues its own run. Returns the number of optimized images.
+    """
+    from .models import Post
+    from .signals import notify_posts_changed
+
+    post = Post.objects.filter(pk=post_id).only('content', 'content_images').first()
+    if post is None:
+        return 0
+    images = process(post.content, post.content_images)
+    if images == post.content_images:
+        return len(images)
+    updated = Post.objects.filter(pk=post_id, content=post.content).update(content_images=images)
+    if updated:
+        notify_posts_changed([post_id], ['content_images'])
+    return len(images)
@@ -0,0 +1,216 @@
+"""
+Mirror external image URLs into media storage.
+
+Image fields may hold an external URL instead of an upload (test data and
+imports use Picsum, Unsplash or Pexels links), often mangled into
+``https:/host/...`` or ``/media/https%3A/...`` on the way in. Such images
+get no WebP copy or blur placeholder and need their URL repaired on every
+serialization.
+
+``mirror_pending`` finds them in MIRRORED_FIELDS and fetches each
+canonical URL once, with asyncio: at most EXTERNAL_IMAGE_CONCURRENCY
+downloads at a time, each limited to EXTERNAL_IMAGE_TIMEOUT seconds and
+EXTERNAL_IMAGE_MAX_BYTES. Valid images are stored like post image uploads
+(under ``mirrored/``, or their content hash, see utils.storage) and
+recorded as ``ExternalImage`` rows, and the fields are saved with the
+stored name, so the model's save (WebP) and the post signals (cards with
+placeholders, cache warming) run as for an upload.
+"""
+import asyncio
+from collections import defaultdict
+from datetime import timedelta
+from hashlib import sha1
+import io
+import logging
+import re
+from urllib.parse import unquote
+from urllib.request import Request, urlopen
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+
+from utils.storage import post_image_storage
+
+from .models import ExternalImage
+
+logger = logging.getLogger(__name__)
+
+# Model -> image fields that may hold external URLs
+MIRRORED_FIELDS = {
+    'posts.Post': ('featured_image', 'side_image_1', 'side_image_2'),
+    'themes.ExtendedTheme': ('hero_image',),
+}
+IMAGE_FIELDS = {field for fields in MIRRORED_FIELDS.values() for field in fields}
+MIRROR_SCHEDULED_KEY = 'image-mirror-scheduled'
+STORAGE_DIR = 'mirrored'
+USER_AGENT = 'blog-image-mirror/1.0'
+URL_RE = re.compile(r'^(https?):/+(.+)$', re.IGNORECASE)
+
+
+class MirrorError(Exception):
+    pass
+
+
+def canonical_url(value):
+    """
+    Return the external URL held in an image field value, repaired, or None
+    for uploads.
+    """
+    if not value:
+        return None
+    match = URL_RE.match(value)
+    if match is None:
+        # Encoded into a media path: /media/https%3A/host/...
+        value = unquote(value)
+        if value.startswith(settings.MEDIA_URL):
+            value = value[len(settings.MEDIA_URL):]
+        match = URL_RE.match(value)
+        if match is None:
+            return None
+    return f'{match.group(1).lower()}://{match.group(2)}'
+
+
+def external_filter(fields):
+    """Rows with an external URL in any of ``fields``."""
+    query = Q()
+    for field in fields:
+        query |= Q(**{f'{field}__startswith': 'http'}) | Q(**{f'{field}__startswith': settings.MEDIA_URL + 'http'})
+    return query
+
+
+def download(url):
+    """Fetch one image; raises MirrorError (or an OSError) when it can't be mirrored."""
+    max_bytes = settings.EXTERNAL_IMAGE_MAX_BYTES
+    request = Request(url, headers={'User-Agent': USER_AGENT, 'Accept': 'image/*'})
+    with urlopen(request, timeout=settings.EXTERNAL_IMAGE_TIMEOUT) as response:
+        content_type = response.headers.get_content_type()
+        if not content_type.startswith('image/'):
+            raise MirrorError(f'Not an image ({content_type})')
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > max_bytes:
+            raise MirrorError(f'Too large ({length} bytes)')
+        data = response.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise MirrorError(f'Too large (over {max_bytes} bytes)')
+    return data
+
+
+async def fetch(url, semaphore):
+    async with semaphore:
+        # urllib blocks; each download gets a worker thread and an overall deadline
+        return await asyncio.wait_for(asyncio.to_thread(download, url), settings.EXTERNAL_IMAGE_TIMEOUT)
+
+
+async def fetch_all(urls):
+    """Return ``{url: bytes or exception}`` with at most EXTERNAL_IMAGE_CONCURRENCY downloads at a time."""
+    semaphore = asyncio.Semaphore(settings.EXTERNAL_IMAGE_CONCURRENCY)
+    results = await asyncio.gather(*(fetch(url, semaphore) for url in urls), return_exceptions=True)
+    return dict(zip(urls, results))
+
+
+def store(url, data):
+    """Validate downloaded bytes as an image and save them; returns the storage name."""
+    # Pillow is imported lazily so importing models doesn't load it
+    from PIL import Image
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.verify()
+    except Exception:
+        raise MirrorError('Not a valid image')
+    extension = {'JPEG': 'jpg'}.get(image.format, image.format.lower())
+    digest = sha1(url.encode()).hexdigest()
+    name = f'{STORAGE_DIR}/{digest[:2]}/{digest}.{extension}'
+    storage = post_image_storage()
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(data))
+
+
+def pending_fields():
+    """Return ``[(model, pk, field, canonical url)]`` for every external image value."""
+    pending = []
+    for label, fields in MIRRORED_FIELDS.items():
+        model = apps.get_model(label)
+        for row in model.objects.filter(external_filter(fields)).values('pk', *fields):
+            for field in fields:
+                url = canonical_url(row[field])
+                if url:
+                    pending.append((model, row['pk'], field, url))
+    return pending
+
+
+def mirror_urls(urls):
+    """
+    Mirror the URLs not mirrored yet and return ``{url: storage name}`` for
+    every URL that has a copy.
+    """
+    records = {record.url: record for record in ExternalImage.objects.filter(url__in=urls)}
+    retry_before = timezone.now() - timedelta(seconds=settings.EXTERNAL_IMAGE_RETRY_INTERVAL)
+    to_fetch = [
+        url for url in urls
+        if url not in records or (
+            not records[url].name
+            and records[url].attempts < settings.EXTERNAL_IMAGE_MAX_ATTEMPTS
+            and records[url].updated_at <= retry_before
+        )
+    ]
+    results = asyncio.run(fetch_all(to_fetch)) if to_fetch else {}
+    for url, result in results.items():
+        record = records.get(url) or ExternalImage(url=url)
+        try:
+            if isinstance(result, BaseException):
+                raise result
+            record.name, record.error = store(url, result), ''
+        except asyncio.TimeoutError:
+            record.error = 'Timed out'
+        except Exception as exc:
+            logger.warning('Could not mirror %s: %s', url, exc)
+            record.error = str(exc)[:255] or exc.__class__.__name__
+        record.attempts += 1
+        record.save()
+        records[url] = record
+    return {url: record.name for url, record in records.items() if record.name}
+
+
+def mirror_pending():
+    """Mirror every external image and point the fields at the copies; returns the fields updated."""
+    pending = pending_fields()
+    if not pending:
+        return 0
+    names = mirror_urls(sorted({url for _, _, _, url in pending}))
+    by_instance = defaultdict(dict)
+    for model, pk, field, url in pending:
+        if url in names:
+            by_instance[model, pk][field] = url
+    updated = 0
+    for (model, pk), urls in by_instance.items():
+        instance = model.objects.filter(pk=pk).first()
+        if instance is None:
+            continue
+        # Skip values edited since they were collected
+        fields = [field for field, url in urls.items() if canonical_url(getattr(instance, field).name) == url]
+        for field in fields:
+            setattr(instance, field, names[urls[field]])
+        if fields:
+            instance.save(update_fields=fields)
+            updated += len(fields)
+    return updated
+
+
+def has_external_images(label, pks):
+    model = apps.get_model(label)
+    return model.objects.filter(pk__in=pks).filter(external_filter(MIRRORED_FIELDS[label])).exists()
+
+
+def schedule():
+    """Queue one mirroring run for a burst of changes."""
+    from .tasks import mirror_external_images
+
+    delay = settings.EXTERNAL_IMAGE_MIRROR_DELAY
+    if cache.add(MIRROR_SCHEDULED_KEY, 1, delay):
+        mirror_external_images.apply_async(countdown=delay)
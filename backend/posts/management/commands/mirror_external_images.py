@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts import image_mirror
+
+
+class Command(BaseCommand):
+    help = 'Copy external image URLs in image fields into media storage'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Mirroring external images...')
+        count = image_mirror.mirror_pending()
+        self.stdout.write(self.style.SUCCESS(f'Mirrored {count} external images.'))
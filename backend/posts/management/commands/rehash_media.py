@@ -0,0 +1,53 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from posts.image_mirror import MIRRORED_FIELDS
+from posts.models import ExternalImage, Post
+from utils import storage
+
+
+def referenced_media():
+    """Yield every stored image name, and post content, that may name a hashed file."""
+    for label, fields in MIRRORED_FIELDS.items():
+        for row in apps.get_model(label).objects.values_list(*fields).iterator():
+            yield from row
+    yield from ExternalImage.objects.values_list('name', flat=True).iterator()
+    # Images embedded in content by URL
+    yield from Post.objects.values_list('content', flat=True).iterator()
+
+
+class Command(BaseCommand):
+    help = 'Move existing post images into content-addressed storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many image fields would change',
+        )
+        parser.add_argument(
+            '--delete-originals', action='store_true',
+            help='Delete the old files (and their WebP copies) once no post refers to them',
+        )
+        parser.add_argument(
+            '--delete-orphans', action='store_true',
+            help='Delete hashed files (and the files derived from them) that nothing refers to',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rehashing post images...')
+        updated, deleted = storage.rehash(
+            Post.objects.all(), MIRRORED_FIELDS['posts.Post'],
+            dry_run=options['dry_run'], delete_originals=options['delete_originals'],
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{updated} image fields would be rehashed.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Rehashed {updated} image fields, deleted {deleted} original files.'))
+
+        if options['delete_orphans']:
+            self.stdout.write('Deleting orphaned hashed files...')
+            orphans = storage.delete_orphans(referenced_media(), dry_run=options['dry_run'])
+            if options['dry_run']:
+                self.stdout.write(self.style.SUCCESS(f'{orphans} orphaned files would be deleted.'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'Deleted {orphans} orphaned files.'))
@@ -0,0 +1,45 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+def post_search_indexes():
+    return [
+        GinIndex(
+            SearchVector('title', 'excerpt', 'content', config='english'),
+            name='posts_post_search_gin',
+        ),
+        GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='posts_post_title_trgm'),
+        GinIndex(OpClass(Upper('slug'), name='gin_trgm_ops'), name='posts_post_slug_trgm'),
+    ]
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Post = apps.get_model('posts', 'Post')
+    for index in post_search_indexes():
+        schema_editor.add_index(Post, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Post = apps.get_model('posts', 'Post')
+    for index in post_search_indexes():
+        schema_editor.remove_index(Post, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_alter_post_published_at'),
+    ]
+
+    operations = [
+        # Skipped automatically on databases other than PostgreSQL
+        TrigramExtension(),
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
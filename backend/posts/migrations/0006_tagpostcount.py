@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('taggit', '0005_auto_20220424_2025'),
+        ('posts', '0005_post_view_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagPostCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField()),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tag_counts', to='categories.category')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_counts', to='taggit.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', '-count'], name='posts_tagpo_categor_e6f929_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tagpostcount',
+            constraint=models.UniqueConstraint(fields=('tag', 'category'), name='unique_tag_post_count'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+# The auto-created through table only has a unique (post_id, category_id)
+# index, which serves "categories of a post". Category feeds go the other
+# way: (category_id, post_id) answers the EXISTS probe from the index alone.
+INDEX_NAME = 'posts_post_categories_category_post_idx'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_tagpostcount'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f'CREATE INDEX {INDEX_NAME} ON posts_post_categories (category_id, post_id)',
+            f'DROP INDEX {INDEX_NAME}',
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCard',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='posts.post')),
+                ('published_at', models.DateTimeField()),
+                ('is_featured', models.BooleanField(default=False)),
+                ('payload', models.JSONField()),
+            ],
+            options={
+                'ordering': ['-published_at'],
+                'indexes': [models.Index(fields=['-published_at'], name='postcard_feed_idx'), models.Index(condition=models.Q(('is_featured', True)), fields=['-published_at'], name='postcard_featured_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_postcard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_images',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
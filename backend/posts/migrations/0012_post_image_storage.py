@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:32
+
+from django.db import migrations, models
+import utils.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_externalimage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='featured_image',
+            field=models.ImageField(blank=True, null=True, storage=utils.storage.post_image_storage, upload_to='posts/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='side_image_1',
+            field=models.ImageField(blank=True, help_text='Optional image to float left of content on large screens.', null=True, storage=utils.storage.post_image_storage, upload_to='posts/side_images/'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='side_image_2',
+            field=models.ImageField(blank=True, help_text='Optional image to float right of content on large screens.', null=True, storage=utils.storage.post_image_storage, upload_to='posts/side_images/'),
+        ),
+    ]
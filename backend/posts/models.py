@@ -1,9 +1,50 @@
-from django.db import models
+from functools import partial
+
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.text import slugify
 from markdownx.models import MarkdownxField
 from taggit.managers import TaggableManager
 from utils.image_utils import generate_webp
+from utils.storage import post_image_storage
+from utils import counters
+
+
+class PostQuerySet(models.QuerySet):
+    def in_category(self, slug):
+        """
+        Posts in the category with ``slug``.
+        
+        Uses an EXISTS subquery on the categories through table rather than a
+        join, so posts are never duplicated and the outer query keeps its own
+        ordering index.
+        """
+        membership = self.model.categories.through.objects.filter(
+            post_id=models.OuterRef('pk'), category__slug=slug
+        )
+        return self.filter(models.Exists(membership))
+    
+    def update(self, **kwargs):
+        new_status = kwargs.get('status')
+        if not isinstance(new_status, str):
+            return super().update(**kwargs)
+        
+        with transaction.atomic(using=self.db):
+            # Count the rows changing status so the admin counters can be
+            # adjusted without recounting the whole table
+            moving = dict(
+                self.exclude(status=new_status)
+                .order_by()
+                .values_list('status')
+                .annotate(n=models.Count('pk'))
+            )
+            rows = super().update(**kwargs)
+        for old_status, count in moving.items():
+            transaction.on_commit(
+                partial(counters.record_status_change, old_status, new_status, count),
+                using=self.db,
+            )
+        return rows
 
 
 class Post(models.Model):
@@ -16,10 +57,10 @@ class Post(models.Model):
     slug = models.SlugField(max_length=250, unique=True)
     content = MarkdownxField()
     excerpt = models.TextField(blank=True)
-    featured_image = models.ImageField(upload_to='posts/%Y/%m/%d/', blank=True, null=True)
-    side_image_1 = models.ImageField(upload_to='posts/side_images/', blank=True, null=True, 
+    featured_image = models.ImageField(upload_to='posts/%Y/%m/%d/', storage=post_image_storage, blank=True, null=True)
+    side_image_1 = models.ImageField(upload_to='posts/side_images/', storage=post_image_storage, blank=True, null=True,
                                     help_text="Optional image to float left of content on large screens.")
-    side_image_2 = models.ImageField(upload_to='posts/side_images/', blank=True, null=True,
+    side_image_2 = models.ImageField(upload_to='posts/side_images/', storage=post_image_storage, blank=True, null=True,
                                     help_text="Optional image to float right of content on large screens.")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -29,17 +70,37 @@ class Post(models.Model):
     )
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     is_featured = models.BooleanField(default=False)
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    # Responsive variants of the images in content (posts.content_images)
+    content_images = models.JSONField(default=dict, blank=True, editable=False)
     
     # Relationships
     categories = models.ManyToManyField('categories.Category', related_name='posts')
     tags = TaggableManager()
     
+    objects = PostQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-published_at']
         indexes = [
             models.Index(fields=['-published_at']),
             models.Index(fields=['status']),
             models.Index(fields=['is_featured']),
+            # Partial indexes for the hot paths; api/tests/test_query_plans.py
+            # checks the planner uses them (the PostgreSQL CI job)
+            models.Index(
+                fields=['-published_at'], condition=models.Q(status='published'),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=['-published_at'], condition=models.Q(status='published', is_featured=True),
+                name='post_featured_feed_idx',
+            ),
+            # publish_scheduled_posts: drafts whose publish time has passed
+            models.Index(
+                fields=['published_at'], condition=models.Q(status='draft'),
+                name='post_scheduled_idx',
+            ),
         ]
     
     def __str__(self):
@@ -65,4 +126,74 @@ class Post(models.Model):
         words_per_minute = 200
         word_count = len(self.content.split())
         reading_time = round(word_count / words_per_minute)
-        return max(1, reading_time)  # Minimum 1 minute 
\ No newline at end of file
+        return max(1, reading_time)  # Minimum 1 minute
+
+
+class TagPostCount(models.Model):
+    """
+    Number of published posts per tag, overall (category is null) and per category.
+    
+    Rebuilt by posts.tag_counts.refresh_tag_counts so the tags endpoint
+    never aggregates taggit's generic relation on request.
+    """
+    tag = models.ForeignKey('taggit.Tag', on_delete=models.CASCADE, related_name='post_counts')
+    category = models.ForeignKey(
+        'categories.Category', on_delete=models.CASCADE, null=True, blank=True, related_name='tag_counts'
+    )
+    count = models.PositiveIntegerField()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'category'], name='unique_tag_post_count'),
+        ]
+        indexes = [
+            models.Index(fields=['category', '-count']),
+        ]
+    
+    def __str__(self):
+        return f'{self.tag} ({self.count})'
+
+
+class PostCard(models.Model):
+    """
+    Denormalized list payload of a published post (api.cards).
+    
+    Holds exactly what ``PostListSerializer`` emits, so list and featured
+    pages are a single range read on ``published_at``. Rows are written in
+    the same transaction as the post and exist only for published posts.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='card')
+    published_at = models.DateTimeField()
+    is_featured = models.BooleanField(default=False)
+    payload = models.JSONField()
+    
+    class Meta:
+        ordering = ['-published_at']
+        indexes = [
+            models.Index(fields=['-published_at'], name='postcard_feed_idx'),
+            models.Index(
+                fields=['-published_at'], condition=models.Q(is_featured=True),
+                name='postcard_featured_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return self.payload.get('title', str(self.pk))
+
+
+class ExternalImage(models.Model):
+    """
+    An external image URL mirrored into media storage (posts.image_mirror).
+    
+    ``url`` is the canonical form of the URL as entered, ``name`` the stored
+    copy (blank until a fetch succeeds). Failures keep the last error and are
+    retried after EXTERNAL_IMAGE_RETRY_INTERVAL.
+    """
+    url = models.URLField(max_length=500, unique=True)
+    name = models.CharField(max_length=255, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return self.url
@@ -0,0 +1,233 @@
+"""
+Buffered view counting and time-decayed trending scores.
+
+Views are counted in Redis (a hash of pending increments) and persisted to
+``Post.view_count`` in batches by the ``flush_post_views`` Celery task, so
+post detail requests never write to PostgreSQL. The task only subtracts
+the counts it persisted once the update has committed, so a failed flush
+leaves them for the next run and views recorded meanwhile are kept.
+
+Trending scores live in Redis sorted sets (one global, one per category).
+Each view adds ``2 ** ((now - epoch) / half_life)``, which makes older views
+worth exponentially less than recent ones without rewriting every score.
+The flush task rescales the sets and moves the epoch forward so the
+numbers stay small. Card payloads for trending posts are cached, so the
+trending endpoint is normally served from Redis alone.
+
+Without REDIS_URL an in-process buffer with the same behaviour is used.
+"""
+from collections import Counter, defaultdict
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, PositiveIntegerField, When
+
+from utils.redis_client import get_redis, get_async_redis
+
+PENDING_VIEWS_KEY = 'posts:views:pending'
+EPOCH_KEY = 'posts:trending:epoch'
+TRENDING_KEY = 'posts:trending'
+CATEGORY_TRENDING_KEY = 'posts:trending:category:{slug}'
+CARD_CACHE_KEY = 'post-card:{pk}'
+CARD_CACHE_TIMEOUT = 60 * 60
+
+# KEYS: pending views hash, epoch, trending sets...
+# ARGV: post id, now, half life
+RECORD_VIEW_SCRIPT = """
+local epoch = tonumber(redis.call('GET', KEYS[2]))
+if not epoch then
+    epoch = tonumber(ARGV[2])
+    redis.call('SET', KEYS[2], ARGV[2])
+end
+local weight = 2 ^ ((tonumber(ARGV[2]) - epoch) / tonumber(ARGV[3]))
+redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+for i = 3, #KEYS do
+    redis.call('ZINCRBY', KEYS[i], weight, ARGV[1])
+end
+return 1
+"""
+
+# KEYS: pending views hash
+# ARGV: post id, count, post id, count...
+ACK_VIEWS_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    if redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[i + 1])) <= 0 then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+return 1
+"""
+
+# KEYS: epoch, trending sets...
+# ARGV: now, half life, max set size
+DECAY_SCRIPT = """
+local epoch = tonumber(redis.call('GET', KEYS[1]))
+if not epoch then
+    return 0
+end
+local factor = 2 ^ ((epoch - tonumber(ARGV[1])) / tonumber(ARGV[2]))
+for i = 2, #KEYS do
+    redis.call('ZUNIONSTORE', KEYS[i], 1, KEYS[i], 'WEIGHTS', factor)
+    redis.call('ZREMRANGEBYRANK', KEYS[i], 0, -(tonumber(ARGV[3]) + 1))
+end
+redis.call('SET', KEYS[1], ARGV[1])
+return 1
+"""
+
+# In-process fallback used when Redis is not configured
+_local_lock = threading.Lock()
+_local_views = Counter()
+_local_scores = defaultdict(Counter)
+_local_epoch = [None]
+
+
+def trending_key(category_slug=None):
+    if category_slug:
+        return CATEGORY_TRENDING_KEY.format(slug=category_slug)
+    return TRENDING_KEY
+
+
+def record_view(post_id, category_slugs=()):
+    """Count one view of a post and bump its trending scores."""
+    keys = [trending_key()] + [trending_key(slug) for slug in category_slugs]
+    now = time.time()
+    half_life = settings.TRENDING_HALF_LIFE
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            if _local_epoch[0] is None:
+                _local_epoch[0] = now
+            weight = 2 ** ((now - _local_epoch[0]) / half_life)
+            _local_views[post_id] += 1
+            for key in keys:
+                _local_scores[key][post_id] += weight
+        return
+    client.eval(RECORD_VIEW_SCRIPT, 2 + len(keys), PENDING_VIEWS_KEY, EPOCH_KEY, *keys, post_id, now, half_life)
+
+
+async def arecord_view(post_id, category_slugs=()):
+    """Async version of ``record_view`` for the ASGI views."""
+    client = get_async_redis()
+    if client is None:
+        record_view(post_id, category_slugs)
+        return
+    keys = [trending_key()] + [trending_key(slug) for slug in category_slugs]
+    await client.eval(
+        RECORD_VIEW_SCRIPT, 2 + len(keys), PENDING_VIEWS_KEY, EPOCH_KEY, *keys,
+        post_id, time.time(), settings.TRENDING_HALF_LIFE,
+    )
+
+
+def pending_views():
+    """Return the buffered view counts as ``{post_id: count}`` without taking them."""
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            return dict(_local_views)
+    return {int(pk): int(count) for pk, count in client.hgetall(PENDING_VIEWS_KEY).items()}
+
+
+def ack_views(pending):
+    """Subtract persisted counts from the buffer, keeping views recorded since."""
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            _local_views.subtract(pending)
+            for pk in [pk for pk, count in _local_views.items() if count <= 0]:
+                del _local_views[pk]
+        return
+    args = [value for item in sorted(pending.items()) for value in item]
+    client.eval(ACK_VIEWS_SCRIPT, 1, PENDING_VIEWS_KEY, *args)
+
+
+def persist_views(pending):
+    """Add buffered view counts to ``Post.view_count`` with one UPDATE per chunk."""
+    from .models import Post
+
+    items = sorted(pending.items())
+    for start in range(0, len(items), 500):
+        chunk = items[start:start + 500]
+        Post.objects.filter(pk__in=[pk for pk, _ in chunk]).update(
+            view_count=Case(
+                *[When(pk=pk, then=F('view_count') + count) for pk, count in chunk],
+                default=F('view_count'),
+                output_field=PositiveIntegerField(),
+            )
+        )
+    return sum(pending.values())
+
+
+def decay_scores(category_slugs):
+    """Rescale the trending sets to the current time and trim them."""
+    keys = [trending_key()] + [trending_key(slug) for slug in category_slugs]
+    now = time.time()
+    half_life = settings.TRENDING_HALF_LIFE
+    max_size = settings.TRENDING_MAX_POSTS
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            if _local_epoch[0] is None:
+                return
+            factor = 2 ** ((_local_epoch[0] - now) / half_life)
+            for key in keys:
+                scores = _local_scores[key]
+                top = scores.most_common(max_size)
+                scores.clear()
+                scores.update({pk: score * factor for pk, score in top})
+            _local_epoch[0] = now
+        return
+    client.eval(DECAY_SCRIPT, len(keys) + 1, EPOCH_KEY, *keys, now, half_life, max_size)
+
+
+def remove_from_trending(post_ids, category_slugs):
+    """Drop posts from the trending sets of categories they no longer belong to."""
+    keys = [trending_key(slug) for slug in category_slugs]
+    if not post_ids or not keys:
+        return
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            for key in keys:
+                for pk in post_ids:
+                    _local_scores[key].pop(pk, None)
+        return
+    pipe = client.pipeline()
+    for key in keys:
+        pipe.zrem(key, *post_ids)
+    pipe.execute()
+
+
+def trending_ids(category_slug=None, limit=10):
+    """Return the ids of the top trending posts, highest score first."""
+    key = trending_key(category_slug)
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            return [pk for pk, _ in _local_scores[key].most_common(limit)]
+    return [int(pk) for pk in client.zrevrange(key, 0, limit - 1)]
+
+
+def get_cards(post_ids, serialize):
+    """
+    Return cached list payloads for ``post_ids`` in order.
+
+    Missing payloads are built with ``serialize(posts)`` from one query and
+    cached; ids that are no longer published are skipped.
+    """
+    from .models import Post
+
+    keys = {pk: CARD_CACHE_KEY.format(pk=pk) for pk in post_ids}
+    cached = cache.get_many(keys.values())
+    missing = [pk for pk in post_ids if keys[pk] not in cached]
+    if missing:
+        posts = Post.objects.filter(pk__in=missing, status='published').prefetch_related('categories', 'tags')
+        fresh = {card['id']: card for card in serialize(list(posts))}
+        cache.set_many({keys[pk]: card for pk, card in fresh.items()}, CARD_CACHE_TIMEOUT)
+        cached.update({keys[pk]: card for pk, card in fresh.items()})
+    return [cached[keys[pk]] for pk in post_ids if keys[pk] in cached]
+
+
+def invalidate_cards(post_ids):
+    cache.delete_many([CARD_CACHE_KEY.format(pk=pk) for pk in post_ids])
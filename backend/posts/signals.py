@@ -0,0 +1,136 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from django.dispatch import Signal, receiver
+
+from categories.models import Category
+from .admin_filters import invalidate_facets
+from .popularity import invalidate_cards, remove_from_trending
+from . import category_counts, tag_counts
+from .models import Post
+
+# Sent once per batch of changed posts, after the transaction commits.
+# Receivers get ``post_ids`` (list of primary keys) and ``fields``
+# (names of the changed fields, or None when unknown/any).
+posts_changed = Signal()
+# Sent with the same arguments right away, inside the writing transaction,
+# for read models that must commit or roll back together with the posts.
+posts_written = Signal()
+
+
+def notify_posts_changed(post_ids, fields=None):
+    """
+    Send ``posts_written`` now and ``posts_changed`` for a batch of posts
+    once the current transaction commits.
+    """
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    posts_written.send(sender=Post, post_ids=post_ids, fields=fields)
+    transaction.on_commit(
+        lambda: posts_changed.send(sender=Post, post_ids=post_ids, fields=fields)
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_saved_or_deleted(sender, instance, **kwargs):
+    notify_posts_changed([instance.pk], kwargs.get('update_fields'))
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def post_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # Changed from the category side; pk_set holds post ids (None on clear)
+        if pk_set is not None:
+            notify_posts_changed(pk_set, ['categories'])
+    else:
+        notify_posts_changed([instance.pk], ['categories'])
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def drop_trending_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    """Take posts out of the trending sets of categories they leave."""
+    if action not in ('post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # Changed from the category side; pk_set holds post ids (None on clear)
+        post_ids = list(pk_set) if action == 'post_remove' else list(instance.posts.values_list('pk', flat=True))
+        slugs = [instance.slug]
+    else:
+        categories = Category.objects.filter(pk__in=pk_set) if action == 'post_remove' else instance.categories.all()
+        slugs = list(categories.values_list('slug', flat=True))
+        post_ids = [instance.pk]
+    transaction.on_commit(lambda: remove_from_trending(post_ids, slugs))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed(sender, instance, action, reverse, model, **kwargs):
+    # taggit sends m2m_changed with the Post as instance when tags are edited
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, Post):
+        notify_posts_changed([instance.pk], ['tags'])
+
+
+@receiver(posts_changed, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_admin_facets(sender, **kwargs):
+    """Drop cached changelist filter choices when posts or categories change."""
+    invalidate_facets()
+
+
+@receiver(posts_changed, sender=Post)
+def invalidate_post_cards(sender, post_ids, **kwargs):
+    """Drop cached trending card payloads for changed posts."""
+    invalidate_cards(post_ids)
+
+
+@receiver(posts_changed, sender=Post)
+def refresh_tag_counts(sender, post_ids, fields=None, **kwargs):
+    """Recount tags shortly after changes that can move the counts."""
+    if fields is None or tag_counts.COUNTED_FIELDS.intersection(fields):
+        tag_counts.schedule_refresh()
+
+
+@receiver(posts_changed, sender=Post)
+def invalidate_category_counts(sender, post_ids, fields=None, **kwargs):
+    if fields is None or category_counts.COUNTED_FIELDS.intersection(fields):
+        category_counts.invalidate()
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_category_counts_for_category(sender, instance, **kwargs):
+    transaction.on_commit(category_counts.invalidate)
+
+
+@receiver(post_init, sender=Post)
+def remember_content(sender, instance, **kwargs):
+    """Keep the loaded content so saves that don't change it can be told apart."""
+    # Read from __dict__ so deferred fields are not fetched
+    instance._loaded_content = instance.__dict__.get('content')
+
+
+@receiver(post_save, sender=Post)
+def optimize_content_images(sender, instance, created, update_fields=None, **kwargs):
+    """Process embedded images after the content changes (posts.content_images)."""
+    from .tasks import optimize_content_images as optimize_task
+
+    if update_fields is not None and 'content' not in update_fields:
+        return
+    if not created and instance.content == instance._loaded_content:
+        return
+    instance._loaded_content = instance.content
+    post_id = instance.pk
+    transaction.on_commit(lambda: optimize_task.delay(post_id))
+
+
+@receiver(posts_changed, sender=Post)
+def mirror_external_images(sender, post_ids, fields=None, **kwargs):
+    """Copy external image URLs into storage (posts.image_mirror)."""
+    from . import image_mirror
+
+    if fields is not None and not image_mirror.IMAGE_FIELDS.intersection(fields):
+        return
+    if image_mirror.has_external_images('posts.Post', post_ids):
+        image_mirror.schedule()
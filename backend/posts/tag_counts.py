@@ -0,0 +1,46 @@
+"""
+Stored published-post counts per tag (see ``TagPostCount``).
+
+Counting through taggit's generic ``TaggedItem`` relation is a GROUP BY over
+every tagged item, so it runs in a Celery task (periodically and shortly
+after tags, categories or statuses change) instead of on request.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Post, TagPostCount
+
+REFRESH_SCHEDULED_KEY = 'tag-counts-refresh-scheduled'
+# Changes to these fields can change the counts
+COUNTED_FIELDS = {'status', 'tags', 'categories'}
+
+
+def refresh_tag_counts():
+    """Recount published posts per tag and per (tag, category) and replace the stored rows."""
+    published = Post.objects.filter(status='published', tags__isnull=False).order_by()
+    overall = published.values_list('tags').annotate(n=Count('pk', distinct=True))
+    per_category = (
+        published.filter(categories__isnull=False)
+        .values_list('tags', 'categories')
+        .annotate(n=Count('pk', distinct=True))
+    )
+    rows = [TagPostCount(tag_id=tag_id, category_id=None, count=n) for tag_id, n in overall]
+    rows += [
+        TagPostCount(tag_id=tag_id, category_id=category_id, count=n)
+        for tag_id, category_id, n in per_category
+    ]
+    with transaction.atomic():
+        TagPostCount.objects.all().delete()
+        TagPostCount.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def schedule_refresh():
+    """Queue one refresh for a burst of changes."""
+    from .tasks import refresh_tag_counts as refresh_task
+
+    delay = settings.TAG_COUNTS_REFRESH_DELAY
+    if cache.add(REFRESH_SCHEDULED_KEY, 1, delay):
+        refresh_task.apply_async(countdown=delay)
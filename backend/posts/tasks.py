@@ -1,11 +1,20 @@
 from celery import shared_task
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 import logging
 
 from .models import Post
+from . import content_images, image_mirror, popularity, tag_counts
+from .signals import notify_posts_changed
 
 logger = logging.getLogger(__name__)
 
+MIRROR_LOCK_KEY = 'image-mirror-lock'
+MIRROR_LOCK_TIMEOUT = 60 * 30
+FLUSH_VIEWS_LOCK_KEY = 'flush-post-views-lock'
+FLUSH_VIEWS_LOCK_TIMEOUT = 60 * 5
+
 
 @shared_task
 def publish_scheduled_posts():
@@ -25,10 +34,69 @@ def publish_scheduled_posts():
         posts_to_publish = list(scheduled_posts.values('id', 'title'))
         
         # Update status to published
-        scheduled_posts.update(status='published')
+        with transaction.atomic():
+            scheduled_posts.update(status='published')
+            notify_posts_changed([post['id'] for post in posts_to_publish], ['status'])
         
         # Log each published post
         for post in posts_to_publish:
             logger.info(f"Automatically published post: {post['title']} (ID: {post['id']})")
     
-    return f"Published {count} scheduled posts" 
\ No newline at end of file
+    return f"Published {count} scheduled posts"
+
+
+@shared_task
+def flush_post_views():
+    """
+    Persist buffered post views to Post.view_count and decay the
+    trending scores.
+    """
+    from categories.models import Category
+
+    # Runs every minute; an overlapping run would count the same views twice
+    if not cache.add(FLUSH_VIEWS_LOCK_KEY, 1, FLUSH_VIEWS_LOCK_TIMEOUT):
+        return "Skipped, another flush is running"
+    try:
+        pending = popularity.pending_views()
+        total = 0
+        if pending:
+            with transaction.atomic():
+                total = popularity.persist_views(pending)
+                transaction.on_commit(lambda: popularity.ack_views(pending))
+        popularity.decay_scores(Category.objects.values_list('slug', flat=True))
+    finally:
+        cache.delete(FLUSH_VIEWS_LOCK_KEY)
+    return f"Persisted {total} views for {len(pending)} posts"
+
+
+@shared_task
+def refresh_tag_counts():
+    """
+    Rebuild the stored per-tag published post counts.
+    """
+    rows = tag_counts.refresh_tag_counts()
+    return f"Stored {rows} tag counts"
+
+
+@shared_task
+def optimize_content_images(post_id):
+    """
+    Write responsive variants for the images in a post's content and store
+    their attributes in Post.content_images.
+    """
+    count = content_images.optimize_post(post_id)
+    return f"Optimized {count} content images for post {post_id}"
+
+
+@shared_task(bind=True, max_retries=10)
+def mirror_external_images(self):
+    """
+    Copy external image URLs into media storage and point the image fields at the copies.
+    """
+    if not cache.add(MIRROR_LOCK_KEY, 1, MIRROR_LOCK_TIMEOUT):
+        raise self.retry(countdown=10)
+    try:
+        count = image_mirror.mirror_pending()
+    finally:
+        cache.delete(MIRROR_LOCK_KEY)
+    return f"Mirrored {count} external images"
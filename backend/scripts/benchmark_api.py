@@ -0,0 +1,99 @@
+"""
+Load generator for comparing the WSGI and ASGI API deployments.
+
+Keeps --concurrency connections busy for --duration seconds and reports
+throughput and latency percentiles. Standard library only.
+
+--slow-clients N adds N extra connections that read their responses at
+--slow-rate bytes per second. This is the case where sync workers are held
+for the whole transfer. Slow database conditions come from starting the
+server with DB_SIMULATED_LATENCY_MS (e.g. 20).
+
+Example, run once against each server:
+
+    # WSGI:  gunicorn blog.wsgi:application -w 4 --bind 0.0.0.0:8000
+    # ASGI:  ASYNC_API=True gunicorn blog.asgi:application -w 4 -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
+    python scripts/benchmark_api.py --url http://localhost:8000 \\
+        --path /api/v1/posts/ --path /api/v1/featured-posts/ --path /api/v1/theme/ \\
+        --concurrency 64 --duration 30 --slow-clients 32
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from urllib.parse import urlsplit
+
+
+async def request(host, port, path, slow_rate=None):
+    """Send one GET and read the whole response; returns the status code."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        while True:
+            chunk = await reader.read(64 if slow_rate else 65536)
+            if not chunk:
+                break
+            if slow_rate:
+                await asyncio.sleep(len(chunk) / slow_rate)
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def worker(host, port, paths, deadline, latencies, errors, slow_rate=None):
+    while time.monotonic() < deadline:
+        path = next(paths)
+        started = time.monotonic()
+        try:
+            status = await request(host, port, path, slow_rate)
+        except (OSError, ValueError, IndexError):
+            status = None
+        if status == 200:
+            latencies.append(time.monotonic() - started)
+        else:
+            errors.append(status)
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, len(ordered) * pct // 100)]
+
+
+async def main(args):
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    paths = itertools.cycle(args.path or ['/api/v1/posts/'])
+    deadline = time.monotonic() + args.duration
+    latencies, errors, slow_latencies = [], [], []
+    tasks = [
+        worker(host, port, paths, deadline, latencies, errors)
+        for _ in range(args.concurrency)
+    ] + [
+        worker(host, port, paths, deadline, slow_latencies, errors, args.slow_rate)
+        for _ in range(args.slow_clients)
+    ]
+    started = time.monotonic()
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - started
+
+    print(f'requests: {len(latencies)} ok, {len(errors)} failed in {elapsed:.1f}s')
+    print(f'throughput: {len(latencies) / elapsed:.1f} req/s')
+    for name, pct in (('p50', 50), ('p95', 95), ('p99', 99)):
+        print(f'{name}: {percentile(latencies, pct) * 1000:.1f} ms')
+    if args.slow_clients:
+        print(f'slow clients: {len(slow_latencies)} responses')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--path', action='append', help='Path to request (repeatable)')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--slow-rate', type=int, default=2048, help='Bytes per second read by slow clients')
+    asyncio.run(main(parser.parse_args()))
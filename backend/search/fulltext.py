@@ -0,0 +1,49 @@
+"""
+Indexed full-text and trigram search over posts.
+
+On PostgreSQL, searches match a ``to_tsvector`` expression backed by a GIN
+index and fall back to trigram-indexed substring matches on title and slug.
+Other databases (SQLite in tests) use plain ``icontains`` lookups.
+"""
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+SEARCH_CONFIG = 'english'
+
+
+def post_search_vector():
+    """The tsvector expression indexed by ``posts_post_search_gin``."""
+    return SearchVector('title', 'excerpt', 'content', config=SEARCH_CONFIG)
+
+
+def post_search_indexes():
+    """
+    PostgreSQL-only indexes used by ``search_posts``.
+
+    The trigram indexes are built on ``UPPER(...)`` because that is the
+    expression Django emits for ``icontains`` on PostgreSQL.
+    """
+    return [
+        GinIndex(post_search_vector(), name='posts_post_search_gin'),
+        GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='posts_post_title_trgm'),
+        GinIndex(OpClass(Upper('slug'), name='gin_trgm_ops'), name='posts_post_slug_trgm'),
+    ]
+
+
+def search_posts(queryset, term):
+    """Filter a Post queryset by ``term`` using the indexed path when available."""
+    term = term.strip()
+    if not term:
+        return queryset
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.filter(
+            Q(title__icontains=term) | Q(slug__icontains=term)
+            | Q(excerpt__icontains=term) | Q(content__icontains=term)
+        )
+    query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.annotate(search_vector=post_search_vector()).filter(
+        Q(search_vector=query) | Q(title__icontains=term) | Q(slug__icontains=term)
+    )
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class RelatedPosts(models.Model):
+    """
+    Precomputed nearest neighbours of a post in the similarity index.
+
+    ``related_ids`` and ``scores`` are parallel lists ordered by
+    decreasing similarity, so a lookup is a single primary-key read.
+    """
+    post = models.OneToOneField(
+        'posts.Post', on_delete=models.CASCADE, primary_key=True, related_name='related_index'
+    )
+    related_ids = models.JSONField(default=list)
+    scores = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'related posts'
+
+    def __str__(self):
+        return f"Related posts for {self.post_id}"
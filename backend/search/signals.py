@@ -0,0 +1,14 @@
+from django.dispatch import receiver
+
+from posts.models import Post
+from posts.signals import posts_changed
+from .tasks import update_related_posts
+
+# Changes to any other field don't affect similarity
+INDEXED_FIELDS = {'title', 'excerpt', 'content', 'status', 'categories', 'tags'}
+
+
+@receiver(posts_changed, sender=Post)
+def reindex_related_posts(sender, post_ids, fields=None, **kwargs):
+    if fields is None or INDEXED_FIELDS.intersection(fields):
+        update_related_posts.delay(list(post_ids))
@@ -0,0 +1,518 @@
+"""
+TF-IDF similarity index used to precompute related posts.
+
+Each published post is a row in a sparse feature matrix: TF-IDF weights over
+its title, excerpt and content, followed by weighted one-hot columns for its
+categories and tags. Rows are L2-normalized, so cosine similarity is a
+sparse dot product.
+
+A full rebuild multiplies the matrix with itself in row chunks, keeping only
+the top ``RELATED_POSTS_COUNT`` neighbours of each post, so memory stays
+bounded by ``CHUNK_SIZE x number of posts``. Updating a single post needs one
+sparse matrix-vector product. The neighbour lists are stored in RelatedPosts.
+
+The index is stored row by row, in Redis so every worker updates the same
+index, or without REDIS_URL under ``RELATED_POSTS_INDEX_DIR`` (which must then
+be shared by the workers). A rebuild writes all rows once as a new base,
+which each worker keeps in memory until the next rebuild; an incremental
+update only writes the rows it changed to a delta that ``load`` applies
+over the base.
+"""
+import io
+import json
+import os
+import re
+import tempfile
+import uuid
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django.utils.html import strip_tags
+from taggit.models import TaggedItem
+
+from posts.models import Post
+from utils.redis_client import get_redis
+from .models import RelatedPosts
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9]+")
+STOP_WORDS = frozenset("""
+    a about above after again against all am an and any are as at be because been
+    before being below between both but by can could did do does doing down during
+    each few for from further had has have having he her here hers herself him
+    himself his how i if in into is it its itself just me more most my myself no nor
+    not now of off on once only or other our ours ourselves out over own same she
+    should so some such than that the their theirs them themselves then there these
+    they this those through to too under until up very was we were what when where
+    which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+# Title words are counted several times so they weigh more than body text
+TITLE_BOOST = 3
+MAX_FEATURES = 50000
+MIN_DF = 2
+TEXT_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.35
+TAG_WEIGHT = 0.35
+CHUNK_SIZE = 256
+# Candidates considered when inserting a changed post into other posts' lists
+REVERSE_CANDIDATES = 5
+INDEX_KEY_PREFIX = 'related-posts-index:'
+# Base rows written to Redis per round trip
+STORE_BATCH_SIZE = 1000
+
+
+def tokenize(title, excerpt, content):
+    text = ' '.join([(title + ' ') * TITLE_BOOST, excerpt, strip_tags(content)]).lower()
+    return [token for token in TOKEN_RE.findall(text) if token not in STOP_WORDS]
+
+
+def _post_documents(post_ids=None):
+    """
+    Yield ``(post_id, tokens, category_ids, tag_ids)`` for published posts,
+    streaming the text columns with ``iterator()``.
+    """
+    posts = Post.objects.filter(status='published')
+    if post_ids is not None:
+        posts = posts.filter(pk__in=post_ids)
+
+    categories = {}
+    through = Post.categories.through.objects.filter(post__status='published')
+    if post_ids is not None:
+        through = through.filter(post_id__in=post_ids)
+    for post_id, category_id in through.values_list('post_id', 'category_id').iterator():
+        categories.setdefault(post_id, []).append(category_id)
+
+    tags = {}
+    tagged = TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Post))
+    if post_ids is not None:
+        tagged = tagged.filter(object_id__in=post_ids)
+    for object_id, tag_id in tagged.values_list('object_id', 'tag_id').iterator():
+        tags.setdefault(object_id, []).append(tag_id)
+
+    rows = posts.order_by('pk').values_list('pk', 'title', 'excerpt', 'content')
+    for post_id, title, excerpt, content in rows.iterator(chunk_size=500):
+        yield post_id, tokenize(title, excerpt, content), categories.get(post_id, []), tags.get(post_id, [])
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+class SimilarityIndex:
+    """A sparse, row-normalized feature matrix for the published posts."""
+
+    def __init__(self, post_ids, matrix, vocabulary, idf, category_ids, tag_ids):
+        self.post_ids = np.asarray(post_ids, dtype=np.int64)
+        self.matrix = matrix.tocsr().astype(np.float32)
+        self.vocabulary = list(vocabulary)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.category_ids = list(category_ids)
+        self.tag_ids = list(tag_ids)
+        self._term_columns = {term: i for i, term in enumerate(self.vocabulary)}
+        self._category_columns = {pk: i for i, pk in enumerate(self.category_ids)}
+        self._tag_columns = {pk: i for i, pk in enumerate(self.tag_ids)}
+
+    @property
+    def width(self):
+        return len(self.vocabulary) + len(self.category_ids) + len(self.tag_ids)
+
+    # Building
+
+    @classmethod
+    def build(cls):
+        """Build the index from every published post."""
+        post_ids, doc_terms, doc_categories, doc_tags = [], [], [], []
+        term_ids = {}
+        for post_id, tokens, category_ids, tag_ids in _post_documents():
+            post_ids.append(post_id)
+            doc_terms.append(np.fromiter(
+                (term_ids.setdefault(token, len(term_ids)) for token in tokens), dtype=np.int64,
+            ))
+            doc_categories.append(category_ids)
+            doc_tags.append(tag_ids)
+
+        n_docs = len(post_ids)
+        terms = np.array(sorted(term_ids, key=term_ids.get), dtype=object)
+        df = np.zeros(len(terms), dtype=np.int64)
+        for ids in doc_terms:
+            df[np.unique(ids)] += 1
+
+        # Drop rare terms (on non-trivial corpora) and cap the vocabulary size
+        min_df = MIN_DF if n_docs >= 50 else 1
+        keep = np.flatnonzero(df >= min_df)
+        keep = keep[np.argsort(-df[keep], kind='stable')[:MAX_FEATURES]]
+        remap = np.full(len(terms), -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        idf = np.log((1 + n_docs) / (1 + df[keep])) + 1
+
+        index = cls(
+            post_ids=post_ids,
+            matrix=sparse.csr_matrix((0, 0)),
+            vocabulary=terms[keep].tolist(),
+            idf=idf,
+            category_ids=sorted({pk for ids in doc_categories for pk in ids}),
+            tag_ids=sorted({pk for ids in doc_tags for pk in ids}),
+        )
+        index.matrix = index._vectorize_many(
+            [remap[ids] for ids in doc_terms], doc_categories, doc_tags,
+        )
+        return index
+
+    def vectorize(self, tokens, category_ids, tag_ids):
+        """Return the normalized feature row for one post using this index's vocabulary."""
+        columns = np.fromiter(
+            (self._term_columns.get(token, -1) for token in tokens), dtype=np.int64,
+        )
+        return self._vectorize_many([columns], [category_ids], [tag_ids])
+
+    def _vectorize_many(self, doc_columns, doc_categories, doc_tags):
+        n_docs = len(doc_columns)
+        vocab_size = len(self.vocabulary)
+
+        rows, cols, counts = [], [], []
+        for row, columns in enumerate(doc_columns):
+            columns = columns[columns >= 0]
+            unique, freq = np.unique(columns, return_counts=True)
+            rows.append(np.full(len(unique), row, dtype=np.int64))
+            cols.append(unique)
+            counts.append(freq)
+        if n_docs:
+            rows, cols, counts = np.concatenate(rows), np.concatenate(cols), np.concatenate(counts)
+        # Sublinear term frequency
+        tf = (1 + np.log(np.asarray(counts, dtype=np.float32))) * self.idf[np.asarray(cols, dtype=np.int64)]
+        text = _normalize_rows(sparse.csr_matrix((tf, (rows, cols)), shape=(n_docs, vocab_size)))
+
+        blocks = [TEXT_WEIGHT * text]
+        for doc_ids, columns, weight in (
+            (doc_categories, self._category_columns, CATEGORY_WEIGHT),
+            (doc_tags, self._tag_columns, TAG_WEIGHT),
+        ):
+            pairs = [(row, columns[pk]) for row, ids in enumerate(doc_ids) for pk in ids if pk in columns]
+            block = sparse.csr_matrix(
+                (np.ones(len(pairs), dtype=np.float32),
+                 ([row for row, _ in pairs], [col for _, col in pairs])),
+                shape=(n_docs, len(columns)),
+            )
+            blocks.append(weight * _normalize_rows(block))
+        return _normalize_rows(sparse.hstack(blocks, format='csr')).astype(np.float32)
+
+    # Querying
+
+    def neighbours(self, vector, k, exclude_id=None):
+        """Return ``[(post_id, score), ...]`` for the ``k`` rows most similar to ``vector``."""
+        scores = np.asarray((self.matrix @ vector.T).todense()).ravel()
+        if exclude_id is not None:
+            scores[self.post_ids == exclude_id] = -1
+        return self._top_k(scores, k)
+
+    def all_neighbours(self, k):
+        """Yield ``(post_id, [(related_id, score), ...])`` for every post, in row chunks."""
+        transposed = self.matrix.T.tocsr()
+        for start in range(0, len(self.post_ids), CHUNK_SIZE):
+            chunk = (self.matrix[start:start + CHUNK_SIZE] @ transposed).toarray()
+            for offset, scores in enumerate(chunk):
+                scores[start + offset] = -1
+                yield int(self.post_ids[start + offset]), self._top_k(scores, k)
+
+    def _top_k(self, scores, k):
+        k = min(k, len(scores))
+        if not k:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.post_ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+    # Updating
+
+    def remove(self, post_ids):
+        keep = ~np.isin(self.post_ids, list(post_ids))
+        self.matrix = self.matrix[keep]
+        self.post_ids = self.post_ids[keep]
+
+    def append(self, post_ids, vectors):
+        self.matrix = sparse.vstack([self.matrix, *vectors], format='csr')
+        self.post_ids = np.concatenate([self.post_ids, np.asarray(post_ids, dtype=np.int64)])
+
+    # Storage
+
+    def save(self):
+        """Store every row as a new base, replacing the previous base and delta."""
+        meta = {
+            'generation': uuid.uuid4().hex,
+            'vocabulary': self.vocabulary,
+            'idf': self.idf.tolist(),
+            'category_ids': self.category_ids,
+            'tag_ids': self.tag_ids,
+        }
+        rows = {int(pk): _encode_row(self.matrix, i) for i, pk in enumerate(self.post_ids)}
+        _store().write_base(meta, rows)
+
+    def save_rows(self, post_ids):
+        """Store the current rows of ``post_ids`` in the delta; removed posts get an empty row."""
+        positions = {pk: i for i, pk in enumerate(self.post_ids.tolist())}
+        rows = {}
+        for pk in post_ids:
+            i = positions.get(pk)
+            rows[pk] = b'' if i is None else _encode_row(self.matrix, i)
+        _store().write_delta(rows)
+
+    @classmethod
+    def load(cls):
+        """Load the stored index, or return None if it has not been built yet."""
+        store = _store()
+        meta = store.read_meta()
+        if meta is None or 'generation' not in meta:
+            return None
+        width = len(meta['vocabulary']) + len(meta['category_ids']) + len(meta['tag_ids'])
+        post_ids, matrix = _load_base(store, meta['generation'], width)
+        index = cls(post_ids, matrix, meta['vocabulary'], meta['idf'], meta['category_ids'], meta['tag_ids'])
+        delta = store.read_delta()
+        if delta:
+            index.remove(list(delta))
+            changed = {pk: row for pk, row in delta.items() if row}
+            if changed:
+                index.append(list(changed), [_decode_rows(changed.values(), width)])
+        return index
+
+
+def _encode_row(matrix, i):
+    """Row ``i`` of a CSR matrix as its int32 column indices followed by its float32 values."""
+    start, end = matrix.indptr[i], matrix.indptr[i + 1]
+    return matrix.indices[start:end].astype('<i4').tobytes() + matrix.data[start:end].astype('<f4').tobytes()
+
+
+def _decode_rows(values, width):
+    """Stack rows encoded by ``_encode_row`` into a CSR matrix."""
+    indptr = [0]
+    indices = [np.empty(0, dtype='<i4')]
+    data = [np.empty(0, dtype='<f4')]
+    for value in values:
+        row = np.frombuffer(value, dtype='<i4')
+        n = len(row) // 2
+        indices.append(row[:n])
+        data.append(row[n:].view('<f4'))
+        indptr.append(indptr[-1] + n)
+    return sparse.csr_matrix(
+        (np.concatenate(data), np.concatenate(indices), np.asarray(indptr)),
+        shape=(len(indptr) - 1, width),
+    )
+
+
+# The base of the last generation this process loaded
+_base_cache = {}
+
+
+def _load_base(store, generation, width):
+    cached = _base_cache.get(generation)
+    if cached is None:
+        rows = store.read_base(generation)
+        cached = (np.fromiter(rows, dtype=np.int64, count=len(rows)), _decode_rows(rows.values(), width))
+        _base_cache.clear()
+        _base_cache[generation] = cached
+    return cached
+
+
+class RedisIndexStore:
+    """Meta as JSON, base and delta rows as hashes of post id -> row."""
+    META_KEY = INDEX_KEY_PREFIX + 'meta'
+    DELTA_KEY = INDEX_KEY_PREFIX + 'delta'
+
+    def __init__(self, client):
+        self.client = client
+
+    def base_key(self, generation):
+        return f'{INDEX_KEY_PREFIX}base:{generation}'
+
+    def read_meta(self):
+        raw = self.client.get(self.META_KEY)
+        return json.loads(raw) if raw is not None else None
+
+    def _read_rows(self, key):
+        return {int(pk): row for pk, row in self.client.hgetall(key).items()}
+
+    def read_base(self, generation):
+        return self._read_rows(self.base_key(generation))
+
+    def read_delta(self):
+        return self._read_rows(self.DELTA_KEY)
+
+    def write_delta(self, rows):
+        if rows:
+            self.client.hset(self.DELTA_KEY, mapping=rows)
+
+    def write_base(self, meta, rows):
+        key = self.base_key(meta['generation'])
+        items = list(rows.items())
+        for start in range(0, len(items), STORE_BATCH_SIZE):
+            self.client.hset(key, mapping=dict(items[start:start + STORE_BATCH_SIZE]))
+        old = self.read_meta()
+        # Switch to the new base and drop the old one and its delta at once
+        pipe = self.client.pipeline()
+        pipe.set(self.META_KEY, json.dumps(meta))
+        pipe.unlink(self.DELTA_KEY)
+        if old and 'generation' in old:
+            pipe.unlink(self.base_key(old['generation']))
+        pipe.execute()
+
+
+class FileIndexStore:
+    """
+    The same layout as files. Only the index tasks read it, one at a time
+    (search.tasks holds a lock), so files are replaced one by one.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _write(self, name, data):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(name))
+
+    def read_meta(self):
+        try:
+            with open(self._path('meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _read_rows(self, name):
+        try:
+            with np.load(self._path(name)) as stored:
+                ids, lengths, blob = stored['ids'], stored['lengths'], stored['blob'].tobytes()
+        except FileNotFoundError:
+            return {}
+        ends = np.cumsum(lengths).tolist()
+        starts = [0] + ends[:-1]
+        return {int(pk): blob[start:end] for pk, start, end in zip(ids, starts, ends)}
+
+    def _write_rows(self, name, rows):
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            ids=np.fromiter(rows, dtype=np.int64, count=len(rows)),
+            lengths=np.fromiter(map(len, rows.values()), dtype=np.int64, count=len(rows)),
+            blob=np.frombuffer(b''.join(rows.values()), dtype=np.uint8),
+        )
+        self._write(name, buffer.getvalue())
+
+    def read_base(self, generation):
+        return self._read_rows(f'base-{generation}.npz')
+
+    def read_delta(self):
+        return self._read_rows('delta.npz')
+
+    def write_delta(self, rows):
+        self._write_rows('delta.npz', {**self.read_delta(), **rows})
+
+    def write_base(self, meta, rows):
+        old = self.read_meta()
+        self._write_rows(f"base-{meta['generation']}.npz", rows)
+        self._write('meta.json', json.dumps(meta).encode())
+        stale = ['delta.npz']
+        if old and 'generation' in old:
+            stale.append(f"base-{old['generation']}.npz")
+        for name in stale:
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+
+
+def _store():
+    client = get_redis()
+    if client is not None:
+        return RedisIndexStore(client)
+    return FileIndexStore(settings.RELATED_POSTS_INDEX_DIR)
+
+
+def _save_related(neighbours_by_post):
+    now = timezone.now()
+    RelatedPosts.objects.bulk_create(
+        [
+            RelatedPosts(
+                post_id=post_id,
+                related_ids=[pk for pk, _ in neighbours],
+                scores=[round(score, 4) for _, score in neighbours],
+                updated_at=now,
+            )
+            for post_id, neighbours in neighbours_by_post.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['post'],
+        update_fields=['related_ids', 'scores', 'updated_at'],
+    )
+
+
+def rebuild_index():
+    """Rebuild the whole index and every post's related list. Returns the number of posts indexed."""
+    k = settings.RELATED_POSTS_COUNT
+    index = SimilarityIndex.build()
+    batch = {}
+    for post_id, neighbours in index.all_neighbours(k):
+        batch[post_id] = neighbours
+        if len(batch) >= 1000:
+            _save_related(batch)
+            batch = {}
+    _save_related(batch)
+    RelatedPosts.objects.exclude(post_id__in=index.post_ids.tolist()).delete()
+    index.save()
+    return len(index.post_ids)
+
+
+def update_posts(post_ids):
+    """
+    Incrementally update the index for changed posts.
+
+    Changed posts get fresh neighbour lists, and are inserted into the
+    lists of their nearest neighbours when they now rank high enough.
+    Unpublished or deleted posts are dropped from the matrix; stale ids left
+    in other lists are filtered at read time and cleaned by the next rebuild.
+    """
+    index = SimilarityIndex.load()
+    if index is None:
+        return rebuild_index()
+
+    k = settings.RELATED_POSTS_COUNT
+    documents = list(_post_documents(post_ids))
+    index.remove(post_ids)
+    RelatedPosts.objects.filter(post_id__in=post_ids).exclude(
+        post_id__in=[post_id for post_id, *_ in documents]
+    ).delete()
+    if not documents:
+        index.save_rows(post_ids)
+        return 0
+
+    vectors = [index.vectorize(tokens, category_ids, tag_ids) for _, tokens, category_ids, tag_ids in documents]
+    index.append([post_id for post_id, *_ in documents], vectors)
+
+    own_lists = {}
+    candidates = {}
+    for (post_id, *_), vector in zip(documents, vectors):
+        neighbours = index.neighbours(vector, k * REVERSE_CANDIDATES, exclude_id=post_id)
+        own_lists[post_id] = neighbours[:k]
+        for other_id, score in neighbours:
+            candidates.setdefault(other_id, []).append((post_id, round(score, 4)))
+
+    reverse_lists = {}
+    for related in RelatedPosts.objects.filter(post_id__in=list(candidates)).exclude(post_id__in=list(own_lists)):
+        merged = dict(zip(related.related_ids, related.scores))
+        merged.update(candidates[related.post_id])
+        ranked = sorted(merged.items(), key=lambda item: -item[1])[:k]
+        if ranked != list(zip(related.related_ids, related.scores)):
+            reverse_lists[related.post_id] = ranked
+
+    _save_related({**reverse_lists, **own_lists})
+    index.save_rows(post_ids)
+    return len(documents)
@@ -0,0 +1,89 @@
+from celery import shared_task
+from django.core.cache import cache
+import logging
+import threading
+
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+INDEX_LOCK_KEY = 'related-posts-index-lock'
+INDEX_LOCK_TIMEOUT = 60 * 30
+# Posts whose update could not get the lock, indexed by the next run
+PENDING_KEY = 'related-posts-index:pending'
+
+# In-process fallback used when Redis is not configured
+_local_lock = threading.Lock()
+_local_pending = set()
+
+
+def queue_pending(post_ids):
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            _local_pending.update(post_ids)
+    elif post_ids:
+        client.sadd(PENDING_KEY, *post_ids)
+
+
+def pop_pending():
+    """Atomically take the queued post ids."""
+    client = get_redis()
+    if client is None:
+        with _local_lock:
+            post_ids = set(_local_pending)
+            _local_pending.clear()
+        return post_ids
+    pipe = client.pipeline()
+    pipe.smembers(PENDING_KEY)
+    pipe.delete(PENDING_KEY)
+    raw, _ = pipe.execute()
+    return {int(pk) for pk in raw}
+
+
+@shared_task
+def rebuild_related_posts_index():
+    """
+    Rebuild the related-posts similarity index from all published posts.
+    """
+    # Imported here so processes that only queue tasks don't load NumPy/SciPy
+    from .similarity import rebuild_index
+
+    if not cache.add(INDEX_LOCK_KEY, 1, INDEX_LOCK_TIMEOUT):
+        return "Related posts index is locked by another task"
+    # The rebuild reads every post, queued ones included
+    pending = pop_pending()
+    try:
+        count = rebuild_index()
+    except Exception:
+        queue_pending(pending)
+        raise
+    finally:
+        cache.delete(INDEX_LOCK_KEY)
+    logger.info(f"Rebuilt related posts index for {count} posts")
+    return f"Indexed {count} posts"
+
+
+@shared_task(bind=True, max_retries=10)
+def update_related_posts(self, post_ids):
+    """
+    Incrementally update the similarity index for the given posts, and for
+    any left over by updates that gave up waiting for the lock.
+    """
+    from .similarity import update_posts
+
+    if not cache.add(INDEX_LOCK_KEY, 1, INDEX_LOCK_TIMEOUT):
+        if self.request.retries >= self.max_retries:
+            logger.warning(f"Related posts index still locked, queued posts {post_ids} for the next index run")
+            queue_pending(post_ids)
+            return f"Queued {len(post_ids)} posts for the next index run"
+        raise self.retry(countdown=30)
+    post_ids = sorted(set(post_ids) | pop_pending())
+    try:
+        count = update_posts(post_ids)
+    except Exception:
+        queue_pending(post_ids)
+        raise
+    finally:
+        cache.delete(INDEX_LOCK_KEY)
+    return f"Updated related posts for {count} posts"
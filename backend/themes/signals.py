@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from admin_interface.models import Theme
@@ -8,4 +9,13 @@ from .models import ExtendedTheme
 def create_extended_theme(sender, instance, created, **kwargs):
     """Auto-create ExtendedTheme record when a new Theme is created."""
     if created:
-        ExtendedTheme.objects.create(theme=instance) 
\ No newline at end of file
+        ExtendedTheme.objects.create(theme=instance)
+
+
+@receiver(post_save, sender=ExtendedTheme)
+def mirror_external_hero_image(sender, instance, **kwargs):
+    """Copy an external hero image URL into storage (posts.image_mirror)."""
+    from posts import image_mirror
+
+    if image_mirror.canonical_url(instance.hero_image.name if instance.hero_image else None):
+        transaction.on_commit(image_mirror.schedule)
@@ -0,0 +1,91 @@
+"""
+Cached counters for the admin dashboard.
+
+The totals live in the cache (Redis in production) and are adjusted
+incrementally by the signal handlers in ``utils.signals`` and by the
+``update()`` hooks on the Post and Subscriber querysets. The
+``reconcile_admin_counters`` Celery task recomputes them periodically to
+correct any drift, so reading a counter is a single cache lookup.
+"""
+from django.core.cache import cache
+
+KEY_PREFIX = 'admin-counter:'
+
+# Maps a post status to the counter that tracks it
+POST_STATUS_COUNTERS = {
+    'published': 'published_posts',
+    'draft': 'draft_posts',
+}
+
+
+def _count_published_posts():
+    from posts.models import Post
+    return Post.objects.filter(status='published').count()
+
+
+def _count_draft_posts():
+    from posts.models import Post
+    return Post.objects.filter(status='draft').count()
+
+
+def _count_categories():
+    from categories.models import Category
+    return Category.objects.count()
+
+
+def _count_active_subscribers():
+    from newsletter.models import Subscriber
+    return Subscriber.objects.filter(is_active=True).count()
+
+
+COUNTERS = {
+    'published_posts': _count_published_posts,
+    'draft_posts': _count_draft_posts,
+    'categories': _count_categories,
+    'active_subscribers': _count_active_subscribers,
+}
+
+
+def get_count(name):
+    """Return a counter value, computing it once if it is not cached yet."""
+    key = KEY_PREFIX + name
+    value = cache.get(key)
+    if value is None:
+        value = COUNTERS[name]()
+        cache.add(key, value, timeout=None)
+    return value
+
+
+def adjust(name, delta):
+    """Atomically add ``delta`` to a cached counter."""
+    if not delta:
+        return
+    try:
+        cache.incr(KEY_PREFIX + name, delta)
+    except ValueError:
+        # Not cached yet; it will be computed on the next read
+        pass
+
+
+def invalidate(name):
+    """Drop a counter so it is recomputed on the next read."""
+    cache.delete(KEY_PREFIX + name)
+
+
+def record_status_change(old_status, new_status, count=1):
+    """Move ``count`` posts from one status counter to another."""
+    if old_status == new_status:
+        return
+    if old_status in POST_STATUS_COUNTERS:
+        adjust(POST_STATUS_COUNTERS[old_status], -count)
+    if new_status in POST_STATUS_COUNTERS:
+        adjust(POST_STATUS_COUNTERS[new_status], count)
+
+
+def reconcile():
+    """Recompute every counter from the database."""
+    values = {}
+    for name, compute in COUNTERS.items():
+        values[name] = compute()
+        cache.set(KEY_PREFIX + name, values[name], timeout=None)
+    return values
@@ -0,0 +1,22 @@
+"""
+Artificial query latency for benchmarking (DB_SIMULATED_LATENCY_MS).
+
+Every query on every connection sleeps first, which approximates a slow
+or distant database without touching Postgres. Never enable in production.
+"""
+import time
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def delay_query(execute, sql, params, many, context):
+    time.sleep(settings.DB_SIMULATED_LATENCY_MS / 1000)
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def add_simulated_latency(sender, connection, **kwargs):
+    if settings.DB_SIMULATED_LATENCY_MS and delay_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(delay_query)
@@ -0,0 +1,48 @@
+import gzip
+import os
+import tempfile
+
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# mkstemp creates 0600 files; published files get the mode open() would give
+# them (0644 under the usual umask) so nginx or a sync job can read them
+FILE_MODE = 0o666 & ~_umask()
+
+
+def write_precompressed(path, chunks, compress=True):
+    """
+    Write ``chunks`` (an iterable of bytes) to ``path`` and, unless
+    ``compress`` is False, a gzip copy at ``path + '.gz'``.
+
+    Both files are written to temporary files first and moved into place,
+    so readers never see a partially written file.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    gz_fd, gz_tmp_path = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, 'wb') as raw, os.fdopen(gz_fd, 'wb') as gz_raw:
+        with gzip.GzipFile(fileobj=gz_raw, mode='wb', compresslevel=9, mtime=0) as gz:
+            for chunk in chunks:
+                raw.write(chunk)
+                if compress:
+                    gz.write(chunk)
+    os.chmod(tmp_path, FILE_MODE)
+    os.replace(tmp_path, path)
+    if compress:
+        os.chmod(gz_tmp_path, FILE_MODE)
+        os.replace(gz_tmp_path, path + '.gz')
+    else:
+        os.remove(gz_tmp_path)
+
+
+def remove_precompressed(path):
+    """Remove a file written by ``write_precompressed`` and its gzip copy."""
+    for candidate in (path, path + '.gz'):
+        if os.path.exists(candidate):
+            os.remove(candidate)
@@ -2,7 +2,7 @@ import base64
 import io
 from PIL import Image
 from django.core.files.storage import default_storage
-from urllib.parse import urljoin
+from urllib.parse import unquote, urljoin
 from django.conf import settings
 import os
 
@@ -32,9 +32,11 @@ def generate_blur_placeholder(image_url, size=(10, 10)):
             return fallback
         
         # Handle relative paths from storage
-        image_path = image_url
-        if image_url.startswith('/'):
-            image_path = image_url[1:]  # Remove leading slash
+        image_path = unquote(image_url)
+        if image_path.startswith(settings.MEDIA_URL):
+            image_path = image_path[len(settings.MEDIA_URL):]  # Storage name of a media URL
+        elif image_path.startswith('/'):
+            image_path = image_path[1:]  # Remove leading slash
             
         # Open the image from storage
         if not default_storage.exists(image_path):
@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+# What each target imports, run in a fresh interpreter
+TARGETS = {
+    'setup': 'import django; django.setup()',
+    'wsgi': 'import blog.wsgi',
+    'urls': 'import django; django.setup(); from django.urls import get_resolver; get_resolver().url_patterns',
+    'celery': 'import django; django.setup(); from blog.celery import app; app.loader.import_default_modules()',
+}
+
+
+def parse_importtime(output):
+    """
+    Parse ``python -X importtime`` output into a list of
+    ``(name, self_us, cumulative_us, parent)`` tuples.
+    """
+    entries, pending = [], {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        entry = [name, int(self_us), int(cumulative_us), None]
+        # Children are printed before their parent, one level deeper
+        for child in pending.pop(depth + 1, []):
+            child[3] = name
+        pending.setdefault(depth, []).append(entry)
+        entries.append(entry)
+    return [tuple(entry) for entry in entries]
+
+
+class Command(BaseCommand):
+    help = 'Report import time per module for a cold start of the given target'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=sorted(TARGETS), default='urls')
+        parser.add_argument('--limit', type=int, default=25, help='Number of modules to list')
+        parser.add_argument('--module', action='append', default=[],
+                            help='Show the import chain that loads this module (repeatable)')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'blog.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', TARGETS[options['target']]],
+            capture_output=True, text=True, env=env,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr[-2000:])
+        entries = parse_importtime(result.stderr)
+        parents = {name: parent for name, _, _, parent in entries}
+
+        total = sum(self_us for _, self_us, _, _ in entries)
+        self.stdout.write(f"{options['target']}: {len(entries)} modules imported in {total / 1000:.1f} ms")
+
+        self.stdout.write('\nSlowest modules (cumulative):')
+        for name, self_us, cumulative_us, parent in sorted(entries, key=lambda e: -e[2])[:options['limit']]:
+            via = f'  <- {parent}' if parent else ''
+            self.stdout.write(f'{cumulative_us / 1000:9.1f} ms {self_us / 1000:8.1f} ms self  {name}{via}')
+
+        packages = {}
+        for name, self_us, _, _ in entries:
+            package = name.split('.', 1)[0]
+            packages[package] = packages.get(package, 0) + self_us
+        self.stdout.write('\nBy top-level package (self time):')
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['limit']]:
+            self.stdout.write(f'{self_us / 1000:9.1f} ms  {package}')
+
+        for module in options['module']:
+            if module not in parents:
+                self.stdout.write(f'\n{module} is not imported by {options["target"]}')
+                continue
+            chain = [module]
+            while parents.get(chain[-1]):
+                chain.append(parents[chain[-1]])
+            self.stdout.write(f'\n{module} is imported via: ' + ' <- '.join(chain))
@@ -0,0 +1,63 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+ESTIMATE_KEY_PREFIX = 'paginator:estimate:'
+
+
+def estimate_count(queryset, timeout=None):
+    """
+    Return the PostgreSQL planner's row estimate for a queryset,
+    or None when an estimate is not available.
+
+    With a ``timeout`` the estimate is cached for that many seconds per
+    distinct query, so repeated page loads don't each run an EXPLAIN.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    if timeout:
+        digest = hashlib.sha1(repr((sql, params)).encode()).hexdigest()
+        key = f'{ESTIMATE_KEY_PREFIX}{queryset.db}:{digest}'
+        estimate = cache.get(key)
+        if estimate is None:
+            estimate = _explain_rows(connection, sql, params)
+            cache.set(key, estimate, timeout)
+        return estimate
+    return _explain_rows(connection, sql, params)
+
+
+def _explain_rows(connection, sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the planner's row estimate instead of an exact
+    COUNT(*) once the result set is larger than ``estimate_threshold``.
+    Small result sets are still counted exactly.
+
+    Estimates are cached for ``estimate_timeout`` seconds per query, so
+    the EXPLAIN runs at most once per changelist view in that window.
+    """
+    estimate_threshold = 10000
+    estimate_timeout = 60 * 5
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            estimate = estimate_count(self.object_list, timeout=self.estimate_timeout)
+            if estimate is not None and estimate > self.estimate_threshold:
+                return estimate
+        return super().count
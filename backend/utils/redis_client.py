@@ -0,0 +1,39 @@
+import asyncio
+from functools import lru_cache
+import weakref
+
+from django.conf import settings
+
+# redis.asyncio connections belong to the event loop that opened them
+_async_clients = weakref.WeakKeyDictionary()
+
+
+@lru_cache(maxsize=None)
+def get_redis():
+    """
+    Return a shared Redis client for REDIS_URL, or None when Redis is not configured.
+
+    Callers are expected to fall back to an in-process or synchronous
+    implementation when this returns None (e.g. in tests).
+    """
+    url = getattr(settings, 'REDIS_URL', None)
+    if not url:
+        return None
+    import redis
+    return redis.Redis.from_url(url)
+
+
+def get_async_redis():
+    """
+    Return an asyncio Redis client for the running event loop, or None when
+    Redis is not configured. Must be called from a coroutine.
+    """
+    url = getattr(settings, 'REDIS_URL', None)
+    if not url:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import redis.asyncio
+        client = _async_clients[loop] = redis.asyncio.Redis.from_url(url)
+    return client
@@ -0,0 +1,66 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from posts.models import Post
+from categories.models import Category
+from newsletter.models import Subscriber
+from . import counters
+
+
+def _on_commit(func, *args):
+    """Adjust a counter once the write is committed, not if it rolls back."""
+    transaction.on_commit(partial(func, *args))
+
+
+@receiver(post_init, sender=Post)
+def remember_post_status(sender, instance, **kwargs):
+    """Keep the loaded status so saves can tell which counter to move."""
+    # Read from __dict__ so deferred fields are not fetched
+    instance._counter_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    if created:
+        _on_commit(counters.record_status_change, None, instance.status)
+    elif instance._counter_status is not None:
+        _on_commit(counters.record_status_change, instance._counter_status, instance.status)
+    instance._counter_status = instance.status
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    _on_commit(counters.record_status_change, instance.status, None)
+
+
+@receiver(post_save, sender=Category)
+def count_saved_category(sender, instance, created, **kwargs):
+    if created:
+        _on_commit(counters.adjust, 'categories', 1)
+
+
+@receiver(post_delete, sender=Category)
+def count_deleted_category(sender, instance, **kwargs):
+    _on_commit(counters.adjust, 'categories', -1)
+
+
+@receiver(post_init, sender=Subscriber)
+def remember_subscriber_state(sender, instance, **kwargs):
+    instance._counter_active = instance.__dict__.get('is_active')
+
+
+@receiver(post_save, sender=Subscriber)
+def count_saved_subscriber(sender, instance, created, **kwargs):
+    was_active = False if created else instance._counter_active
+    if was_active is not None and was_active != instance.is_active:
+        _on_commit(counters.adjust, 'active_subscribers', 1 if instance.is_active else -1)
+    instance._counter_active = instance.is_active
+
+
+@receiver(post_delete, sender=Subscriber)
+def count_deleted_subscriber(sender, instance, **kwargs):
+    if instance.is_active:
+        _on_commit(counters.adjust, 'active_subscribers', -1)
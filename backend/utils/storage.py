@@ -0,0 +1,189 @@
+"""
+Content-addressed media storage.
+
+``ContentAddressedStorage`` wraps another storage (the default one) and
+saves every file under the SHA-256 of its bytes,
+``<CONTENT_ADDRESSED_DIR>/ab/ab12….jpg``, whatever name the upload had.
+Re-uploading the same photo reuses the existing file, and a URL always
+points at the same bytes, so ``middleware.media_cache_middleware`` serves
+these paths with an immutable Cache-Control.
+
+Files derived from a hashed file (the WebP copy, content image variants)
+are named after it and are immutable as well. Since a hashed file can be
+shared by several rows, ``delete`` leaves it in place.
+
+Post image fields use it through ``post_image_storage``;
+MEDIA_CONTENT_ADDRESSED=False switches new uploads back to the default
+storage. ``manage.py rehash_media`` moves existing files over, and with
+``--delete-orphans`` removes hashed files nothing refers to any more.
+"""
+from datetime import timedelta
+import hashlib
+import logging
+import os
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage, default_storage
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Uploads are stored before the row referring to them is saved
+ORPHAN_MIN_AGE = timedelta(days=1)
+
+
+class ContentAddressedStorage(Storage):
+    def __init__(self, base=None):
+        self.base = base if base is not None else default_storage
+
+    @property
+    def directory(self):
+        return settings.CONTENT_ADDRESSED_DIR
+
+    def is_hashed(self, name):
+        return bool(name) and name.startswith(self.directory + '/')
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        extension = os.path.splitext(name or '')[1].lower()
+        return f'{self.directory}/{digest[:2]}/{digest}{extension}'
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        hashed = self.hashed_name(name, content)
+        if self.base.exists(hashed):
+            # Identical bytes are already stored
+            return hashed
+        return self.base.save(hashed, content, max_length=max_length)
+
+    def delete(self, name):
+        # Other rows may point at the same file
+        if not self.is_hashed(name):
+            self.base.delete(name)
+
+    def _open(self, name, mode='rb'):
+        return self.base.open(name, mode)
+
+    def exists(self, name):
+        return self.base.exists(name)
+
+    def listdir(self, path):
+        return self.base.listdir(path)
+
+    def size(self, name):
+        return self.base.size(name)
+
+    def url(self, name):
+        return self.base.url(name)
+
+    def path(self, name):
+        return self.base.path(name)
+
+    def get_accessed_time(self, name):
+        return self.base.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.base.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.base.get_modified_time(name)
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def post_image_storage():
+    """Storage of the post image fields."""
+    if settings.MEDIA_CONTENT_ADDRESSED:
+        return content_addressed_storage
+    return default_storage
+
+
+def rehash(queryset, fields, dry_run=False, delete_originals=False):
+    """
+    Move the files of ``fields`` in ``queryset`` into content-addressed
+    storage and save the rows with the hashed names, so the model's save and
+    signals run as for an upload. Returns ``(fields updated, files deleted)``.
+    """
+    storage = content_addressed_storage
+    pending = Q()
+    for field in fields:
+        pending |= Q(**{f'{field}__gt': ''}) & ~Q(**{f'{field}__startswith': storage.directory + '/'})
+    names = {}
+    updated = 0
+    for instance in queryset.filter(pending).order_by('pk').iterator():
+        changed = []
+        for field in fields:
+            name = getattr(instance, field).name
+            # External URLs are left to posts.image_mirror
+            if not name or storage.is_hashed(name) or name.startswith(('http', '/')):
+                continue
+            if name not in names:
+                if not storage.exists(name):
+                    logger.warning('Missing media file %s', name)
+                    names[name] = None
+                    continue
+                with storage.open(name) as original:
+                    if dry_run:
+                        names[name] = storage.hashed_name(name, original)
+                    else:
+                        names[name] = storage.save(name, original)
+            if names[name]:
+                setattr(instance, field, names[name])
+                changed.append(field)
+        if changed and not dry_run:
+            instance.save(update_fields=changed)
+        updated += len(changed)
+
+    deleted = 0
+    if delete_originals and not dry_run:
+        moved = [name for name, new in names.items() if new]
+        referenced = set()
+        for field in fields:
+            referenced.update(queryset.model.objects.filter(**{f'{field}__in': moved}).values_list(field, flat=True))
+        for name in moved:
+            if name in referenced:
+                continue
+            for path in (name, os.path.splitext(name)[0] + '.webp'):
+                if default_storage.exists(path):
+                    default_storage.delete(path)
+            deleted += 1
+    return updated, deleted
+
+
+def delete_orphans(references, dry_run=False):
+    """
+    Delete hashed files, with their WebP copies and content image variants,
+    whose digest appears in none of ``references`` (stored names, or text
+    such as post content). Files younger than ORPHAN_MIN_AGE are kept.
+    Returns the number of files deleted (or that would be).
+    """
+    directory = settings.CONTENT_ADDRESSED_DIR
+    pattern = re.compile(rf'{re.escape(directory)}/[0-9a-f]{{2}}/([0-9a-f]{{64}})')
+    used = set()
+    for text in references:
+        if text:
+            used.update(pattern.findall(text))
+    if not default_storage.exists(directory):
+        return 0
+    cutoff = timezone.now() - ORPHAN_MIN_AGE
+    deleted = 0
+    for prefix in default_storage.listdir(directory)[0]:
+        for filename in default_storage.listdir(f'{directory}/{prefix}')[1]:
+            name = f'{directory}/{prefix}/{filename}'
+            # Derived files are named after the digest of their source
+            if filename[:64] in used or default_storage.get_modified_time(name) > cutoff:
+                continue
+            if not dry_run:
+                default_storage.delete(name)
+            deleted += 1
+    return deleted
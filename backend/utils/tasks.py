@@ -0,0 +1,17 @@
+from celery import shared_task
+import logging
+
+from . import counters
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_admin_counters():
+    """
+    Recompute the cached admin dashboard counters from the database
+    to correct any drift from the incremental updates.
+    """
+    values = counters.reconcile()
+    logger.info(f"Reconciled admin counters: {values}")
+    return values
@@ -1,7 +1,5 @@
 from django import template
-from posts.models import Post
-from categories.models import Category
-from newsletter.models import Subscriber
+from utils import counters
 # Assuming you have a Media model, import it. If not, remove the relevant lines.
 # from media.models import Media 
 
@@ -10,22 +8,22 @@ register = template.Library()
 @register.simple_tag
 def get_post_count():
     """Returns the total count of published posts."""
-    return Post.objects.filter(status='published').count()
+    return counters.get_count('published_posts')
 
 @register.simple_tag
 def get_category_count():
     """Returns the total count of categories."""
-    return Category.objects.count()
+    return counters.get_count('categories')
 
 @register.simple_tag
 def get_subscriber_count():
     """Returns the total count of active subscribers."""
-    return Subscriber.objects.filter(is_active=True).count()
+    return counters.get_count('active_subscribers')
 
 @register.simple_tag
 def get_draft_post_count():
     """Returns the total count of draft posts."""
-    return Post.objects.filter(status='draft').count()
+    return counters.get_count('draft_posts')
 
 # @register.simple_tag
 # def get_media_count():
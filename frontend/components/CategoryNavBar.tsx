@@ -6,19 +6,24 @@ interface CategoryNavBarProps {
   onCategorySelect: (slug: string | null) => void;
   selectedCategory: string | null;
   className?: string;
+  // Categories already loaded by the page (e.g. from /home/); skips the fetch
+  initialCategories?: CategoryData[];
 }
 
 const CategoryNavBar: React.FC<CategoryNavBarProps> = ({ 
   onCategorySelect,
   selectedCategory,
-  className = ''
+  className = '',
+  initialCategories = []
 }) => {
-  const [categories, setCategories] = useState<CategoryData[]>([]);
-  const [isLoading, setIsLoading] = useState(true);
+  const [categories, setCategories] = useState<CategoryData[]>(initialCategories);
+  const [isLoading, setIsLoading] = useState(initialCategories.length === 0);
   const [error, setError] = useState<Error | null>(null);
   
   // Fetch categories on component mount
   useEffect(() => {
+    if (initialCategories.length > 0) return;
+    
     const fetchCategories = async () => {
       devLog('🔍 [NavBar] fetching categories…');
       try {
@@ -36,7 +41,7 @@ const CategoryNavBar: React.FC<CategoryNavBarProps> = ({
     };
     
     fetchCategories();
-  }, []);
+  }, [initialCategories.length]);
   
   // Handle category selection
   const handleCategoryClick = (slug: string | null) => {
@@ -26,6 +26,8 @@ export interface Post {
   side_image_2?: string | null;
   side_image_1_blur?: string | null;
   side_image_2_blur?: string | null;
+  // Responsive variants of the images in content, keyed by their src
+  content_images?: Record<string, { width: number; height: number; srcset: string; sizes: string }>;
 }
 
 interface PostCardProps {
@@ -24,6 +24,21 @@ if (isDev) {
   console.log(`[API] Using MEDIA_BASE_URL: ${MEDIA_BASE_URL}`);
 }
 
+/**
+ * fetch() for API requests. Server-side requests carry the internal token so
+ * SSR traffic is exempt from the API rate limits; API_INTERNAL_TOKEN has no
+ * NEXT_PUBLIC_ prefix and never reaches the browser.
+ */
+function apiFetch(url: string, init: RequestInit = {}): Promise<Response> {
+  const token = isServer ? process.env.API_INTERNAL_TOKEN : undefined;
+  if (!token) {
+    return fetch(url, init);
+  }
+  const headers = new Headers(init.headers);
+  headers.set('X-Internal-Token', token);
+  return fetch(url, { ...init, headers });
+}
+
 /**
  * Helper function to transform relative image URLs to absolute URLs
  * using the correct host (django:8000 or localhost:8000)
@@ -101,7 +116,7 @@ export async function getFeaturedPosts(category?: string | null): Promise<Post[]
     if (isDev) {
       console.log(`[API:getFeaturedPosts] Fetching from ${url}`);
     }
-    const response = await fetch(url);
+    const response = await apiFetch(url);
     
     if (!response.ok) {
       throw new Error(`Error fetching featured posts: ${response.status}`);
@@ -142,7 +157,7 @@ export async function getActiveTheme(): Promise<ThemeData | null> {
     if (isDev) {
       console.log(`[API:getActiveTheme] Fetching from ${API_URL}/theme/`);
     }
-    const response = await fetch(`${API_URL}/theme/`);
+    const response = await apiFetch(`${API_URL}/theme/`);
     if (!response.ok) {
       throw new Error(`Error fetching theme data: ${response.status}`);
     }
@@ -196,7 +211,7 @@ export async function getPosts(
       console.log(`[API:getPosts] Fetching from ${url}`);
     }
     
-    const response = await fetch(url);
+    const response = await apiFetch(url);
     
     if (!response.ok) {
       throw new Error(`Error fetching posts: ${response.status}`);
@@ -241,7 +256,7 @@ export async function getPost(slug: string): Promise<Post | null> {
     if (isDev) {
       console.log(`[API:getPost] Fetching post ${slug} from ${API_URL}/posts/${slug}/`);
     }
-    const response = await fetch(`${API_URL}/posts/${slug}/`);
+    const response = await apiFetch(`${API_URL}/posts/${slug}/`);
     if (!response.ok) {
       if (response.status === 404) return null;
       throw new Error(`Error fetching post: ${response.status}`);
@@ -274,13 +289,55 @@ export async function getPost(slug: string): Promise<Post | null> {
   }
 }
 
+/**
+ * Fetches several posts in one request, in the order given
+ * @param slugs Post slugs (at most 50)
+ * @returns The published posts found and the slugs that were not
+ */
+export async function getPostsBySlug(slugs: string[]): Promise<{ posts: Post[]; missing: string[] }> {
+  if (slugs.length === 0) return { posts: [], missing: [] };
+  try {
+    const query = slugs.map((slug) => encodeURIComponent(slug)).join(',');
+    const response = await apiFetch(`${API_URL}/posts/batch/?slugs=${query}`);
+    if (!response.ok) {
+      throw new Error(`Error fetching posts: ${response.status}`);
+    }
+    const data = await response.json();
+    return {
+      posts: (data.results as Post[]).map((post: Post) => transformPostImageUrls(post)),
+      missing: data.missing,
+    };
+  } catch (error) {
+    console.error('Error fetching posts by slug:', error);
+    return { posts: [], missing: slugs };
+  }
+}
+
+/**
+ * Fetches posts related to the given post from the precomputed similarity index
+ * @param slug Slug of the post to find related posts for
+ */
+export async function getRelatedPosts(slug: string): Promise<Post[]> {
+  try {
+    const response = await apiFetch(`${API_URL}/posts/${slug}/related/`);
+    if (!response.ok) {
+      throw new Error(`Error fetching related posts: ${response.status}`);
+    }
+    const results = (await response.json()) as Post[];
+    return results.map((post: Post) => transformPostImageUrls(post));
+  } catch (error) {
+    console.error('Error fetching related posts:', error);
+    return [];
+  }
+}
+
 /**
  * Subscribes a user to the newsletter via the API
  * @param email The email address to subscribe
  */
 export async function subscribe(email: string): Promise<{ id: number; email: string; name?: string }> {
   try {
-    const response = await fetch(
+    const response = await apiFetch(
       `${API_URL}/subscribe/`,
       {
         method: 'POST',
@@ -306,6 +363,39 @@ export interface CategoryData {
   name: string;
   slug: string;
   description?: string;
+  post_count?: number;
+}
+
+/**
+ * Everything the homepage renders, as returned by /home/
+ */
+export interface HomePageData {
+  theme: ThemeData | null;
+  featuredPosts: Post[];
+  categories: CategoryData[];
+  posts: Post[];
+  hasMore: boolean;
+}
+
+/**
+ * Fetches the theme, featured posts, categories and first page of posts in one request
+ */
+export async function getHomePage(): Promise<HomePageData> {
+  const response = await apiFetch(`${API_URL}/home/`);
+  if (!response.ok) {
+    throw new Error(`Error fetching homepage data: ${response.status}`);
+  }
+  const data = await response.json();
+  if (data.theme?.hero_image) {
+    data.theme.hero_image = transformImageUrl(data.theme.hero_image);
+  }
+  return {
+    theme: data.theme,
+    featuredPosts: data.featured_posts.map((post: Post) => transformPostImageUrls(post)),
+    categories: data.categories,
+    posts: data.posts.results.map((post: Post) => transformPostImageUrls(post)),
+    hasMore: !!data.posts.next,
+  };
 }
 
 /**
@@ -313,7 +403,7 @@ export interface CategoryData {
  */
 export async function getCategories(): Promise<CategoryData[]> {
   try {
-    const response = await fetch(`${API_URL}/categories/`);
+    const response = await apiFetch(`${API_URL}/categories/`);
     if (!response.ok) {
       throw new Error(`Error fetching categories: ${response.status}`);
     }
@@ -323,4 +413,35 @@ export async function getCategories(): Promise<CategoryData[]> {
     console.error('Error fetching categories:', error);
     return [];
   }
-} 
\ No newline at end of file
+}
+
+/**
+ * Tag with its number of published posts
+ */
+export interface TagCount {
+  name: string;
+  slug: string;
+  count: number;
+}
+
+/**
+ * Fetches the most used tags, optionally counted within a category
+ * @param category Optional category slug
+ */
+export async function getTags(category?: string | null): Promise<TagCount[]> {
+  try {
+    let url = `${API_URL}/tags/`;
+    if (category) {
+      url += `?category=${encodeURIComponent(category)}`;
+    }
+    const response = await apiFetch(url);
+    if (!response.ok) {
+      throw new Error(`Error fetching tags: ${response.status}`);
+    }
+    const data = await response.json();
+    return Array.isArray(data) ? data : data.results || [];
+  } catch (error) {
+    console.error('Error fetching tags:', error);
+    return [];
+  }
+}
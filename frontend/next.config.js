@@ -1,3 +1,7 @@
+// Origin of the Django backend, used to proxy prebuilt sitemaps and feeds
+const BACKEND_URL = (process.env.NEXT_PUBLIC_INTERNAL_API_URL || 'http://django:8000/api/v1')
+  .replace(/\/api\/v1\/?$/, '');
+
 /** @type {import('next').NextConfig} */
 module.exports = {
   reactStrictMode: true,
@@ -43,6 +47,18 @@ module.exports = {
         source: '/api/:path*',
         destination: process.env.NEXT_PUBLIC_API_URL + '/:path*',
       },
+      {
+        source: '/sitemap.xml',
+        destination: `${BACKEND_URL}/sitemap.xml`,
+      },
+      {
+        source: '/sitemaps/:path*',
+        destination: `${BACKEND_URL}/sitemaps/:path*`,
+      },
+      {
+        source: '/feeds/:path*',
+        destination: `${BACKEND_URL}/feeds/:path*`,
+      },
     ]
   },
 } 
\ No newline at end of file
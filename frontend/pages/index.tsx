@@ -4,7 +4,7 @@ import FeaturedPosts from '../components/FeaturedPosts';
 import PostGrid from '../components/PostGrid';
 import HeroSection from '../components/HeroSection';
 import CategoryNavBar from '../components/CategoryNavBar';
-import { getFeaturedPosts, getPosts, getActiveTheme, ThemeData } from '../lib/api';
+import { getFeaturedPosts, getActiveTheme, getHomePage, ThemeData, CategoryData } from '../lib/api';
 import { Post } from '../components/PostCard';
 import { getPublicImageUrl, getCanonicalUrl } from '../lib/utils';
 
@@ -13,6 +13,7 @@ interface HomeProps {
   initialPosts: Post[];
   initialHasMore: boolean;
   initialTheme: ThemeData | null;
+  initialCategories: CategoryData[];
 }
 
 // Site URL from environment variable with fallback
@@ -20,14 +21,8 @@ const SITE_URL = process.env.NEXT_PUBLIC_SITE_URL || 'http://localhost:3000';
 
 export async function getServerSideProps() {
   try {
-    // Fetch theme data for hero section
-    const theme = await getActiveTheme();
-    
-    // Fetch featured posts
-    const featuredPosts = await getFeaturedPosts();
-    
-    // Fetch regular posts (page 1)
-    const { posts, hasMore } = await getPosts(1);
+    // Theme, featured posts, categories and the first page of posts in one request
+    const { theme, featuredPosts, categories, posts, hasMore } = await getHomePage();
     
     return {
       props: {
@@ -35,6 +30,7 @@ export async function getServerSideProps() {
         initialFeaturedPosts: featuredPosts || [],
         initialPosts: posts || [],
         initialHasMore: hasMore || false,
+        initialCategories: categories || [],
       }
     };
   } catch (error) {
@@ -45,6 +41,7 @@ export async function getServerSideProps() {
         initialFeaturedPosts: [],
         initialPosts: [],
         initialHasMore: false,
+        initialCategories: [],
       }
     };
   }
@@ -54,7 +51,8 @@ const Home: React.FC<HomeProps> = ({
   initialFeaturedPosts, 
   initialPosts, 
   initialHasMore,
-  initialTheme
+  initialTheme,
+  initialCategories
 }) => {
   const [featuredPosts, setFeaturedPosts] = useState<Post[]>(initialFeaturedPosts);
   const [isLoadingFeatured, setIsLoadingFeatured] = useState(false);
@@ -228,6 +226,7 @@ const Home: React.FC<HomeProps> = ({
         {/* Category Navbar - conditionally render based on theme setting */}
         {theme?.show_navbar && (
           <CategoryNavBar 
+            initialCategories={initialCategories}
             selectedCategory={selectedCategory}
             onCategorySelect={handleCategorySelect}
           />
@@ -1,11 +1,11 @@
 import React, { useEffect } from 'react';
 import Head from 'next/head';
 import { GetServerSideProps } from 'next';
-import { getPost } from '../../lib/api';
-import { Post } from '../../components/PostCard';
+import { getPost, getRelatedPosts } from '../../lib/api';
+import PostCard, { Post } from '../../components/PostCard';
 import Image from 'next/image';
 import Link from 'next/link';
-import ReactMarkdown from 'react-markdown';
+import ReactMarkdown, { Components } from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 import rehypeSanitize from 'rehype-sanitize';
 import SocialShare from '../../components/SocialShare';
@@ -15,6 +15,7 @@ const isDev = process.env.NODE_ENV === 'development';
 
 interface PostPageProps {
   post: Post | null;
+  relatedPosts: Post[];
 }
 
 // Generic blur placeholder SVG (10x10 grey) as fallback
@@ -23,9 +24,42 @@ const FALLBACK_BLUR_PLACEHOLDER = 'data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR
 // Get site URL from environment variable with fallback
 const SITE_URL = process.env.NEXT_PUBLIC_SITE_URL || 'http://localhost:3000';
 
+// Content images get the srcset, sizes and dimensions the backend generated for them.
+// Only Markdown images reach this component: without rehype-raw, raw HTML <img>
+// tags (Summernote) are not rendered by react-markdown.
+function contentImageComponents(images: Post['content_images'] = {}): Components {
+  return {
+    img: ({ node, src, ...props }) => {
+      const image = src ? images[src] : undefined;
+      if (!src || !image) {
+        return <img src={src} {...props} loading="lazy" decoding="async" />;
+      }
+      const srcSet = image.srcset
+        .split(', ')
+        .map((candidate) => {
+          const [url, width] = candidate.split(' ');
+          return `${getPublicImageUrl(url)} ${width}`;
+        })
+        .join(', ');
+      return (
+        <img
+          {...props}
+          src={getPublicImageUrl(src)}
+          srcSet={srcSet}
+          sizes={image.sizes}
+          width={image.width}
+          height={image.height}
+          loading="lazy"
+          decoding="async"
+        />
+      );
+    },
+  };
+}
+
 export const getServerSideProps: GetServerSideProps = async ({ params }) => {
   const slug = params?.slug as string;
-  const post = await getPost(slug);
+  const [post, relatedPosts] = await Promise.all([getPost(slug), getRelatedPosts(slug)]);
   if (!post) {
     return { notFound: true };
   }
@@ -37,10 +71,10 @@ export const getServerSideProps: GetServerSideProps = async ({ params }) => {
       side_image_2: post.side_image_2
     });
   }
-  return { props: { post } };
+  return { props: { post, relatedPosts } };
 };
 
-const PostPage: React.FC<PostPageProps> = ({ post }) => {
+const PostPage: React.FC<PostPageProps> = ({ post, relatedPosts }) => {
   useEffect(() => {
     if (post) {
       if (isDev) {
@@ -239,10 +273,11 @@ const PostPage: React.FC<PostPageProps> = ({ post }) => {
               const part1 = text.slice(0, firstCut);
               const part2 = text.slice(firstCut, secondCut);
               const part3 = text.slice(secondCut);
+              const components = contentImageComponents(post.content_images);
               return (
                 <>
                   {/* First segment */}
-                  <ReactMarkdown remarkPlugins={[remarkGfm]} rehypePlugins={[rehypeSanitize]} className="prose dark:prose-invert max-w-none mb-6">
+                  <ReactMarkdown remarkPlugins={[remarkGfm]} rehypePlugins={[rehypeSanitize]} components={components} className="prose dark:prose-invert max-w-none mb-6">
                     {part1}
                   </ReactMarkdown>
                   {/* First side image */}
@@ -260,7 +295,7 @@ const PostPage: React.FC<PostPageProps> = ({ post }) => {
                     </div>
                   )}
                   {/* Second segment */}
-                  <ReactMarkdown remarkPlugins={[remarkGfm]} rehypePlugins={[rehypeSanitize]} className="prose dark:prose-invert max-w-none mb-6">
+                  <ReactMarkdown remarkPlugins={[remarkGfm]} rehypePlugins={[rehypeSanitize]} components={components} className="prose dark:prose-invert max-w-none mb-6">
                     {part2}
                   </ReactMarkdown>
                   {/* Second side image */}
@@ -278,7 +313,7 @@ const PostPage: React.FC<PostPageProps> = ({ post }) => {
                     </div>
                   )}
                   {/* Final segment */}
-                  <ReactMarkdown remarkPlugins={[remarkGfm]} rehypePlugins={[rehypeSanitize]} className="prose dark:prose-invert max-w-none mb-6">
+                  <ReactMarkdown remarkPlugins={[remarkGfm]} rehypePlugins={[rehypeSanitize]} components={components} className="prose dark:prose-invert max-w-none mb-6">
                     {part3}
                   </ReactMarkdown>
                 </>
@@ -295,6 +330,17 @@ const PostPage: React.FC<PostPageProps> = ({ post }) => {
             />
           </div>
         </article>
+        
+        {relatedPosts.length > 0 && (
+          <section className="max-w-6xl mx-auto mt-12">
+            <h2 className="text-2xl font-bold mb-6 text-gray-900 dark:text-gray-100">Related posts</h2>
+            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+              {relatedPosts.slice(0, 3).map(related => (
+                <PostCard key={related.id} post={related} />
+              ))}
+            </div>
+          </section>
+        )}
       </main>
     </div>
   );